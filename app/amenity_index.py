@@ -0,0 +1,129 @@
+"""
+Amenity Bitset Index
+Interns amenity names to bit positions and keeps an inverted index from amenity to hotel set.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+class AmenityBits:
+    """Maps amenity names to integer bit positions.
+
+    Catalog amenities get the low bits in catalog order; names that only
+    appear in provider data are interned on first sight after them.
+    """
+
+    def __init__(self, catalog: Iterable[str] = ()):
+        self._bits: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+        for name in catalog:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        """Return the bit position for an amenity, assigning one if it is new"""
+        bit = self._bits.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.get(name)
+                if bit is None:
+                    bit = len(self._names)
+                    self._names.append(name)
+                    self._bits[name] = bit
+        return bit
+
+    def position(self, name: str) -> Optional[int]:
+        """Bit position of an already interned amenity"""
+        return self._bits.get(name)
+
+    def mask(self, amenities: Iterable[str]) -> int:
+        """Bitmask for a hotel's amenities, interning unseen names"""
+        mask = 0
+        for name in amenities:
+            mask |= 1 << self.intern(name)
+        return mask
+
+    def required_mask(self, amenities: Iterable[str]) -> Optional[int]:
+        """Bitmask for a search's required amenities, or None if one is unknown (nothing can match)"""
+        mask = 0
+        for name in amenities:
+            bit = self.position(name)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+    def names(self, mask: int) -> List[str]:
+        """Amenity names set in a bitmask"""
+        return [name for bit, name in enumerate(self._names) if mask >> bit & 1]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+class AmenityIndex:
+    """Inverted index from amenity bit to the set of hotels offering it.
+
+    Hotel sets are Python ints used as bitsets over insertion order, so a
+    multi-amenity query is one AND per required amenity followed by a walk
+    over the surviving bits. Each hotel's own amenity bitmask is kept by id;
+    the hotel records themselves are left untouched.
+    """
+
+    def __init__(self, bits: AmenityBits, hotels: Iterable[Dict[str, Any]] = ()):
+        self.bits = bits
+        self._hotels: List[Dict[str, Any]] = []
+        self._masks: Dict[Any, int] = {}
+        self._postings: Dict[int, int] = {}
+        self._all = 0
+        for hotel in hotels:
+            self.add(hotel)
+
+    def add(self, hotel: Dict[str, Any]) -> None:
+        """Index a hotel under its amenities"""
+        row = len(self._hotels)
+        mask = self.bits.mask(hotel.get("amenities", []))
+        self._masks[hotel.get("id")] = mask
+        self._hotels.append(hotel)
+        self._all |= 1 << row
+        bit = 0
+        while mask:
+            if mask & 1:
+                self._postings[bit] = self._postings.get(bit, 0) | (1 << row)
+            mask >>= 1
+            bit += 1
+
+    def match(self, amenities: Iterable[str]) -> List[Dict[str, Any]]:
+        """Hotels that offer every amenity, in insertion order"""
+        required = self.bits.required_mask(amenities)
+        if required is None:
+            return []
+        candidates = self._all
+        bit = 0
+        while required and candidates:
+            if required & 1:
+                candidates &= self._postings.get(bit, 0)
+            required >>= 1
+            bit += 1
+        return [self._hotels[row] for row in _set_bits(candidates)]
+
+    def mask_of(self, hotel_id: Any) -> Optional[int]:
+        """Amenity bitmask of an indexed hotel, or None if it is not indexed"""
+        return self._masks.get(hotel_id)
+
+    def count(self, amenity: str) -> int:
+        """Number of hotels offering an amenity"""
+        bit = self.bits.position(amenity)
+        return bin(self._postings.get(bit, 0)).count("1") if bit is not None else 0
+
+    def __len__(self) -> int:
+        return len(self._hotels)
+
+def _set_bits(bitset: int) -> List[int]:
+    """Positions of the set bits in an int, lowest first"""
+    digits = bin(bitset)[:1:-1]
+    positions = []
+    position = digits.find("1")
+    while position != -1:
+        positions.append(position)
+        position = digits.find("1", position + 1)
+    return positions
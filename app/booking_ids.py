@@ -0,0 +1,78 @@
+"""
+Booking References
+ULID-style identifiers: a millisecond timestamp followed by random bits, in Crockford
+base32, so references sort by creation time and need no coordination between workers.
+"""
+
+import os
+import threading
+import time
+from typing import Callable
+
+# Crockford's base32: no I, L, O or U, so references survive being read out over the phone
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+TIME_BITS = 48
+RANDOM_BITS = 80
+# 26 characters hold the 128 bits
+REFERENCE_LENGTH = 26
+
+_DECODE = {character: value for value, character in enumerate(ALPHABET)}
+# Letters clients commonly type for the digits they resemble
+_DECODE.update({"I": 1, "L": 1, "O": 0})
+
+def encode(value: int, length: int = REFERENCE_LENGTH) -> str:
+    """Fixed-width base32 of a non-negative integer"""
+    characters = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        characters.append(ALPHABET[digit])
+    if value:
+        raise ValueError("Value does not fit in the requested length")
+    return "".join(reversed(characters))
+
+def normalize_reference(reference: str) -> str:
+    """Canonical form of a typed reference: uppercase, with I/L/O read as 1/1/0"""
+    text = reference.strip().upper()
+    if len(text) != REFERENCE_LENGTH or any(character not in _DECODE for character in text):
+        raise ValueError("Invalid booking reference")
+    return "".join(ALPHABET[_DECODE[character]] for character in text)
+
+def decode(reference: str) -> int:
+    """The 128-bit value of a reference"""
+    value = 0
+    for character in normalize_reference(reference):
+        value = value * 32 + _DECODE[character]
+    return value
+
+def reference_timestamp(reference: str) -> float:
+    """Creation time (Unix seconds) embedded in a reference"""
+    return (decode(reference) >> RANDOM_BITS) / 1000.0
+
+class BookingIdGenerator:
+    """Thread-safe generator of k-sortable, unguessable references.
+
+    Each reference is 48 bits of Unix milliseconds and 80 fresh random bits
+    from ``os.urandom``, so references sort by the millisecond they were
+    made in and knowing one says nothing about its neighbours. References
+    from the same millisecond are in no particular order among
+    themselves. Separate processes, such as gunicorn workers, share
+    nothing: two of them colliding needs the same millisecond and the same
+    80 random bits.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_millis = -1
+
+    def new(self) -> str:
+        """A new reference, sorting no earlier than any reference this process made before"""
+        with self._lock:
+            # A clock stepping back does not make references go back in time
+            self._last_millis = max(int(self._clock() * 1000), self._last_millis)
+            millis = self._last_millis
+        return encode((millis << RANDOM_BITS) | int.from_bytes(os.urandom(RANDOM_BITS // 8), "big"))
+
+# Shared by every booking path in the process
+new_booking_reference = BookingIdGenerator().new
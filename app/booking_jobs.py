@@ -0,0 +1,143 @@
+"""
+Post-Booking Jobs
+Confirmation emails, partner webhooks and audit exports for confirmed bookings, run by the
+background job queue instead of inside the booking request.
+
+Run a dedicated worker process with: python -m app.booking_jobs
+"""
+
+import json
+import os
+import signal
+import smtplib
+import threading
+import logging
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+import httpx
+from .job_queue import JobQueue
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CONFIRMATION_EMAIL = "booking.confirmation_email"
+PARTNER_WEBHOOK = "booking.partner_webhook"
+AUDIT_EXPORT = "booking.audit_export"
+
+class BookingNotifier:
+    """Queues and performs the side effects of a confirmed booking.
+
+    Each side effect runs only when configured: email needs an SMTP host,
+    the partner notification a webhook URL, the export a file path.
+    Handlers raise on failure so the queue retries them. Jobs can run more
+    than once, so the webhook carries the booking reference as its
+    Idempotency-Key and export consumers should key on the reference.
+    """
+
+    def __init__(self,
+                 queue: JobQueue,
+                 smtp_host: Optional[str] = None,
+                 smtp_port: int = 25,
+                 smtp_username: Optional[str] = None,
+                 smtp_password: Optional[str] = None,
+                 smtp_starttls: bool = False,
+                 sender: str = "bookings@localhost",
+                 webhook_url: Optional[str] = None,
+                 webhook_timeout: float = 10.0,
+                 audit_path: Optional[str] = None):
+        self.queue = queue
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.smtp_username = smtp_username
+        self.smtp_password = smtp_password
+        self.smtp_starttls = smtp_starttls
+        self.sender = sender
+        self.webhook_url = webhook_url
+        self.webhook_timeout = webhook_timeout
+        self.audit_path = audit_path
+        self._audit_lock = threading.Lock()
+        queue.register(CONFIRMATION_EMAIL, self.send_confirmation_email)
+        queue.register(PARTNER_WEBHOOK, self.notify_partner)
+        queue.register(AUDIT_EXPORT, self.export_audit)
+
+    @classmethod
+    def from_env(cls, queue: JobQueue) -> "BookingNotifier":
+        """Notifier configured from SMTP_*, PARTNER_WEBHOOK_URL and AUDIT_EXPORT_PATH"""
+        return cls(
+            queue,
+            smtp_host=os.getenv("SMTP_HOST") or None,
+            smtp_port=int(os.getenv("SMTP_PORT", "25")),
+            smtp_username=os.getenv("SMTP_USERNAME") or None,
+            smtp_password=os.getenv("SMTP_PASSWORD") or None,
+            smtp_starttls=os.getenv("SMTP_STARTTLS", "false").lower() == "true",
+            sender=os.getenv("SMTP_FROM", "bookings@localhost"),
+            webhook_url=os.getenv("PARTNER_WEBHOOK_URL") or None,
+            audit_path=os.getenv("AUDIT_EXPORT_PATH") or None
+        )
+
+    def enqueue(self, booking: Dict[str, Any]) -> List[int]:
+        """Queue every configured side effect of a booking; returns the job ids"""
+        kinds = []
+        if self.smtp_host and booking.get("email"):
+            kinds.append(CONFIRMATION_EMAIL)
+        if self.webhook_url:
+            kinds.append(PARTNER_WEBHOOK)
+        if self.audit_path:
+            kinds.append(AUDIT_EXPORT)
+        return [self.queue.enqueue(kind, booking) for kind in kinds]
+
+    def send_confirmation_email(self, booking: Dict[str, Any]) -> None:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = booking["email"]
+        message["Subject"] = f"Booking confirmation {booking['reference']}"
+        message.set_content(
+            f"Dear {booking.get('name', 'guest')},\n\n"
+            f"Your booking {booking['reference']} is confirmed.\n"
+            f"Hotel: {booking.get('hotel_id')}\n"
+            f"Room: {booking.get('room_type', '-')}\n"
+            f"Check-in: {booking.get('check_in')}\n"
+            f"Check-out: {booking.get('check_out')}\n"
+        )
+        with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30) as smtp:
+            if self.smtp_starttls:
+                smtp.starttls()
+            if self.smtp_username:
+                smtp.login(self.smtp_username, self.smtp_password or "")
+            smtp.send_message(message)
+        logger.info(f"Sent confirmation email for booking {booking['reference']}")
+
+    def notify_partner(self, booking: Dict[str, Any]) -> None:
+        response = httpx.post(
+            self.webhook_url,
+            json={"event": "booking.confirmed", "booking": booking},
+            headers={"Idempotency-Key": booking["reference"]},
+            timeout=self.webhook_timeout
+        )
+        response.raise_for_status()
+        logger.info(f"Notified partner of booking {booking['reference']}")
+
+    def export_audit(self, booking: Dict[str, Any]) -> None:
+        if os.path.dirname(self.audit_path):
+            os.makedirs(os.path.dirname(self.audit_path), exist_ok=True)
+        line = json.dumps({"event": "booking.confirmed", "booking": booking}, sort_keys=True, default=str)
+        with self._audit_lock, open(self.audit_path, "a", encoding="utf-8") as export:
+            export.write(line + "\n")
+
+def main() -> None:
+    """Run job workers in this process until interrupted"""
+    logging.basicConfig(level=logging.INFO)
+    queue = JobQueue.from_env()
+    BookingNotifier.from_env(queue)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    queue.start(int(os.getenv("JOB_WORKERS", "2")))
+    try:
+        while not stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    queue.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Durable Booking Store
+SQLite (WAL mode) booking records written by a single group-commit thread, so concurrent
+bookings share one transaction and one fsync instead of paying for their own.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS bookings ("
+    " reference TEXT PRIMARY KEY,"
+    " hotel_id TEXT NOT NULL,"
+    " check_in TEXT NOT NULL,"
+    " check_out TEXT NOT NULL,"
+    " status TEXT NOT NULL,"
+    " created_at TEXT NOT NULL,"
+    " data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_hotel_dates ON bookings (hotel_id, check_in, check_out)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_check_in ON bookings (check_in)"
+)
+
+class DuplicateBookingError(ValueError):
+    """A booking with this reference is already stored"""
+
+class SaveTimeoutError(TimeoutError):
+    """A save outlived its timeout; the writer may still commit it.
+
+    ``outcome`` resolves once the writer is done with the request: to
+    ``None`` if the bookings were stored, or with the error if they were not.
+    """
+
+    def __init__(self, message: str, outcome: Future):
+        super().__init__(message)
+        self.outcome = outcome
+
+class BookingStore:
+    """Thread-safe durable store for booking records.
+
+    ``save`` and ``save_many`` hand records to one writer thread and block
+    until they are durable. The writer commits everything queued, up to
+    ``max_batch`` requests, in one transaction (one fsync with
+    ``synchronous=FULL``). Requests arriving during a commit form the next
+    batch, so batches grow with load without delaying a lone booking;
+    ``max_delay`` can additionally hold a batch open for stragglers. Each
+    request runs in its own savepoint, so one failure does not fail the
+    others in its batch.
+
+    Reads use a connection per thread and run alongside the writer thanks
+    to WAL. After a crash SQLite replays the WAL on open; ``open`` also runs
+    a quick integrity check.
+    """
+
+    def __init__(self, path: str, max_batch: int = 256, max_delay: float = 0.0):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: "queue.Queue[Optional[Tuple[List[Dict[str, Any]], Future]]]" = queue.Queue()
+        self._local = threading.local()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"commits": 0, "bookings": 0, "failed": 0}
+        self._db = self._connect()
+        self.open()
+
+    @classmethod
+    def from_env(cls) -> "BookingStore":
+        """Store at BOOKING_DB_PATH (default data/bookings.sqlite3)"""
+        return cls(
+            path=os.getenv("BOOKING_DB_PATH", os.path.join("data", "bookings.sqlite3")),
+            max_batch=int(os.getenv("BOOKING_COMMIT_BATCH", "256")),
+            max_delay=float(os.getenv("BOOKING_COMMIT_DELAY", "0"))
+        )
+
+    def open(self) -> None:
+        """Create the schema, verify the database and start the writer thread"""
+        with self._db:
+            for statement in SCHEMA:
+                self._db.execute(statement)
+        problems = self._db.execute("PRAGMA quick_check").fetchone()[0]
+        if problems != "ok":
+            logger.error(f"Booking store integrity check failed: {problems}")
+        count = self._db.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        logger.info(f"Booking store opened with {count} bookings")
+        self._writer = threading.Thread(target=self._write_loop, name="booking-store-writer", daemon=True)
+        self._writer.start()
+
+    def save(self, booking: Dict[str, Any], timeout: Optional[float] = 10.0) -> Dict[str, Any]:
+        """Persist one booking, returning once it is durable"""
+        self.save_many([booking], timeout)
+        return booking
+
+    def save_many(self, bookings: List[Dict[str, Any]], timeout: Optional[float] = 10.0) -> None:
+        """Persist several bookings atomically: all are stored, or none.
+
+        Raises SaveTimeoutError if the writer has not finished within
+        ``timeout``; the bookings may still be stored after that.
+        """
+        for booking in bookings:
+            for field in ("reference", "hotel_id", "check_in", "check_out"):
+                if not booking.get(field):
+                    raise ValueError(f"Booking {field} is required")
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Booking store is closed")
+            self._queue.put((bookings, future))
+        try:
+            future.result(timeout)
+        except FutureTimeoutError:
+            raise SaveTimeoutError(f"Bookings not stored within {timeout}s", future) from None
+
+    def get(self, reference: str) -> Optional[Dict[str, Any]]:
+        """A booking by reference"""
+        row = self._reader().execute("SELECT data FROM bookings WHERE reference = ?", (reference,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def for_hotel(self, hotel_id: str, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Bookings of a hotel, optionally only stays overlapping [start, end) (ISO dates)"""
+        sql = "SELECT data FROM bookings WHERE hotel_id = ?"
+        args: List[Any] = [hotel_id]
+        if end is not None:
+            sql += " AND check_in < ?"
+            args.append(end)
+        if start is not None:
+            sql += " AND check_out > ?"
+            args.append(start)
+        sql += " ORDER BY check_in, reference"
+        return [json.loads(row[0]) for row in self._reader().execute(sql, args)]
+
+    def checking_in(self, start: str, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Bookings whose check-in falls in [start, end) (ISO dates; a single day by default)"""
+        if end is None:
+            end = date.fromordinal(date.fromisoformat(start).toordinal() + 1).isoformat()
+        return [
+            json.loads(row[0]) for row in self._reader().execute(
+                "SELECT data FROM bookings WHERE check_in >= ? AND check_in < ? ORDER BY check_in, reference",
+                (start, end)
+            )
+        ]
+
+    def staying_after(self, day: str) -> List[Dict[str, Any]]:
+        """Confirmed bookings with a night on or after ``day`` (ISO date), e.g. to rebuild inventory"""
+        return [
+            json.loads(row[0]) for row in self._reader().execute(
+                "SELECT data FROM bookings WHERE check_out > ? AND status = 'confirmed' ORDER BY check_in, reference",
+                (day,)
+            )
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["bookings_per_commit"] = round(stats["bookings"] / stats["commits"], 2) if stats["commits"] else 0
+        return stats
+
+    def close(self) -> None:
+        """Flush queued bookings, stop the writer and checkpoint the WAL"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if self._writer is not None:
+            self._writer.join()
+        try:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            logger.error(f"Error checkpointing booking store: {str(e)}")
+        self._db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[List[Dict[str, Any]], Future]]) -> None:
+        """Write a batch in one transaction, one savepoint per request"""
+        outcomes: List[Optional[BaseException]] = []
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            for bookings, _ in batch:
+                self._db.execute("SAVEPOINT request")
+                try:
+                    self._db.executemany(
+                        "INSERT INTO bookings (reference, hotel_id, check_in, check_out, status, created_at, data)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [_row(booking) for booking in bookings]
+                    )
+                    self._db.execute("RELEASE request")
+                    outcomes.append(None)
+                except sqlite3.IntegrityError as e:
+                    self._db.execute("ROLLBACK TO request")
+                    self._db.execute("RELEASE request")
+                    # Only a clash on the primary key is a duplicate; other constraints are plain failures
+                    if "bookings.reference" in str(e):
+                        outcomes.append(DuplicateBookingError("Booking reference already exists"))
+                    else:
+                        logger.error(f"Booking rejected by the store: {str(e)}")
+                        outcomes.append(e)
+            self._db.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Booking store commit failed: {str(e)}")
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            outcomes = [e] * len(batch)
+
+        self._stats["commits"] += 1
+        for (bookings, future), error in zip(batch, outcomes):
+            if error is None:
+                self._stats["bookings"] += len(bookings)
+                future.set_result(None)
+            else:
+                self._stats["failed"] += len(bookings)
+                future.set_exception(error)
+
+def _row(booking: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        booking["reference"],
+        booking["hotel_id"],
+        str(booking["check_in"]),
+        str(booking["check_out"]),
+        booking.get("status", "confirmed"),
+        booking.get("created_at", ""),
+        json.dumps(booking, default=str)
+    )
@@ -0,0 +1,92 @@
+"""
+Background Event Loop
+Runs a single process-wide asyncio loop that synchronous Flask views can dispatch coroutines onto.
+"""
+
+import asyncio
+import os
+import threading
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class BackgroundEventLoop:
+    """Owns one asyncio event loop running on a daemon thread.
+
+    Every request thread submits its coroutine to the same loop, so I/O waits
+    (simulated latency, provider calls) overlap across all in-flight requests
+    instead of each request spinning up and blocking on a private loop.
+    """
+
+    def __init__(self, name: str = "search-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Return the running loop, starting it on first use (and again after a fork)."""
+        if self._loop is None or self._pid != os.getpid():
+            self.start()
+        return self._loop
+
+    def start(self) -> None:
+        """Start the loop thread if it is not already running in this process."""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_run, name=self.name, daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            logger.info(f"Background event loop '{self.name}' started in process {self._pid}")
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """Schedule a coroutine on the loop and return a concurrent future for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block the calling thread until it completes."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def iterate(self, agen: AsyncIterator[Any], timeout: Optional[float] = None) -> Iterator[Any]:
+        """Drive an async generator on the loop from a synchronous caller, one item at a time"""
+        async def _next():
+            return await agen.__anext__()
+
+        try:
+            while True:
+                try:
+                    yield self.run(_next(), timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(agen.aclose())
+
+    def stop(self) -> None:
+        """Stop the loop and wait for its thread to exit."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop, self._thread, self._pid = None, None, None
@@ -0,0 +1,245 @@
+"""
+Geocoding Cache
+In-memory LRU in front of a persistent SQLite store, so repeat lookups never leave the
+process and a cold start does not have to ask the upstream geocoder again.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+from .search_cache import normalize_destination
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+Geocoder = Callable[[str], Optional[Coordinates]]
+
+# Destinations we list on the site, resolvable without ever calling a geocoder
+KNOWN_DESTINATIONS: Dict[str, Coordinates] = {
+    "london": (51.5074, -0.1278),
+    "new york": (40.7128, -74.0060),
+    "new york city": (40.7128, -74.0060),
+    "paris": (48.8566, 2.3522),
+    "tokyo": (35.6762, 139.6503)
+}
+
+_MISSING = object()
+
+# Nominatim's usage policy allows at most one request per second
+NOMINATIM_MIN_INTERVAL = 1.0
+
+def rate_limited(geocoder: Geocoder,
+                 min_interval: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> Geocoder:
+    """Geocoder that starts calls at least ``min_interval`` seconds apart, across threads"""
+    lock = threading.Lock()
+    next_call = [float("-inf")]
+
+    def geocode(query: str) -> Optional[Coordinates]:
+        with lock:
+            wait = next_call[0] - clock()
+            if wait > 0:
+                sleep(wait)
+            next_call[0] = clock() + min_interval
+        return geocoder(query)
+
+    return geocode
+
+def nominatim_geocoder(user_agent: str = "hotel-booking-system",
+                       timeout: float = 5.0,
+                       min_interval: float = NOMINATIM_MIN_INTERVAL) -> Optional[Geocoder]:
+    """Geocoder backed by OpenStreetMap Nominatim, or None when geopy is not installed.
+
+    Calls are spaced ``min_interval`` seconds apart to stay within Nominatim's usage policy.
+    """
+    try:
+        from geopy.geocoders import Nominatim
+        from geopy.exc import GeopyError
+    except ImportError:
+        logger.warning("geopy is not installed; only cached and known destinations can be geocoded")
+        return None
+
+    client = Nominatim(user_agent=user_agent, timeout=timeout)
+
+    def geocode(query: str) -> Optional[Coordinates]:
+        try:
+            location = client.geocode(query)
+        except GeopyError as e:
+            logger.error(f"Geocoding failed for {query}: {str(e)}")
+            raise
+        if location is None:
+            return None
+        return (location.latitude, location.longitude)
+
+    return rate_limited(geocode, min_interval)
+
+class GeocodingCache:
+    """Thread-safe destination -> coordinates lookups with two cache tiers.
+
+    Lookups check a bounded LRU, then the SQLite store, and only then the
+    upstream ``geocoder``. Its answers are written through to both tiers.
+    "Not found" answers are stored too, but retried after ``negative_ttl``
+    seconds. Geocoder errors are not cached. Concurrent misses for the same
+    destination share one geocoder call.
+    """
+
+    def __init__(self,
+                 path: str = ":memory:",
+                 geocoder: Optional[Geocoder] = None,
+                 max_entries: int = 1024,
+                 negative_ttl: float = 86400.0,
+                 seed: Optional[Dict[str, Coordinates]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.geocoder = geocoder
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._memory: "OrderedDict[str, Optional[Coordinates]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "geocoder_calls": 0, "geocoder_errors": 0, "coalesced": 0}
+        # Geocoder calls in progress by destination key, for lookups of the same key to wait on
+        self._in_flight: Dict[str, Future] = {}
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            if path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS geocodes ("
+                "query TEXT PRIMARY KEY, latitude REAL, longitude REAL, updated_at REAL NOT NULL)"
+            )
+        self.seed(KNOWN_DESTINATIONS if seed is None else seed)
+
+    @classmethod
+    def from_env(cls) -> "GeocodingCache":
+        """Cache stored at GEOCODE_CACHE_PATH, backed by Nominatim when geopy is available.
+
+        This creates the store (data/geocoding.sqlite3 relative to the working
+        directory by default) and may send lookups to Nominatim, so only the
+        app entrypoint should call it.
+        """
+        return cls(
+            path=os.getenv("GEOCODE_CACHE_PATH", os.path.join("data", "geocoding.sqlite3")),
+            geocoder=nominatim_geocoder(os.getenv("GEOCODER_USER_AGENT", "hotel-booking-system")),
+            max_entries=int(os.getenv("GEOCODE_CACHE_SIZE", "1024"))
+        )
+
+    def seed(self, destinations: Dict[str, Coordinates]) -> None:
+        """Store coordinates for destinations that are not in the store yet"""
+        now = self._clock()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO geocodes (query, latitude, longitude, updated_at) VALUES (?, ?, ?, ?)",
+                [(normalize_destination(name), lat, lon, now) for name, (lat, lon) in destinations.items()]
+            )
+
+    def cached(self, destination: str) -> Optional[Coordinates]:
+        """Coordinates already in memory, without touching disk or the geocoder"""
+        key = normalize_destination(destination)
+        with self._lock:
+            if key not in self._memory:
+                return None
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return self._memory[key]
+
+    def lookup(self, destination: str) -> Optional[Coordinates]:
+        """Coordinates of a destination, or None if it cannot be geocoded.
+
+        May block on disk and on the upstream geocoder; async callers should
+        run it in an executor after trying ``cached``.
+        """
+        key = normalize_destination(destination)
+        if not key:
+            return None
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+            stored = self._load(key)
+            if stored is not _MISSING:
+                self._stats["disk_hits"] += 1
+                self._remember(key, stored)
+                return stored
+
+            # A miss: the first lookup of a key calls the geocoder, the others wait for its answer
+            if self.geocoder is None:
+                return None
+            pending = self._in_flight.get(key)
+            if pending is None:
+                pending = self._in_flight[key] = Future()
+                self._stats["geocoder_calls"] += 1
+                leader = True
+            else:
+                self._stats["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            return pending.result()
+
+        coordinates = None
+        try:
+            coordinates = self.geocoder(destination)
+        except Exception as e:
+            with self._lock:
+                self._stats["geocoder_errors"] += 1
+            logger.error(f"Geocoding error for destination {destination}: {str(e)}")
+        else:
+            with self._lock:
+                self._store(key, coordinates)
+                self._remember(key, coordinates)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending.set_result(coordinates)
+        return coordinates
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, memory_entries=len(self._memory))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _load(self, key: str):
+        """Stored coordinates (None for a fresh "not found"), or _MISSING"""
+        row = self._db.execute(
+            "SELECT latitude, longitude, updated_at FROM geocodes WHERE query = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        latitude, longitude, updated_at = row
+        if latitude is None or longitude is None:
+            if self._clock() - updated_at > self.negative_ttl:
+                return _MISSING
+            return None
+        return (latitude, longitude)
+
+    def _store(self, key: str, coordinates: Optional[Coordinates]) -> None:
+        latitude, longitude = coordinates if coordinates is not None else (None, None)
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocodes (query, latitude, longitude, updated_at) VALUES (?, ?, ?, ?)",
+                (key, latitude, longitude, self._clock())
+            )
+
+    def _remember(self, key: str, coordinates: Optional[Coordinates]) -> None:
+        # Negative answers stay on disk only, where they can expire
+        if coordinates is None:
+            return
+        self._memory[key] = coordinates
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
@@ -2,16 +2,20 @@
 
 import os
 import json
+import asyncio
 import datetime
 import time
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 import logging
-import random
-import string
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from .amenity_index import AmenityBits, AmenityIndex
+from .booking_ids import new_booking_reference
+from .booking_jobs import BookingNotifier
+from .booking_store import BookingStore
+from .idempotency import IdempotencyStore, request_fingerprint, validate_idempotency_key
 
 # Initialize FastAPI app
 app = FastAPI(title="Hotel Booking System API")
@@ -40,21 +44,26 @@ class HotelAmenity:
     description: str
     icon: str
 
+# Amenity catalog shown to users; its order fixes the amenity bit positions
+AMENITY_CATALOG = {
+    "pool": HotelAmenity("Swimming Pool", "Indoor and outdoor pools", "🏊"),
+    "breakfast": HotelAmenity("Free Breakfast", "Complimentary breakfast buffet", "🍳"),
+    "parking": HotelAmenity("Free Parking", "Secure parking facility", "🅿️"),
+    "wifi": HotelAmenity("Free WiFi", "High-speed internet access", "🌐"),
+    "fitness": HotelAmenity("Fitness Center", "24/7 gym access", "🏋️"),
+    "spa": HotelAmenity("Spa", "Luxury spa services", "💆"),
+    "restaurant": HotelAmenity("Restaurant", "On-site dining", "🍽️"),
+    "bar": HotelAmenity("Bar", "Lounge and bar", "🍸"),
+    "conference": HotelAmenity("Conference Room", "Business meeting facilities", "💼"),
+    "shuttle": HotelAmenity("Airport Shuttle", "Complimentary airport transfer", "🚐")
+}
+
+AMENITY_BITS = AmenityBits(AMENITY_CATALOG)
+
 class UserInterfaceAgent:
     def __init__(self):
         self.booking_details = {}
-        self.amenities = {
-            "pool": HotelAmenity("Swimming Pool", "Indoor and outdoor pools", "🏊"),
-            "breakfast": HotelAmenity("Free Breakfast", "Complimentary breakfast buffet", "🍳"),
-            "parking": HotelAmenity("Free Parking", "Secure parking facility", "🅿️"),
-            "wifi": HotelAmenity("Free WiFi", "High-speed internet access", "🌐"),
-            "fitness": HotelAmenity("Fitness Center", "24/7 gym access", "🏋️"),
-            "spa": HotelAmenity("Spa", "Luxury spa services", "💆"),
-            "restaurant": HotelAmenity("Restaurant", "On-site dining", "🍽️"),
-            "bar": HotelAmenity("Bar", "Lounge and bar", "🍸"),
-            "conference": HotelAmenity("Conference Room", "Business meeting facilities", "💼"),
-            "shuttle": HotelAmenity("Airport Shuttle", "Complimentary airport transfer", "🚐")
-        }
+        self.amenities = dict(AMENITY_CATALOG)
     
     def display_welcome_message(self):
         """Display a colorful welcome message to the user."""
@@ -284,10 +293,12 @@ class UserInterfaceAgent:
             return None
 
 class BookingAPIAgent:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, simulated_latency: float = 2.0):
         self.api_key = api_key or os.environ.get("BOOKING_API_KEY")
         if not self.api_key:
             raise ValueError("Booking.com API key is required. Set it in the environment variable BOOKING_API_KEY or pass it to the constructor.")
+        self.simulated_latency = simulated_latency
+        self.amenity_index = AmenityIndex(AMENITY_BITS, self._simulated_hotels())
         logger.info("BookingAPIAgent initialized successfully")
     
     def search_hotels(self, booking_details: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -298,88 +309,141 @@ class BookingAPIAgent:
         For this example, we'll simulate the API response.
         """
         try:
-            logger.info(f"Searching hotels in {booking_details['destination']}")
-            logger.info(f"Check-in: {booking_details['check_in']}, Check-out: {booking_details['check_out']}")
-            logger.info(f"Guests: {booking_details['adults']} adults, {booking_details['children']} children")
+            self._log_search(booking_details)
             
             # Simulate API call delay
-            time.sleep(2)
+            time.sleep(self.simulated_latency)
             
-            # Simulate API response with more detailed hotel information
-            hotels = [
-                {
-                    "id": "hotel1",
-                    "name": "Grand Hotel",
-                    "stars": 5,
-                    "price_per_night": 250.0,
-                    "total_price": 250.0 * (datetime.datetime.strptime(booking_details['check_out'], "%Y-%m-%d").date() - 
-                                          datetime.datetime.strptime(booking_details['check_in'], "%Y-%m-%d").date()).days,
-                    "rating": 4.8,
-                    "reviews": 1200,
-                    "amenities": ["pool", "breakfast", "wifi", "fitness", "spa"],
-                    "room_types": ["Standard", "Deluxe", "Suite"],
-                    "description": "Luxury hotel in the heart of the city",
-                    "location": "City Center",
-                    "highlights": ["City View", "Luxury Spa", "Fine Dining"],
-                    "nearby_attractions": ["Shopping Mall", "Museum", "Park"],
-                    "image_url": "https://images.unsplash.com/photo-1542314831-068cd1dbfeeb?ixlib=rb-1.2.1&auto=format&fit=crop&w=800&q=80"
-                },
-                {
-                    "id": "hotel2",
-                    "name": "Beach Resort",
-                    "stars": 4,
-                    "price_per_night": 180.0,
-                    "total_price": 180.0 * (datetime.datetime.strptime(booking_details['check_out'], "%Y-%m-%d").date() - 
-                                          datetime.datetime.strptime(booking_details['check_in'], "%Y-%m-%d").date()).days,
-                    "rating": 4.5,
-                    "reviews": 800,
-                    "amenities": ["pool", "breakfast", "wifi", "fitness", "restaurant"],
-                    "room_types": ["Standard", "Deluxe"],
-                    "description": "Beachfront resort with stunning ocean views",
-                    "location": "Beachfront",
-                    "highlights": ["Ocean View", "Beach Access", "Water Sports"],
-                    "nearby_attractions": ["Beach", "Water Park", "Shopping Center"],
-                    "image_url": "https://images.unsplash.com/photo-1520250497591-112f2f40a3f4?ixlib=rb-1.2.1&auto=format&fit=crop&w=800&q=80"
-                }
-            ]
+            return self._simulated_response(self._filter_hotels(booking_details), booking_details)
+        except Exception as e:
+            logger.error(f"Error searching hotels: {str(e)}")
+            return []
+    
+    async def search_hotels_async(self, booking_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Asyncio-native variant of search_hotels.
+        
+        The simulated API latency is awaited instead of slept, so many searches
+        scheduled on the same event loop wait concurrently rather than in series.
+        """
+        try:
+            self._log_search(booking_details)
             
-            # Filter hotels based on preferences
-            filtered_hotels = []
-            for hotel in hotels:
-                if hotel["stars"] < booking_details["preferences"]["min_stars"]:
-                    continue
-                if hotel["price_per_night"] < booking_details["preferences"]["price_range"]["min"] or \
-                   hotel["price_per_night"] > booking_details["preferences"]["price_range"]["max"]:
-                    continue
-                if not all(amenity in hotel["amenities"] for amenity in booking_details["preferences"]["amenities"]):
-                    continue
-                if booking_details["preferences"]["room_type"] not in hotel["room_types"]:
-                    continue
-                filtered_hotels.append(hotel)
+            # Simulate API call delay without blocking the event loop
+            await asyncio.sleep(self.simulated_latency)
             
-            logger.info(f"Found {len(filtered_hotels)} hotels matching criteria")
-            return filtered_hotels
+            return self._simulated_response(self._filter_hotels(booking_details), booking_details)
         except Exception as e:
             logger.error(f"Error searching hotels: {str(e)}")
             return []
+    
+    def _log_search(self, booking_details: Dict[str, Any]) -> None:
+        """Log the search criteria"""
+        logger.info(f"Searching hotels in {booking_details['destination']}")
+        logger.info(f"Check-in: {booking_details['check_in']}, Check-out: {booking_details['check_out']}")
+        logger.info(f"Guests: {booking_details.get('adults', 1)} adults, {booking_details.get('children', 0)} children")
+    
+    def _simulated_response(self, hotels: List[Dict[str, Any]], booking_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Simulate API response by pricing the matching hotels for the stay"""
+        nights = (datetime.datetime.strptime(booking_details['check_out'], "%Y-%m-%d").date() - 
+                  datetime.datetime.strptime(booking_details['check_in'], "%Y-%m-%d").date()).days
+        return [dict(hotel, total_price=hotel["price_per_night"] * nights) for hotel in hotels]
+    
+    def _simulated_hotels(self) -> List[Dict[str, Any]]:
+        """Simulated hotel inventory with detailed hotel information"""
+        return [
+            {
+                "id": "hotel1",
+                "name": "Grand Hotel",
+                "stars": 5,
+                "price_per_night": 250.0,
+                "rating": 4.8,
+                "reviews": 1200,
+                "amenities": ["pool", "breakfast", "wifi", "fitness", "spa"],
+                "room_types": ["Standard", "Deluxe", "Suite"],
+                "description": "Luxury hotel in the heart of the city",
+                "location": "City Center",
+                "highlights": ["City View", "Luxury Spa", "Fine Dining"],
+                "nearby_attractions": ["Shopping Mall", "Museum", "Park"],
+                "image_url": "https://images.unsplash.com/photo-1542314831-068cd1dbfeeb?ixlib=rb-1.2.1&auto=format&fit=crop&w=800&q=80"
+            },
+            {
+                "id": "hotel2",
+                "name": "Beach Resort",
+                "stars": 4,
+                "price_per_night": 180.0,
+                "rating": 4.5,
+                "reviews": 800,
+                "amenities": ["pool", "breakfast", "wifi", "fitness", "restaurant"],
+                "room_types": ["Standard", "Deluxe"],
+                "description": "Beachfront resort with stunning ocean views",
+                "location": "Beachfront",
+                "highlights": ["Ocean View", "Beach Access", "Water Sports"],
+                "nearby_attractions": ["Beach", "Water Park", "Shopping Center"],
+                "image_url": "https://images.unsplash.com/photo-1520250497591-112f2f40a3f4?ixlib=rb-1.2.1&auto=format&fit=crop&w=800&q=80"
+            }
+        ]
+    
+    def _filter_hotels(self, booking_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Filter hotels based on preferences; preferences left out do not filter"""
+        preferences = booking_details.get("preferences") or {}
+        # Required amenities are one AND over the amenity index's hotel sets
+        candidates = self.amenity_index.match(preferences.get("amenities", []))
+        price_range = preferences.get("price_range")
+        
+        filtered_hotels = []
+        for hotel in candidates:
+            if hotel["stars"] < preferences.get("min_stars", 0):
+                continue
+            if price_range and (hotel["price_per_night"] < price_range.get("min", 0) or
+                                hotel["price_per_night"] > price_range.get("max", float("inf"))):
+                continue
+            if preferences.get("room_type") and preferences["room_type"] not in hotel["room_types"]:
+                continue
+            filtered_hotels.append(hotel)
+        
+        logger.info(f"Found {len(filtered_hotels)} hotels matching criteria")
+        return filtered_hotels
 
 class IntegrationAgent:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, store: Optional[BookingStore] = None,
+                 idempotency: Optional[IdempotencyStore] = None, notifier: Optional[BookingNotifier] = None):
         self.api_key = api_key or os.environ.get("BOOKING_API_KEY")
         if not self.api_key:
             raise ValueError("Booking.com API key is required. Set it in the environment variable BOOKING_API_KEY or pass it to the constructor.")
+        # Durable record of confirmed bookings (not persisted when None)
+        self.store = store
+        # Bookings by idempotency key, so a retried call returns the original booking
+        self.idempotency = idempotency or IdempotencyStore()
+        # Queues confirmation emails and partner notifications (none sent when None)
+        self.notifier = notifier
         logger.info("IntegrationAgent initialized successfully")
     
-    def process_booking(self, hotel_id: str, booking_details: Dict[str, Any]) -> Dict[str, Any]:
+    def process_booking(self, hotel_id: str, booking_details: Dict[str, Any],
+                        idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a hotel booking with improved error handling and validation.
         
+        Calls repeating an ``idempotency_key`` get the booking made by the
+        first call (waiting for it if still in progress) instead of a new one.
+        
         In a real implementation, this would:
         1. Check hotel availability
         2. Process payment
-        3. Create booking record in database
-        4. Send confirmation email
+        3. Create booking record in database (the booking store, when set)
+        4. Send confirmation email (queued on the notifier's job queue, when set)
         """
+        key = validate_idempotency_key(idempotency_key)
+        if key is None:
+            return self._process_booking(hotel_id, booking_details)
+        booking, _ = self.idempotency.run(
+            f"process_booking:{key}",
+            request_fingerprint({"hotel_id": hotel_id, "booking_details": booking_details}),
+            lambda: self._process_booking(hotel_id, booking_details)
+        )
+        return booking
+
+    def _process_booking(self, hotel_id: str, booking_details: Dict[str, Any]) -> Dict[str, Any]:
         try:
             # Validate booking details
             if not hotel_id:
@@ -388,8 +452,8 @@ class IntegrationAgent:
             if not booking_details.get("check_in") or not booking_details.get("check_out"):
                 raise ValueError("Check-in and check-out dates are required")
             
-            # Generate booking reference
-            booking_ref = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+            # Generate a time-ordered booking reference
+            booking_ref = new_booking_reference()
             
             # Create booking record
             booking = {
@@ -406,6 +470,17 @@ class IntegrationAgent:
                 "created_at": datetime.datetime.now().isoformat()
             }
             
+            # Only report the booking once it is durably stored
+            if self.store is not None:
+                self.store.save(booking)
+            # Slow side effects run on the job queue, not in this call; the booking
+            # stands even if queueing fails, so a retry cannot book twice
+            if self.notifier is not None:
+                try:
+                    self.notifier.enqueue(booking)
+                except Exception as e:
+                    logger.error(f"Failed to queue jobs for booking {booking_ref}: {str(e)}")
+            
             logger.info(f"Booking processed successfully with reference: {booking_ref}")
             return booking
         except ValueError as e:
@@ -0,0 +1,125 @@
+"""
+Columnar Hotel Catalog
+NumPy-backed hotel store whose range filters and sorting run as vectorized array operations.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from .amenity_index import AmenityBits
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class HotelCatalog:
+    """Hotels stored column-wise in contiguous arrays.
+
+    Numeric attributes (price, stars, reviews, rating, cancellation and
+    payment flags) live in one array per column, amenities as a packed
+    ``(n, words)`` uint64 bitmask matrix, and string attributes in plain
+    lists alongside. Filters combine boolean masks over whole columns and
+    return row indices; the original hotel records are kept for output.
+    """
+
+    SORT_COLUMNS = ("price", "stars", "reviews", "rating")
+
+    def __init__(self, hotels: List[Dict[str, Any]], bits: AmenityBits):
+        self.bits = bits
+        self.records = hotels
+        count = len(hotels)
+        self.price = np.fromiter((_number(h.get("price_per_night", h.get("price"))) for h in hotels), np.float64, count)
+        self.stars = np.fromiter((_number(h.get("stars")) for h in hotels), np.float32, count)
+        self.reviews = np.fromiter((int(h.get("reviews") or 0) for h in hotels), np.int64, count)
+        self.rating = np.fromiter((_number(h.get("rating", h.get("stars"))) for h in hotels), np.float32, count)
+        self.free_cancellation = np.fromiter((bool(h.get("free_cancellation", False)) for h in hotels), np.bool_, count)
+        self.payment_required = np.fromiter((bool(h.get("payment_required", True)) for h in hotels), np.bool_, count)
+
+        masks = [bits.mask(h.get("amenities", [])) for h in hotels]
+        self.amenity_words = max(1, (len(bits) + 63) // 64)
+        self.amenity_mask = _pack_masks(masks, self.amenity_words)
+
+        self.ids = [h.get("id") for h in hotels]
+        self.names = [h.get("name", "") for h in hotels]
+        self.locations = [h.get("location", "") for h in hotels]
+        self.sources = [h.get("source", "") for h in hotels]
+        logger.info(f"Built columnar catalog with {count} hotels")
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def filter(self,
+               min_price: Optional[float] = None,
+               max_price: Optional[float] = None,
+               min_rating: Optional[float] = None,
+               min_stars: Optional[float] = None,
+               max_stars: Optional[float] = None,
+               amenities: Iterable[str] = (),
+               free_cancellation_only: bool = False,
+               no_payment_only: bool = False) -> np.ndarray:
+        """Row indices of hotels matching every given criterion"""
+        keep = np.ones(len(self), dtype=np.bool_)
+        if min_price is not None:
+            keep &= self.price >= min_price
+        if max_price is not None:
+            keep &= self.price <= max_price
+        if min_rating is not None:
+            keep &= self.rating >= min_rating
+        if min_stars is not None:
+            keep &= self.stars >= min_stars
+        if max_stars is not None:
+            keep &= self.stars <= max_stars
+        if free_cancellation_only:
+            keep &= self.free_cancellation
+        if no_payment_only:
+            keep &= ~self.payment_required
+
+        amenities = list(amenities)
+        if amenities:
+            required = self.bits.required_mask(amenities)
+            if required is None or required.bit_length() > 64 * self.amenity_words:
+                return np.empty(0, dtype=np.int64)
+            words = _pack_masks([required], self.amenity_words)[0]
+            keep &= ((self.amenity_mask & words) == words).all(axis=1)
+
+        return np.flatnonzero(keep)
+
+    def sort(self, rows: np.ndarray, by: str = "price", descending: bool = False,
+             limit: Optional[int] = None) -> np.ndarray:
+        """Order row indices by a numeric column, ties broken by row, optionally keeping the first `limit`"""
+        if by not in self.SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by {by}")
+        keys = getattr(self, by)[rows].astype(np.float64)
+        if descending:
+            keys = -keys
+        if limit is not None and limit < len(rows):
+            if limit <= 0:
+                return rows[:0]
+            # Partial selection first so only the surviving rows are fully sorted. Every row
+            # tied with the cut-off key survives, so the row tie-break below picks among them
+            cutoff = np.partition(keys, limit - 1)[limit - 1]
+            candidates = keys <= cutoff
+            rows, keys = rows[candidates], keys[candidates]
+        return rows[np.lexsort((rows, keys))][:limit]
+
+    def search(self, sort_by: str = "price", descending: bool = False,
+               limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Filter, sort and return the matching hotel records"""
+        rows = self.sort(self.filter(**filters), by=sort_by, descending=descending, limit=limit)
+        return self.hotels(rows)
+
+    def hotels(self, rows: Iterable[int]) -> List[Dict[str, Any]]:
+        """Original hotel records for row indices"""
+        records = self.records
+        return [records[row] for row in np.asarray(rows).tolist()]
+
+def _number(value: Any) -> float:
+    """Coerce a possibly missing numeric field to float"""
+    return float(value) if value is not None else 0.0
+
+def _pack_masks(masks: List[int], words: int) -> np.ndarray:
+    """Split arbitrary-width amenity bitmasks into rows of uint64 words"""
+    packed = np.zeros((len(masks), words), dtype=np.uint64)
+    for word in range(words):
+        shift = 64 * word
+        packed[:, word] = np.fromiter(((mask >> shift) & 0xFFFFFFFFFFFFFFFF for mask in masks), np.uint64, len(masks))
+    return packed
@@ -1,19 +1,47 @@
 import os
+import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
+from .amenity_index import AmenityIndex
+from .hotel_catalog import HotelCatalog
+from .hotel_booking_system_v2 import AMENITY_BITS, RoomType
+from .geocoding import Coordinates, GeocodingCache, KNOWN_DESTINATIONS
+from services.autocomplete import AutocompleteIndex
+from services.fuzzy_match import DestinationResolver
+from services.geo import haversine_km
+from services.hotel_dedup import hotel_coordinates
+from services.spatial_index import GeohashIndex
+from services.availability import AvailabilityEngine
+from services.http_client import HTTPClientPool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rooms per type for mock hotels that do not list their own "inventory"
+DEFAULT_ROOM_INVENTORY = {
+    RoomType.STANDARD.value: 20,
+    RoomType.DELUXE.value: 10,
+    RoomType.SUITE.value: 4,
+    RoomType.PRESIDENTIAL.value: 1
+}
+
 class HotelDataProvider:
-    def __init__(self):
+    def __init__(self, http_client: Optional[HTTPClientPool] = None, geocoding: Optional[GeocodingCache] = None):
         self.use_mock_data = True  # Always use mock data
+        # Shared pooled client for real API integrations
+        self.http_client = http_client or HTTPClientPool()
+        # Cached geocoder, pre-seeded with our destinations. In memory and without an upstream
+        # geocoder unless one is passed in, e.g. GeocodingCache.from_env() backed by disk and Nominatim
+        self.geocoding = geocoding if geocoding is not None else GeocodingCache()
+        self._change_listeners: List[Callable[[str], Any]] = []
         self.mock_data = {
             "london": [{
                 "id": "ld001",
                 "name": "Royal Park Hotel",
                 "location": "Hyde Park",
+                "latitude": 51.5073,
+                "longitude": -0.1657,
                 "price_per_night": 500,
                 "stars": 4.9,
                 "reviews": 1250,
@@ -26,6 +54,8 @@ class HotelDataProvider:
                 "id": "ny001",
                 "name": "Grand Central Hotel",
                 "location": "Manhattan",
+                "latitude": 40.7527,
+                "longitude": -73.9772,
                 "price_per_night": 450,
                 "stars": 4.8,
                 "reviews": 2100,
@@ -38,6 +68,8 @@ class HotelDataProvider:
                 "id": "ny002",
                 "name": "Broadway Plaza Hotel",
                 "location": "Theater District",
+                "latitude": 40.7590,
+                "longitude": -73.9845,
                 "price_per_night": 380,
                 "stars": 4.6,
                 "reviews": 1800,
@@ -50,6 +82,8 @@ class HotelDataProvider:
                 "id": "pr001",
                 "name": "Eiffel View Hotel",
                 "location": "7th Arrondissement",
+                "latitude": 48.8570,
+                "longitude": 2.2950,
                 "price_per_night": 400,
                 "stars": 4.5,
                 "reviews": 1500,
@@ -59,44 +93,246 @@ class HotelDataProvider:
                 "nearby": ["Eiffel Tower", "Musée d'Orsay"]
             }]
         }
+        self.mock_attractions = {
+            "london": [
+                {"name": "Hyde Park", "latitude": 51.5073, "longitude": -0.1657},
+                {"name": "Buckingham Palace", "latitude": 51.5014, "longitude": -0.1419},
+                {"name": "London Eye", "latitude": 51.5033, "longitude": -0.1196},
+                {"name": "British Museum", "latitude": 51.5194, "longitude": -0.1270},
+                {"name": "Tower of London", "latitude": 51.5081, "longitude": -0.0759}
+            ],
+            "new york": [
+                {"name": "Central Park", "latitude": 40.7812, "longitude": -73.9665},
+                {"name": "Times Square", "latitude": 40.7580, "longitude": -73.9855},
+                {"name": "Broadway", "latitude": 40.7590, "longitude": -73.9845},
+                {"name": "Empire State Building", "latitude": 40.7484, "longitude": -73.9857},
+                {"name": "Statue of Liberty", "latitude": 40.6892, "longitude": -74.0445}
+            ],
+            "paris": [
+                {"name": "Eiffel Tower", "latitude": 48.8584, "longitude": 2.2945},
+                {"name": "Musée d'Orsay", "latitude": 48.8600, "longitude": 2.3266},
+                {"name": "Louvre Museum", "latitude": 48.8606, "longitude": 2.3376},
+                {"name": "Arc de Triomphe", "latitude": 48.8738, "longitude": 2.2950},
+                {"name": "Notre-Dame", "latitude": 48.8530, "longitude": 2.3499}
+            ],
+            "tokyo": [
+                {"name": "Senso-ji", "latitude": 35.7148, "longitude": 139.7967},
+                {"name": "Tokyo Tower", "latitude": 35.6586, "longitude": 139.7454},
+                {"name": "Shibuya Crossing", "latitude": 35.6595, "longitude": 139.7005}
+            ]
+        }
+        self.amenity_indexes: Dict[str, AmenityIndex] = {}
+        self.catalogs: Dict[str, HotelCatalog] = {}
+        # Geohash grids over hotel and attraction coordinates, updated in place
+        self.hotel_locations = GeohashIndex()
+        self.attractions = GeohashIndex()
+        # Destination and neighbourhood suggestions, ranked by review volume and searches
+        self.autocomplete = AutocompleteIndex()
+        # Typo-tolerant destination names ("Londn", "new-york")
+        self.destination_resolver = DestinationResolver()
+        # Rooms left per night for every hotel and room type
+        self.availability = AvailabilityEngine()
+        for destination, hotels in self.mock_data.items():
+            self._build_indexes(destination, hotels)
+            self._index_locations([], hotels)
+        for destination in KNOWN_DESTINATIONS:
+            self.autocomplete.add(destination.title())
+            self.destination_resolver.add(destination.title())
+        for places in self.mock_attractions.values():
+            for place in places:
+                self.add_attraction(place)
+
+    def subscribe(self, listener: Callable[[str], Any]) -> None:
+        """Register a callback invoked with the destination whenever its hotel data changes"""
+        self._change_listeners.append(listener)
+
+    def update_hotels(self, destination: str, hotels: List[Dict[str, Any]]) -> None:
+        """Replace the hotels for a destination and notify subscribers"""
+        destination_lower = destination.lower()
+        previous = self.mock_data.get(destination_lower, [])
+        self.mock_data[destination_lower] = hotels
+        self._build_indexes(destination_lower, hotels)
+        self._index_locations(previous, hotels)
+        logger.info(f"Updated {len(hotels)} hotels for {destination}")
+        self._notify_change(destination_lower)
+
+    def _build_indexes(self, destination: str, hotels: List[Dict[str, Any]]) -> None:
+        """Rebuild the amenity index and columnar catalog for a destination"""
+        self.amenity_indexes[destination] = AmenityIndex(AMENITY_BITS, hotels)
+        self.catalogs[destination] = HotelCatalog(hotels, AMENITY_BITS)
+        self._index_suggestions(destination, hotels)
+        self._index_inventory(destination, hotels)
+
+    def _index_inventory(self, destination: str, hotels: List[Dict[str, Any]]) -> None:
+        """Load inventory for hotels the engine does not track yet; booked counts are never reset"""
+        for hotel in hotels:
+            if self.availability.tracks(hotel.get("id")):
+                continue
+            for room_type, rooms in hotel.get("inventory", DEFAULT_ROOM_INVENTORY).items():
+                self.availability.set_inventory(hotel.get("id"), room_type, rooms, city=destination)
+
+    def _index_suggestions(self, destination: str, hotels: List[Dict[str, Any]]) -> None:
+        """Add a destination and its hotels' neighbourhoods to the autocomplete index"""
+        display_name = destination.title()
+        self.destination_resolver.add(display_name)
+        self.autocomplete.add(display_name, popularity=sum(hotel.get("reviews", 0) for hotel in hotels))
+        for hotel in hotels:
+            if hotel.get("location"):
+                self.autocomplete.add(hotel["location"], kind="neighbourhood",
+                                      popularity=hotel.get("reviews", 0), destination=display_name)
+
+    def _index_locations(self, previous: List[Dict[str, Any]], hotels: List[Dict[str, Any]]) -> None:
+        """Move the spatial index from one hotel list to another without rebuilding it"""
+        current_ids = {hotel.get("id") for hotel in hotels}
+        for hotel in previous:
+            if hotel.get("id") not in current_ids:
+                self.hotel_locations.remove(hotel.get("id"))
+        for hotel in hotels:
+            coordinates = hotel_coordinates(hotel)
+            if coordinates is None:
+                self.hotel_locations.remove(hotel.get("id"))
+            else:
+                self.hotel_locations.insert(hotel.get("id"), coordinates[0], coordinates[1], hotel)
+
+    def add_attraction(self, place: Dict[str, Any]) -> None:
+        """Index (or move) an attraction; places are keyed by name"""
+        coordinates = hotel_coordinates(place)
+        if coordinates is None:
+            raise ValueError(f"Attraction {place.get('name')} has no coordinates")
+        self.attractions.insert(place["name"], coordinates[0], coordinates[1], place)
+
+    def remove_attraction(self, name: str) -> bool:
+        """Drop an attraction from the index"""
+        return self.attractions.remove(name)
+
+    def _notify_change(self, destination: str) -> None:
+        """Tell subscribers (e.g. the search cache) that a destination's data changed"""
+        for listener in self._change_listeners:
+            try:
+                listener(destination)
+            except Exception as e:
+                logger.error(f"Error notifying data change listener: {str(e)}")
 
     async def get_google_places_hotels(self, destination: str) -> List[Dict[str, Any]]:
         """Return mock hotel data for a destination"""
         logger.info(f"Using mock data for {destination}")
         return self.get_mock_hotels(destination)
 
+    def resolve_destination(self, destination: str) -> str:
+        """Known destination name for possibly misspelled input, or the input unchanged"""
+        return self.destination_resolver.resolve(destination) or destination
+
     def get_mock_hotels(self, destination: str) -> List[Dict[str, Any]]:
         """Get mock hotel data for a destination"""
-        destination_lower = destination.lower()
+        destination_lower = self.resolve_destination(destination).lower()
         if destination_lower in self.mock_data:
             logger.info(f"Found hotels for {destination}")
             return self.mock_data[destination_lower]
         return []
 
-    async def get_coordinates(self, destination: str) -> Any:
-        """Get coordinates for a destination using geopy"""
-        try:
-            location = self.geocoder.geocode(destination)
-            if location:
-                return (location.latitude, location.longitude)
-            return None
-        except GeocoderTimedOut:
-            logger.error(f"Geocoding timeout for destination: {destination}")
-            return None
+    def get_hotels_with_amenities(self, destination: str, amenities: List[str]) -> List[Dict[str, Any]]:
+        """Get hotels for a destination that offer every requested amenity"""
+        index = self.amenity_indexes.get(destination.lower())
+        if index is None:
+            return []
+        return index.match(amenities)
+
+    def search_catalog(self, destination: str, **criteria: Any) -> List[Dict[str, Any]]:
+        """Filter and sort a destination's hotels with vectorized column operations"""
+        catalog = self.catalogs.get(destination.lower())
+        if catalog is None:
+            return []
+        return catalog.search(**criteria)
+
+    def hotels_within(self, latitude: float, longitude: float, radius_km: float,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Hotels within radius_km of a point, nearest first, with their distance"""
+        return [
+            dict(hotel, distance_km=round(distance, 2))
+            for distance, _, hotel in self.hotel_locations.within_radius(latitude, longitude, radius_km, limit)
+        ]
+
+    def hotels_in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Dict[str, Any]]:
+        """Hotels inside a bounding box"""
+        return [hotel for _, hotel in self.hotel_locations.within_bbox(min_lat, min_lon, max_lat, max_lon)]
+
+    def nearby_attractions(self, latitude: float, longitude: float,
+                           radius_km: float = 2.0, limit: int = 3) -> List[str]:
+        """Names of the attractions closest to a point, within radius_km"""
+        return [name for _, name, _ in self.attractions.within_radius(latitude, longitude, radius_km, limit)]
+
+    def filter_by_area(self, hotels: List[Dict[str, Any]], area: Dict[str, Any],
+                       center: Optional[Coordinates] = None) -> List[Dict[str, Any]]:
+        """Keep the hotels inside a sanitized search area (see validators.sanitize_search_area).
+
+        Hotel positions come from the spatial index, or from the hotel's own
+        coordinates when it is not indexed; hotels with neither are dropped.
+        Order is preserved. Radius searches add ``distance_km`` and are
+        centred on ``center`` (the destination's coordinates, from
+        ``get_coordinates``) when the area has no explicit centre.
+        """
+        if "bbox" in area:
+            min_lat, min_lon, max_lat, max_lon = area["bbox"]
+            inside = {key for key, _ in self.hotel_locations.within_bbox(min_lat, min_lon, max_lat, max_lon)}
+            kept = []
+            for hotel in hotels:
+                if hotel.get("id") in inside:
+                    kept.append(hotel)
+                elif hotel.get("id") not in self.hotel_locations:
+                    coordinates = hotel_coordinates(hotel)
+                    if coordinates and min_lat <= coordinates[0] <= max_lat and min_lon <= coordinates[1] <= max_lon:
+                        kept.append(hotel)
+            return kept
+
+        if "latitude" in area:
+            center = (area["latitude"], area["longitude"])
+        elif center is None:
+            raise ValueError("Cannot locate destination for radius search")
+        radius_km = area["radius_km"]
+        distances = {
+            key: distance for distance, key, _ in self.hotel_locations.within_radius(center[0], center[1], radius_km)
+        }
+        kept = []
+        for hotel in hotels:
+            distance = distances.get(hotel.get("id"))
+            if distance is None and hotel.get("id") not in self.hotel_locations:
+                coordinates = hotel_coordinates(hotel)
+                if coordinates is not None:
+                    distance = haversine_km(center[0], center[1], coordinates[0], coordinates[1])
+                    distance = distance if distance <= radius_km else None
+            if distance is not None:
+                kept.append(dict(hotel, distance_km=round(distance, 2)))
+        return kept
+
+    async def get_coordinates(self, destination: str) -> Optional[Coordinates]:
+        """Get (latitude, longitude) for a destination, or None if it cannot be geocoded"""
+        coordinates = self.geocoding.cached(destination)
+        if coordinates is not None:
+            return coordinates
+        # Disk and upstream geocoder lookups block, keep them off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, self.geocoding.lookup, destination)
 
     def transform_google_data(self, content_data: Dict[str, Any], prices_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Transform Google Hotels API data to our format"""
         hotels = []
         try:
+            # Hash join: index prices by hotelId once instead of scanning them per hotel
+            prices_by_id = self._index_prices(prices_data.get("prices", []))
+            missing_prices = 0
+            
             for hotel in content_data.get("hotels", []):
                 hotel_id = hotel.get("id")
-                price_info = next((p for p in prices_data.get("prices", []) if p.get("hotelId") == hotel_id), {})
+                # An entry without an amount is no price at all
+                amount = _price_amount(prices_by_id.get(hotel_id))
+                if amount is None:
+                    missing_prices += 1
                 
                 hotels.append({
                     "id": hotel_id,
                     "name": hotel.get("name", ""),
                     "location": hotel.get("location", {}).get("address", ""),
-                    "price_per_night": price_info.get("price", {}).get("amount", 0),
+                    "price_per_night": amount if amount is not None else 0,
+                    "price_available": amount is not None,
                     "stars": hotel.get("rating", {}).get("overall", 0),
                     "reviews": hotel.get("reviewCount", 0),
                     "image_url": hotel.get("photos", [{}])[0].get("url", ""),
@@ -104,11 +340,38 @@ class HotelDataProvider:
                     "highlights": [h.get("text") for h in hotel.get("highlights", [])],
                     "nearby": [p.get("name") for p in hotel.get("nearbyPlaces", [])]
                 })
+            
+            if missing_prices:
+                logger.warning(f"No price returned for {missing_prices} of {len(hotels)} hotels")
         except Exception as e:
             logger.error(f"Error transforming hotel data: {str(e)}")
         
         return hotels
 
+    def _index_prices(self, prices: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Key price entries by hotelId, keeping the cheapest offer when a hotel is priced more than once.
+
+        An entry with an amount always beats one without.
+        """
+        prices_by_id = {}
+        duplicates = 0
+        for price_info in prices:
+            hotel_id = price_info.get("hotelId")
+            if hotel_id is None:
+                continue
+            current = prices_by_id.get(hotel_id)
+            if current is None:
+                prices_by_id[hotel_id] = price_info
+                continue
+            duplicates += 1
+            amount, current_amount = _price_amount(price_info), _price_amount(current)
+            if amount is not None and (current_amount is None or amount < current_amount):
+                prices_by_id[hotel_id] = price_info
+        
+        if duplicates:
+            logger.warning(f"Ignored {duplicates} duplicate price entries, kept the cheapest per hotel")
+        return prices_by_id
+
     async def get_osm_hotels(self, destination: str) -> List[Dict[str, Any]]:
         """This method can be implemented later for OpenStreetMap integration"""
         return []
@@ -191,18 +454,8 @@ class HotelDataProvider:
         return highlights
 
     def _get_nearby_attractions(self, coords: tuple) -> List[str]:
-        """Get nearby attractions using Google Places API"""
-        try:
-            places_result = self.google_maps.places_nearby(
-                location=coords,
-                radius=2000,  # 2km radius
-                type='tourist_attraction',
-                language='en'
-            )
-            return [place['name'] for place in places_result.get('results', [])[:3]]
-        except Exception as e:
-            logger.error(f"Error fetching nearby attractions: {str(e)}")
-            return []
+        """Get nearby attractions (within 2km) from the local attraction index"""
+        return self.nearby_attractions(coords[0], coords[1], radius_km=2.0, limit=3)
 
     def _get_amenities_from_types(self, types: List[str]) -> List[str]:
         """Extract amenities from place types"""
@@ -231,4 +484,45 @@ class HotelDataProvider:
         elif price_level >= 3:
             return ['Standard', 'Deluxe', 'Suite']
         else:
-            return ['Standard', 'Deluxe'] 
\ No newline at end of file
+            return ['Standard', 'Deluxe'] 
+
+
+class CatalogSearchProvider:
+    """HotelAggregator provider answering from a HotelDataProvider's own hotels.
+
+    Hotels are returned in the shape the aggregator's filters, sorting and
+    deduplication expect (``price``, ``rating``, ``source``), with the
+    catalog fields kept alongside.
+    """
+
+    name = "Hotel catalog"
+
+    def __init__(self, data: HotelDataProvider):
+        self.data = data
+        self.http_client = data.http_client
+
+    async def search_hotels(self, location: str, check_in: Any, check_out: Any, guests: int,
+                            filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        return [self._result(hotel) for hotel in self.data.get_mock_hotels(location)]
+
+    async def get_room_availability(self, hotel_id: str, check_in: Any, check_out: Any,
+                                    guests: int) -> List[Dict[str, Any]]:
+        try:
+            return self.data.availability.room_availability(hotel_id, check_in, check_out)
+        except ValueError:
+            return []
+
+    def _result(self, hotel: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(
+            hotel,
+            source=self.name,
+            price=hotel.get("price_per_night", 0),
+            rating=hotel.get("stars", 0),
+            address=hotel.get("location"),
+            image=hotel.get("image_url")
+        )
+
+def _price_amount(price_info: Optional[Dict[str, Any]]) -> Optional[float]:
+    """The amount of a Google price entry, or None when it has none"""
+    amount = ((price_info or {}).get("price") or {}).get("amount")
+    return amount if isinstance(amount, (int, float)) and not isinstance(amount, bool) else None
@@ -0,0 +1,140 @@
+"""
+Idempotency Keys
+Bounded TTL store of results by client-supplied idempotency key, so a retried request
+returns the original result instead of doing the work again.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Longest Idempotency-Key accepted (a UUID is 36 characters)
+MAX_KEY_LENGTH = 255
+
+class IdempotencyConflictError(ValueError):
+    """An idempotency key was reused for a different request"""
+
+class IdempotencyInProgressError(Exception):
+    """The first attempt for an idempotency key is still running after the wait timed out"""
+
+def validate_idempotency_key(key: Optional[str]) -> Optional[str]:
+    """Stripped key, or None when absent; raises ValueError for malformed keys"""
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+        raise ValueError(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} printable characters")
+    return key
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a JSON-like request payload"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class _Entry:
+    __slots__ = ("fingerprint", "future", "expires_at")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.future: Future = Future()
+        # Set once the result is in; in-flight entries never expire or get evicted
+        self.expires_at: Optional[float] = None
+
+class IdempotencyStore:
+    """Thread-safe record of results by idempotency key.
+
+    The first request for a key runs the work; a request with the same
+    key arriving while it runs waits for that attempt, and one arriving
+    later gets the stored result, for ``ttl`` seconds. A key reused with a
+    different request fingerprint raises ``IdempotencyConflictError``.
+    Results are whatever the work returns, including error responses it
+    chose to return; if the work raises, the waiters see the exception and
+    the key is released so the client can retry. A waiter whose
+    ``timeout`` runs out gets ``IdempotencyInProgressError``. Completed
+    entries are evicted least-recently-used first beyond ``max_entries``.
+
+    Entries live in this process's memory: they are lost on restart and not
+    shared between worker processes.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 86400.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "replays": 0, "waited": 0, "conflicts": 0, "evictions": 0}
+
+    def run(self, key: str, fingerprint: str, work: Callable[[], Any],
+            timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """(result, replayed): run work() once per key, or return the result of the attempt for key"""
+        owner = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                if entry.fingerprint != fingerprint:
+                    self._stats["conflicts"] += 1
+                    logger.warning(f"Idempotency key reused with a different request: {key[:64]}")
+                    raise IdempotencyConflictError("Idempotency-Key was already used for a different request")
+                self._entries.move_to_end(key)
+                self._stats["replays" if entry.future.done() else "waited"] += 1
+            else:
+                entry = self._entries[key] = _Entry(fingerprint)
+                self._stats["executions"] += 1
+                self._evict()
+                owner = True
+        if not owner:
+            try:
+                return entry.future.result(timeout), True
+            except FutureTimeoutError:
+                raise IdempotencyInProgressError("A request with this Idempotency-Key is still being processed") from None
+
+        try:
+            result = work()
+        except BaseException as e:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry.future.set_exception(e)
+            raise
+        with self._lock:
+            entry.expires_at = self._clock() + self.ttl
+        entry.future.set_result(result)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), max_entries=self.max_entries, ttl=self.ttl)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evict(self) -> None:
+        """Drop the least recently used completed entries beyond max_entries (lock held)"""
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        victims = []
+        for key, entry in self._entries.items():
+            if len(victims) == excess:
+                break
+            if entry.expires_at is not None:
+                victims.append(key)
+        for key in victims:
+            del self._entries[key]
+        self._stats["evictions"] += len(victims)
@@ -0,0 +1,271 @@
+"""
+Background Job Queue
+Durable SQLite-backed queue for side effects that must not hold up a request (emails,
+partner notifications, exports), with retries, exponential backoff and dead-lettering.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+QUEUED, RUNNING, DEAD = "queued", "running", "dead"
+
+_COLUMNS = "id, kind, payload, status, attempts, max_attempts, last_error"
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " kind TEXT NOT NULL,"
+    " payload TEXT NOT NULL,"
+    " status TEXT NOT NULL,"
+    " attempts INTEGER NOT NULL DEFAULT 0,"
+    " max_attempts INTEGER NOT NULL,"
+    " run_at REAL NOT NULL,"
+    " locked_until REAL,"
+    " last_error TEXT,"
+    " created_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (status, run_at)"
+)
+
+class JobQueue:
+    """Durable at-least-once job queue shared by threads and processes.
+
+    Jobs are rows in a SQLite database (WAL mode), so every process that
+    opens the same file, such as gunicorn workers or a separate
+    ``python -m app.booking_jobs`` worker, draws from one queue. A worker
+    claims a due job in an immediate transaction and holds it for
+    ``lease_seconds``. A job whose worker died is claimed again once the
+    lease runs out.
+
+    A handler that raises is retried after ``backoff_base * 2 ** (attempt - 1)``
+    seconds, capped at ``backoff_max`` and jittered down by up to half so
+    retries spread out. After ``max_attempts`` failures the job is kept as
+    dead for inspection and ``retry_dead``. Jobs without a registered
+    handler are dead-lettered at once. Finished jobs are deleted. Handlers
+    may run more than once, so they must tolerate repeats.
+
+    Commits use ``synchronous=NORMAL``, so enqueueing costs no fsync. A
+    crash of the process loses nothing. A power loss can drop the last few
+    enqueued jobs, which is acceptable for notifications; the booking itself
+    is in the booking store.
+
+    The queue is not an outbox: a booking is saved in the booking store and
+    its jobs are enqueued afterwards, in a separate commit to a separate
+    database. A crash between the two, or a failed enqueue (logged by the
+    booking paths), leaves a stored booking without its confirmation email
+    or partner notification; those have to be re-queued by hand.
+    """
+
+    def __init__(self,
+                 path: str,
+                 max_attempts: int = 5,
+                 backoff_base: float = 2.0,
+                 backoff_max: float = 600.0,
+                 lease_seconds: float = 60.0,
+                 poll_interval: float = 1.0,
+                 clock: Callable[[], float] = time.time):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._handlers: Dict[str, Handler] = {}
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self._stats = {"completed": 0, "retried": 0, "dead_lettered": 0}
+        for statement in SCHEMA:
+            self._connection().execute(statement)
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """Queue at JOB_QUEUE_PATH (default data/jobs.sqlite3)"""
+        return cls(
+            path=os.getenv("JOB_QUEUE_PATH", os.path.join("data", "jobs.sqlite3")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "5")),
+            backoff_base=float(os.getenv("JOB_BACKOFF_BASE", "2")),
+            backoff_max=float(os.getenv("JOB_BACKOFF_MAX", "600"))
+        )
+
+    def register(self, kind: str, handler: Handler) -> None:
+        """Run handler(payload) for jobs of this kind"""
+        self._handlers[kind] = handler
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], delay: float = 0.0,
+                max_attempts: Optional[int] = None) -> int:
+        """Add a job, due after ``delay`` seconds; returns its id"""
+        now = self._clock()
+        cursor = self._connection().execute(
+            "INSERT INTO jobs (kind, payload, status, max_attempts, run_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(payload, default=str), QUEUED, max_attempts or self.max_attempts, now + delay, now)
+        )
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def run_once(self) -> bool:
+        """Claim and run one due job; returns False when none was due"""
+        job = self._claim()
+        if job is None:
+            return False
+        handler = self._handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind {job['kind']}")
+            handler(job["payload"])
+        except Exception as e:
+            self._failed(job, e, retry=handler is not None)
+        else:
+            self._connection().execute("DELETE FROM jobs WHERE id = ?", (job["id"],))
+            self._count("completed")
+        return True
+
+    def run_until_empty(self, limit: int = 10000) -> int:
+        """Run due jobs until none is left (or ``limit`` ran); returns how many ran"""
+        ran = 0
+        while ran < limit and self.run_once():
+            ran += 1
+        return ran
+
+    def start(self, workers: int = 2) -> None:
+        """Start worker threads that run jobs as they become due"""
+        self._stopping.clear()
+        for number in range(workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+        if workers:
+            logger.info(f"Started {workers} job workers on {self.path}")
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop the worker threads once their current job finishes"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._workers:
+            thread.join(timeout)
+        self._workers = []
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Jobs that exhausted their attempts, oldest first"""
+        rows = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM jobs WHERE status = ? ORDER BY id LIMIT ?",
+            (DEAD, limit)
+        ).fetchall()
+        return [_job(row) for row in rows]
+
+    def retry_dead(self, job_id: int) -> bool:
+        """Queue a dead job again with a fresh set of attempts"""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, attempts = 0, run_at = ?, last_error = NULL WHERE id = ? AND status = ?",
+            (QUEUED, self._clock(), job_id, DEAD)
+        )
+        self._wakeup.set()
+        return cursor.rowcount == 1
+
+    def stats(self) -> Dict[str, Any]:
+        counts = dict(self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({status: counts.get(status, 0) for status in (QUEUED, RUNNING, DEAD)})
+        stats["workers"] = len(self._workers)
+        return stats
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the oldest due job, including ones whose worker's lease ran out"""
+        now = self._clock()
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                f"SELECT {_COLUMNS} FROM jobs"
+                " WHERE (status = ? AND run_at <= ?) OR (status = ? AND locked_until <= ?)"
+                " ORDER BY run_at, id LIMIT 1",
+                (QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_until = ? WHERE id = ?",
+                    (RUNNING, now + self.lease_seconds, row[0])
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        job = _job(row)
+        job["attempts"] += 1
+        return job
+
+    def _failed(self, job: Dict[str, Any], error: Exception, retry: bool) -> None:
+        """Schedule a retry with backoff, or dead-letter the job"""
+        message = f"{type(error).__name__}: {error}"[:1000]
+        db = self._connection()
+        if retry and job["attempts"] < job["max_attempts"]:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (job["attempts"] - 1))
+            delay *= random.uniform(0.5, 1.0)
+            db.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, locked_until = NULL, last_error = ? WHERE id = ?",
+                (QUEUED, self._clock() + delay, message, job["id"])
+            )
+            logger.warning(f"Job {job['id']} ({job['kind']}) failed, retrying in {delay:.1f}s: {message}")
+            self._count("retried")
+            return
+        db.execute(
+            "UPDATE jobs SET status = ?, locked_until = NULL, last_error = ? WHERE id = ?",
+            (DEAD, message, job["id"])
+        )
+        logger.error(f"Job {job['id']} ({job['kind']}) dead-lettered after {job['attempts']} attempts: {message}")
+        self._count("dead_lettered")
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            # Cleared before looking, so a job enqueued meanwhile still wakes this worker
+            self._wakeup.clear()
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"Job worker error: {str(e)}")
+            # Idle: sleep until the next poll, or until a job is enqueued in this process
+            self._wakeup.wait(self.poll_interval)
+
+    def _count(self, field: str) -> None:
+        with self._stats_lock:
+            self._stats[field] += 1
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, in autocommit mode"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+def _job(row: tuple) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "kind": row[1],
+        "payload": json.loads(row[2]),
+        "status": row[3],
+        "attempts": row[4],
+        "max_attempts": row[5],
+        "last_error": row[6]
+    }
@@ -0,0 +1,164 @@
+"""
+Search Result Cache
+Bounded TTL + LRU cache for hotel search results, keyed on sanitized search parameters.
+"""
+
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def normalize_destination(destination: Any) -> str:
+    """Lowercase a destination and collapse its whitespace"""
+    return " ".join(str(destination or "").lower().split())
+
+def make_search_key(params: Dict[str, Any]) -> Tuple:
+    """Build a cache key from the output of validators.sanitize_search_params"""
+    return (
+        normalize_destination(params.get("destination")),
+        params.get("check_in"),
+        params.get("check_out"),
+        params.get("guests"),
+        params.get("price_range"),
+        tuple(sorted(set(params.get("amenities") or []))),
+    )
+
+class SearchResultCache:
+    """Thread-safe result cache with per-entry TTL and LRU eviction.
+
+    Entries are evicted least-recently-used first once ``max_entries`` is
+    reached, and lazily expired ``ttl`` seconds after they were stored.
+    A destination index allows dropping every entry for one destination
+    when its provider data changes. A search still running during that
+    invalidation must not write its stale result back, so callers take a
+    ``generation`` token before searching and pass it to ``set``.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._by_destination: Dict[str, Set[Hashable]] = {}
+        # Bumped by invalidate: per destination, and for the whole cache
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, key: Hashable) -> Tuple[int, int]:
+        """Token to pass to ``set`` for a value computed from now on"""
+        with self._lock:
+            return self._generation_of(key)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[Tuple[int, int]] = None) -> bool:
+        """Store a value, evicting the least recently used entries if full.
+
+        With a ``generation`` token the value is dropped (returning False)
+        when the key's destination was invalidated since the token was taken.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation_of(key):
+                self.stale_writes += 1
+                return False
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._by_destination.setdefault(self._destination_of(key), set()).add(key)
+            return True
+
+    def invalidate(self, destination: Optional[str] = None) -> int:
+        """Drop every entry for a destination, or the whole cache when None"""
+        with self._lock:
+            if destination is None:
+                self._epoch += 1
+                keys = list(self._entries)
+            else:
+                destination_key = normalize_destination(destination)
+                self._generations[destination_key] = self._generations.get(destination_key, 0) + 1
+                keys = list(self._by_destination.get(destination_key, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached searches for {destination or 'all destinations'}")
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries without touching the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._by_destination.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_writes": self.stale_writes,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove a key from the entries and the destination index (lock held)"""
+        self._entries.pop(key, None)
+        destination = self._destination_of(key)
+        keys = self._by_destination.get(destination)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_destination[destination]
+
+    def _generation_of(self, key: Hashable) -> Tuple[int, int]:
+        """Current generation of a key's destination (lock held)"""
+        return (self._epoch, self._generations.get(self._destination_of(key), 0))
+
+    @staticmethod
+    def _destination_of(key: Hashable) -> str:
+        """Keys built by make_search_key lead with the normalized destination"""
+        return key[0] if isinstance(key, tuple) and key else ""
@@ -0,0 +1,44 @@
+import unittest
+from app.amenity_index import AmenityBits, AmenityIndex
+
+class TestAmenityIndex(unittest.TestCase):
+    def setUp(self):
+        self.bits = AmenityBits(["pool", "breakfast", "wifi", "spa"])
+        self.hotels = [
+            {"id": "ld001", "amenities": ["pool", "spa", "wifi", "breakfast"]},
+            {"id": "ny001", "amenities": ["gym", "restaurant", "wifi", "bar"]},
+            {"id": "ny002", "amenities": ["wifi", "restaurant", "bar"]},
+            {"id": "pr001", "amenities": ["breakfast", "wifi", "bar"]}
+        ]
+        self.index = AmenityIndex(self.bits, self.hotels)
+
+    def test_catalog_order_fixes_bits(self):
+        """Catalog amenities get the low bits, data-only amenities follow"""
+        self.assertEqual(self.bits.position("pool"), 0)
+        self.assertEqual(self.bits.position("spa"), 3)
+        self.assertEqual(self.bits.position("gym"), 4)
+        self.assertEqual(self.bits.names(self.index.mask_of("ld001")), ["pool", "breakfast", "wifi", "spa"])
+        self.assertIsNone(self.index.mask_of("xx001"))
+
+    def test_hotel_records_are_not_modified(self):
+        """Indexing leaves the provider's hotel dicts as they were, so nothing extra is serialized"""
+        self.assertEqual([sorted(hotel) for hotel in self.hotels], [["amenities", "id"]] * 4)
+
+    def test_match_requires_every_amenity(self):
+        """Matching ANDs the hotel sets of each required amenity"""
+        self.assertEqual([h["id"] for h in self.index.match(["pool", "spa", "wifi"])], ["ld001"])
+        self.assertEqual([h["id"] for h in self.index.match(["wifi", "bar"])], ["ny001", "ny002", "pr001"])
+        self.assertEqual(len(self.index.match([])), 4)
+
+    def test_unknown_amenity_matches_nothing(self):
+        """A required amenity no hotel has ever offered matches nothing"""
+        self.assertEqual(self.index.match(["wifi", "helipad"]), [])
+        self.assertIsNone(self.bits.position("helipad"))
+
+    def test_count(self):
+        """Posting lists count the hotels offering an amenity"""
+        self.assertEqual(self.index.count("bar"), 3)
+        self.assertEqual(self.index.count("helipad"), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import threading
+import unittest
+from app.booking_ids import (BookingIdGenerator, REFERENCE_LENGTH, decode, encode, normalize_reference,
+                             reference_timestamp)
+from app.validators import validate_booking_reference
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+class TestBookingIdGenerator(unittest.TestCase):
+    def test_references_sort_by_creation_time(self):
+        """References from a later millisecond sort later, also after a clock step back"""
+        clock = FakeClock()
+        generator = BookingIdGenerator(clock=clock)
+        first = [generator.new() for _ in range(100)]
+        clock.now += 0.002
+        second = [generator.new() for _ in range(100)]
+        clock.now -= 1
+        third = [generator.new() for _ in range(100)]
+        self.assertLess(max(first), min(second))
+        self.assertTrue(all(reference_timestamp(reference) == 1_700_000_000.002 for reference in third))
+        references = first + second + third
+        self.assertEqual(len(set(references)), len(references))
+        self.assertTrue(all(len(reference) == REFERENCE_LENGTH for reference in references))
+        self.assertAlmostEqual(reference_timestamp(first[0]), 1_700_000_000.0, places=3)
+
+    def test_neighbours_are_not_guessable(self):
+        """References made in the same millisecond do not sit next to each other"""
+        generator = BookingIdGenerator(clock=FakeClock())
+        values = sorted(decode(generator.new()) for _ in range(1000))
+        self.assertGreater(min(b - a for a, b in zip(values, values[1:])), 1 << 32)
+
+    def test_unique_across_threads(self):
+        """Threads sharing a generator never get the same reference"""
+        generator = BookingIdGenerator()
+        results = [[] for _ in range(8)]
+
+        def make(bucket):
+            bucket.extend(generator.new() for _ in range(5000))
+
+        threads = [threading.Thread(target=make, args=(bucket,)) for bucket in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        references = [reference for bucket in results for reference in bucket]
+        self.assertEqual(len(set(references)), len(references))
+
+    def test_normalization(self):
+        """Typed references are case-insensitive and read I, L and O as digits"""
+        reference = encode(0x0123456789ABCDEF)
+        self.assertEqual(decode(reference), 0x0123456789ABCDEF)
+        self.assertEqual(normalize_reference(reference.lower()), reference)
+        self.assertEqual(normalize_reference("0" * 25 + "1"), normalize_reference("O" * 25 + "l"))
+        for bad in ("", "SHORT", "U" * REFERENCE_LENGTH):
+            with self.assertRaises(ValueError):
+                normalize_reference(bad)
+        # References from before sortable IDs still resolve
+        self.assertEqual(validate_booking_reference(" ab12cd34 "), "AB12CD34")
+
+if __name__ == '__main__':
+    unittest.main()
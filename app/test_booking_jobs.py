@@ -0,0 +1,184 @@
+import json
+import os
+import socketserver
+import sqlite3
+import tempfile
+import threading
+import unittest
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.booking_jobs import BookingNotifier, CONFIRMATION_EMAIL
+from app.booking_store import BookingStore
+from app.hotel_booking_system_v2 import IntegrationAgent
+from app.job_queue import JobQueue
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough SMTP to accept messages from smtplib and keep them"""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages = []
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.wfile.write(b"220 localhost stand-in\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.strip().upper()
+            if command.startswith(b"DATA"):
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                data = []
+                for body_line in iter(self.rfile.readline, b""):
+                    if body_line == b".\r\n":
+                        break
+                    data.append(body_line[1:] if body_line.startswith(b"..") else body_line)
+                self.server.messages.append(message_from_bytes(b"".join(data)))
+                self.wfile.write(b"250 Queued\r\n")
+            elif command.startswith(b"QUIT"):
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                # EHLO, MAIL FROM, RCPT TO, RSET, NOOP
+                self.wfile.write(b"250 OK\r\n")
+
+class WebhookStandIn(ThreadingHTTPServer):
+    """Records POSTs and answers with queued status codes (200 once they run out)"""
+    daemon_threads = True
+
+    def __init__(self, statuses=()):
+        super().__init__(("127.0.0.1", 0), _WebhookHandler)
+        self.statuses = list(statuses)
+        self.requests = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/bookings"
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.server.requests.append((status, dict(self.headers), json.loads(body)))
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+BOOKING = {
+    "reference": "01J9Z8Q4W5E6R7T8Y9U0I1O2P3",
+    "hotel_id": "ld001",
+    "room_type": "Deluxe",
+    "check_in": "2025-05-01",
+    "check_out": "2025-05-04",
+    "name": "Ada Lovelace",
+    "email": "ada@example.com"
+}
+
+class TestBookingNotifier(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.queue = JobQueue(os.path.join(self.directory.name, "jobs.sqlite3"), clock=self.clock)
+        self.smtp = serve(SMTPStandIn())
+        self.webhook = serve(WebhookStandIn(statuses=[503]))
+        self.audit_path = os.path.join(self.directory.name, "audit", "bookings.jsonl")
+        self.notifier = BookingNotifier(
+            self.queue,
+            smtp_host="127.0.0.1",
+            smtp_port=self.smtp.server_address[1],
+            webhook_url=self.webhook.url,
+            audit_path=self.audit_path
+        )
+
+    def tearDown(self):
+        for server in (self.smtp, self.webhook):
+            server.shutdown()
+            server.server_close()
+        self.directory.cleanup()
+
+    def test_side_effects_run_off_the_request_path(self):
+        """Enqueueing does no I/O; the workers send the email, retry the webhook and export"""
+        self.assertEqual(len(self.notifier.enqueue(BOOKING)), 3)
+        self.assertEqual((self.smtp.messages, self.webhook.requests), ([], []))
+
+        self.queue.run_until_empty()
+        self.assertEqual(len(self.smtp.messages), 1)
+        email = self.smtp.messages[0]
+        self.assertEqual(email["To"], "ada@example.com")
+        self.assertIn(BOOKING["reference"], email["Subject"])
+        self.assertIn("Deluxe", email.get_payload())
+
+        # The partner answered 503 once; the retry after the backoff gets through
+        self.assertEqual([status for status, _, _ in self.webhook.requests], [503])
+        self.clock.now += self.queue.backoff_base
+        self.queue.run_until_empty()
+        status, headers, body = self.webhook.requests[-1]
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Idempotency-Key"], BOOKING["reference"])
+        self.assertEqual(body, {"event": "booking.confirmed", "booking": BOOKING})
+
+        with open(self.audit_path, encoding="utf-8") as export:
+            self.assertEqual([json.loads(line)["booking"]["reference"] for line in export], [BOOKING["reference"]])
+        self.assertEqual(self.queue.stats()["completed"], 3)
+
+    def test_unreachable_smtp_is_dead_lettered(self):
+        """An email that keeps failing ends up as a dead letter instead of being dropped"""
+        self.notifier.smtp_port = 1
+        self.notifier.webhook_url = self.notifier.audit_path = None
+        self.notifier.enqueue(BOOKING)
+        for _ in range(self.queue.max_attempts):
+            self.queue.run_until_empty()
+            self.clock.now += self.queue.backoff_max
+        dead = self.queue.dead_letters()
+        self.assertEqual([job["kind"] for job in dead], [CONFIRMATION_EMAIL])
+        self.assertEqual(dead[0]["payload"], BOOKING)
+
+    def test_only_configured_side_effects_are_queued(self):
+        """Bookings without an email address, or a notifier without SMTP, skip the email"""
+        self.webhook.statuses = []
+        self.assertEqual(len(self.notifier.enqueue(dict(BOOKING, email=None))), 2)
+        self.queue.run_until_empty()
+        self.assertEqual(self.smtp.messages, [])
+        self.assertEqual([status for status, _, _ in self.webhook.requests], [200])
+        self.assertEqual(self.queue.stats()["queued"], 0)
+
+        webhook_only = JobQueue(os.path.join(self.directory.name, "webhook-jobs.sqlite3"))
+        self.assertEqual(len(BookingNotifier(webhook_only, webhook_url=self.webhook.url).enqueue(BOOKING)), 1)
+
+class LockedQueueNotifier:
+    def enqueue(self, booking):
+        raise sqlite3.OperationalError("database is locked")
+
+class TestProcessBookingJobs(unittest.TestCase):
+    def test_failed_enqueue_does_not_fail_a_stored_booking(self):
+        """process_booking reports the booking it stored even when its jobs cannot be queued"""
+        with tempfile.TemporaryDirectory() as directory:
+            store = BookingStore(os.path.join(directory, "bookings.sqlite3"))
+            try:
+                agent = IntegrationAgent(api_key="test_api_key", store=store, notifier=LockedQueueNotifier())
+                with self.assertLogs("app.hotel_booking_system_v2", "ERROR"):
+                    booking = agent.process_booking("ld001", {"check_in": "2025-05-01", "check_out": "2025-05-04", "adults": 2})
+                self.assertEqual(store.get(booking["reference"])["status"], "confirmed")
+            finally:
+                store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from app.booking_store import BookingStore, DuplicateBookingError, SaveTimeoutError
+
+def make_booking(reference, hotel_id="ld001", check_in="2025-05-01", check_out="2025-05-04"):
+    return {
+        "reference": reference,
+        "hotel_id": hotel_id,
+        "check_in": check_in,
+        "check_out": check_out,
+        "status": "confirmed",
+        "created_at": "2025-04-01T10:00:00",
+        "guests": {"adults": 2, "children": 0}
+    }
+
+class TestBookingStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "bookings.sqlite3")
+        self.store = BookingStore(self.path, max_delay=0.01)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_save_and_query_by_reference_hotel_and_date(self):
+        """Saved bookings can be read back by reference, hotel stay overlap and check-in date"""
+        self.store.save(make_booking("A1"))
+        self.store.save(make_booking("A2", check_in="2025-05-10", check_out="2025-05-12"))
+        self.store.save(make_booking("B1", hotel_id="pr001"))
+        self.assertEqual(self.store.get("A1")["guests"], {"adults": 2, "children": 0})
+        self.assertIsNone(self.store.get("missing"))
+        self.assertEqual([b["reference"] for b in self.store.for_hotel("ld001")], ["A1", "A2"])
+        self.assertEqual([b["reference"] for b in self.store.for_hotel("ld001", "2025-05-03", "2025-05-05")], ["A1"])
+        self.assertEqual([b["reference"] for b in self.store.checking_in("2025-05-01")], ["A1", "B1"])
+        # Stays still running on a day, for rebuilding inventory after a restart
+        self.assertEqual([b["reference"] for b in self.store.staying_after("2025-05-04")], ["A2"])
+
+    def test_concurrent_saves_share_commits(self):
+        """Bookings from many threads are grouped into fewer transactions"""
+        threads = [
+            threading.Thread(target=self.store.save, args=(make_booking(f"T{i}"),))
+            for i in range(40)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = self.store.stats()
+        self.assertEqual(stats["bookings"], 40)
+        self.assertLess(stats["commits"], 40)
+        self.assertEqual(len(self.store.for_hotel("ld001")), 40)
+
+    def test_duplicate_fails_alone(self):
+        """A duplicate reference fails without affecting other bookings"""
+        self.store.save(make_booking("D1"))
+        with self.assertRaises(DuplicateBookingError) as raised:
+            self.store.save(make_booking("D1"))
+        self.assertNotIn("constraint", str(raised.exception))
+        self.store.save(make_booking("D2"))
+        self.assertEqual(self.store.stats()["failed"], 1)
+
+    def test_other_constraint_failures_are_not_duplicates(self):
+        """A row the schema rejects for another reason fails as itself, not as a duplicate"""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.store.save(dict(make_booking("N1"), status=None))
+        self.assertIsNone(self.store.get("N1"))
+
+    def test_save_many_is_atomic(self):
+        """A batch with one bad booking stores none of them"""
+        self.store.save(make_booking("M1"))
+        with self.assertRaises(DuplicateBookingError):
+            self.store.save_many([make_booking("M2"), make_booking("M1")])
+        self.assertIsNone(self.store.get("M2"))
+        with self.assertRaises(ValueError):
+            self.store.save_many([make_booking("M3", hotel_id="")])
+
+    def test_bookings_survive_reopen(self):
+        """Committed bookings are still there after the store is reopened"""
+        self.store.save(make_booking("R1"))
+        self.store.close()
+        self.assertEqual(sqlite3.connect(self.path).execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.store = BookingStore(self.path)
+        self.assertEqual(self.store.get("R1")["reference"], "R1")
+        with self.assertRaises(RuntimeError):
+            closed = BookingStore(self.path)
+            closed.close()
+            closed.save(make_booking("R2"))
+
+    def test_timed_out_save_reports_its_outcome(self):
+        """A save that outlives its timeout can still be committed, and says so when it is"""
+        self.store.close()
+        self.store = BookingStore(self.path, max_delay=0.3)
+        with self.assertRaises(SaveTimeoutError) as raised:
+            self.store.save(make_booking("S1"), timeout=0.01)
+        self.assertIsNone(raised.exception.outcome.result(timeout=5))
+        self.assertEqual(self.store.get("S1")["reference"], "S1")
+
+if __name__ == '__main__':
+    unittest.main()
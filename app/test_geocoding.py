@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from app.geocoding import GeocodingCache, rate_limited
+from app.hotel_providers import HotelDataProvider
+
+class StubGeocoder:
+    """Local geocoder stand-in that counts lookups"""
+    def __init__(self, places):
+        self.places = places
+        self.calls = []
+
+    def __call__(self, query):
+        self.calls.append(query)
+        if query == "offline":
+            raise TimeoutError("geocoder timed out")
+        return self.places.get(query.lower())
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestGeocodingCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "geo", "geocoding.sqlite3")
+        self.geocoder = StubGeocoder({"berlin": (52.52, 13.405)})
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_cache(self, **kwargs):
+        cache = GeocodingCache(self.path, geocoder=self.geocoder, clock=self.clock, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_known_destinations_are_seeded(self):
+        """Listed destinations resolve without calling the geocoder"""
+        cache = self.make_cache()
+        self.assertEqual(cache.lookup("  New York "), (40.7128, -74.0060))
+        self.assertEqual(self.geocoder.calls, [])
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_repeat_lookups_stay_in_memory(self):
+        """A geocoded destination is served from memory afterwards"""
+        cache = self.make_cache()
+        self.assertEqual(cache.lookup("Berlin"), (52.52, 13.405))
+        self.assertEqual(cache.cached("berlin"), (52.52, 13.405))
+        self.assertEqual(cache.lookup("BERLIN"), (52.52, 13.405))
+        self.assertEqual(self.geocoder.calls, ["Berlin"])
+        self.assertEqual(cache.stats()["memory_hits"], 2)
+
+    def test_store_survives_restart(self):
+        """A new cache on the same file does not geocode again"""
+        self.make_cache().lookup("Berlin")
+        restarted = self.make_cache()
+        self.assertIsNone(restarted.cached("Berlin"))
+        self.assertEqual(restarted.lookup("Berlin"), (52.52, 13.405))
+        self.assertEqual(len(self.geocoder.calls), 1)
+
+    def test_lru_eviction(self):
+        """The memory tier is bounded; evicted entries come back from disk"""
+        cache = self.make_cache(max_entries=1)
+        cache.lookup("Berlin")
+        cache.lookup("Paris")
+        self.assertIsNone(cache.cached("Berlin"))
+        self.assertEqual(cache.lookup("Berlin"), (52.52, 13.405))
+        self.assertEqual(len(self.geocoder.calls), 1)
+
+    def test_not_found_is_cached_until_ttl(self):
+        """Unknown places are not geocoded again until the negative TTL passes"""
+        cache = self.make_cache(negative_ttl=60)
+        self.assertIsNone(cache.lookup("Atlantis"))
+        self.assertIsNone(cache.lookup("Atlantis"))
+        self.assertEqual(len(self.geocoder.calls), 1)
+        self.clock.now += 61
+        cache.lookup("Atlantis")
+        self.assertEqual(len(self.geocoder.calls), 2)
+
+    def test_geocoder_errors_are_not_cached(self):
+        """A failing geocoder yields None and is retried on the next lookup"""
+        cache = self.make_cache()
+        self.assertIsNone(cache.lookup("offline"))
+        self.assertIsNone(cache.lookup("offline"))
+        self.assertEqual(len(self.geocoder.calls), 2)
+        self.assertEqual(cache.stats()["geocoder_errors"], 2)
+
+    def test_concurrent_misses_share_one_call(self):
+        """Lookups of a destination that is already being geocoded wait for that answer"""
+        release = threading.Event()
+        geocoder = self.geocoder
+
+        def slow_geocoder(query):
+            release.wait(5)
+            return geocoder(query)
+
+        cache = GeocodingCache(self.path, geocoder=slow_geocoder, clock=self.clock)
+        self.addCleanup(cache.close)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            lookups = [pool.submit(cache.lookup, name) for name in ["Berlin", "berlin ", "BERLIN", " Berlin"] * 2]
+            for _ in range(500):
+                if cache.stats()["coalesced"] == 7:
+                    break
+                threading.Event().wait(0.01)
+            release.set()
+            self.assertEqual({lookup.result() for lookup in lookups}, {(52.52, 13.405)})
+        self.assertEqual(len(self.geocoder.calls), 1)
+        self.assertEqual((cache.stats()["geocoder_calls"], cache.stats()["coalesced"]), (1, 7))
+
+    def test_rate_limited_geocoder_spaces_calls(self):
+        """Calls start at least the minimum interval apart"""
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        geocode = rate_limited(self.geocoder, 1.0, clock=lambda: now[0], sleep=sleep)
+        geocode("Berlin")
+        now[0] += 0.25
+        geocode("Paris")
+        now[0] += 3
+        geocode("Rome")
+        self.assertEqual(sleeps, [0.75])
+        self.assertEqual(self.geocoder.calls, ["Berlin", "Paris", "Rome"])
+
+    def test_provider_does_not_create_a_store_by_default(self):
+        """HotelDataProvider keeps geocodes in memory and never calls out unless given a cache"""
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            provider = HotelDataProvider()
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(os.listdir(self.directory.name), [])
+        self.assertIsNone(provider.geocoding.geocoder)
+        self.assertEqual(provider.geocoding.lookup("Paris"), (48.8566, 2.3522))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from app.amenity_index import AmenityBits
+from app.hotel_catalog import HotelCatalog
+
+class TestHotelCatalog(unittest.TestCase):
+    def setUp(self):
+        self.bits = AmenityBits(["pool", "breakfast", "wifi", "spa"])
+        self.hotels = [
+            {"id": "h0", "price_per_night": 300, "stars": 5, "rating": 4.8, "reviews": 900,
+             "amenities": ["pool", "spa", "wifi"], "free_cancellation": True},
+            {"id": "h1", "price_per_night": 120, "stars": 3, "reviews": 40,
+             "amenities": ["wifi"], "payment_required": False},
+            {"id": "h2", "price": 200, "stars": 4, "rating": 4.1, "reviews": 310,
+             "amenities": ["wifi", "breakfast"], "free_cancellation": True},
+            {"id": "h3", "price_per_night": 120, "stars": 4, "rating": 4.5, "reviews": 75,
+             "amenities": ["pool", "wifi", "gym"]},
+            {"id": "h4", "price_per_night": 120, "stars": 2, "rating": 3.9, "reviews": 12, "amenities": []}
+        ]
+        self.catalog = HotelCatalog(self.hotels, self.bits)
+
+    def ids(self, rows):
+        return [self.hotels[row]["id"] for row in rows]
+
+    def test_filters_combine(self):
+        """Every criterion narrows the match, and amenities must all be present"""
+        self.assertEqual(self.ids(self.catalog.filter(max_price=200, min_stars=3)), ["h1", "h2", "h3"])
+        self.assertEqual(self.ids(self.catalog.filter(min_rating=4.5)), ["h0", "h3"])
+        self.assertEqual(self.ids(self.catalog.filter(amenities=["pool", "wifi"])), ["h0", "h3"])
+        self.assertEqual(self.ids(self.catalog.filter(free_cancellation_only=True, max_stars=4)), ["h2"])
+        self.assertEqual(self.ids(self.catalog.filter(no_payment_only=True)), ["h1"])
+        self.assertEqual(self.ids(self.catalog.filter(amenities=["helipad"])), [])
+
+    def test_limited_sort_keeps_row_order_among_ties(self):
+        """A limit cutting through tied keys keeps the earliest rows, as the full sort would"""
+        rows = self.catalog.filter()
+        full = self.ids(self.catalog.sort(rows))
+        self.assertEqual(full, ["h1", "h3", "h4", "h2", "h0"])
+        for limit in range(len(rows) + 1):
+            self.assertEqual(self.ids(self.catalog.sort(rows, limit=limit)), full[:limit])
+        # Rows given out of order still tie-break by row, not by position
+        self.assertEqual(self.ids(self.catalog.sort(np.array([4, 3, 1]), limit=2)), ["h1", "h3"])
+        self.assertEqual(self.ids(self.catalog.sort(rows, by="stars", descending=True, limit=3)), ["h0", "h2", "h3"])
+        with self.assertRaises(ValueError):
+            self.catalog.sort(rows, by="name")
+
+    def test_search_returns_records(self):
+        """search filters, sorts and returns the original records"""
+        found = self.catalog.search(sort_by="reviews", descending=True, limit=2, amenities=["wifi"])
+        self.assertEqual([hotel["id"] for hotel in found], ["h0", "h2"])
+        self.assertIs(found[0], self.hotels[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from app.geocoding import GeocodingCache
+from app.hotel_providers import HotelDataProvider
+
+def google_hotel(hotel_id):
+    return {"id": hotel_id, "name": f"Hotel {hotel_id}", "location": {"address": "1 Main St"}}
+
+class TestTransformGoogleData(unittest.TestCase):
+    def setUp(self):
+        self.provider = HotelDataProvider(geocoding=GeocodingCache())
+
+    def transform(self, prices):
+        content = {"hotels": [google_hotel("g1"), google_hotel("g2"), google_hotel("g3")]}
+        return {hotel["id"]: hotel for hotel in self.provider.transform_google_data(content, {"prices": prices})}
+
+    def test_duplicate_prices_keep_the_cheapest(self):
+        """A hotel priced several times gets its cheapest amount, in any order"""
+        with self.assertLogs("app.hotel_providers", "WARNING") as logs:
+            hotels = self.transform([
+                {"hotelId": "g1", "price": {"amount": 180}},
+                {"hotelId": "g1", "price": {"amount": 150}},
+                {"hotelId": "g1", "price": {"amount": 210}},
+                {"hotelId": "g2", "price": {"amount": 95}},
+                {"hotelId": "g3", "price": {"amount": 120}}
+            ])
+        self.assertEqual({hotel_id: hotel["price_per_night"] for hotel_id, hotel in hotels.items()},
+                         {"g1": 150, "g2": 95, "g3": 120})
+        self.assertTrue(all(hotel["price_available"] for hotel in hotels.values()))
+        self.assertIn("Ignored 2 duplicate price entries", logs.output[0])
+
+    def test_missing_prices_are_flagged(self):
+        """Hotels without a price entry, or whose entries carry no amount, are marked unpriced"""
+        with self.assertLogs("app.hotel_providers", "WARNING") as logs:
+            hotels = self.transform([
+                {"hotelId": "g2", "price": {}},
+                {"hotelId": "g3", "price": {"amount": None}},
+                {"hotelId": "g3", "price": {"amount": 130}}
+            ])
+        self.assertEqual((hotels["g1"]["price_per_night"], hotels["g1"]["price_available"]), (0, False))
+        self.assertEqual((hotels["g2"]["price_per_night"], hotels["g2"]["price_available"]), (0, False))
+        self.assertEqual((hotels["g3"]["price_per_night"], hotels["g3"]["price_available"]), (130, True))
+        self.assertIn("No price returned for 2 of 3 hotels", logs.output[-1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import threading
+import unittest
+from app.hotel_booking_system_v2 import IntegrationAgent
+from app.idempotency import IdempotencyStore, IdempotencyConflictError, IdempotencyInProgressError, request_fingerprint, validate_idempotency_key
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestIdempotencyStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = IdempotencyStore(max_entries=3, ttl=60, clock=self.clock)
+        self.calls = 0
+
+    def work(self, result="booked"):
+        def run():
+            self.calls += 1
+            return f"{result}-{self.calls}"
+        return run
+
+    def test_replay_returns_original_result(self):
+        """A repeated key gets the first result without running the work again"""
+        fingerprint = request_fingerprint({"hotel_id": "ld001", "guests": 2})
+        self.assertEqual(self.store.run("k1", fingerprint, self.work()), ("booked-1", False))
+        # Key order in the payload does not change the fingerprint
+        same = request_fingerprint({"guests": 2, "hotel_id": "ld001"})
+        self.assertEqual(self.store.run("k1", same, self.work()), ("booked-1", True))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.store.stats()["replays"], 1)
+
+    def test_key_reused_for_different_request(self):
+        """A key cannot be replayed with a different payload"""
+        self.store.run("k1", request_fingerprint({"hotel_id": "ld001"}), self.work())
+        with self.assertRaises(IdempotencyConflictError):
+            self.store.run("k1", request_fingerprint({"hotel_id": "ld002"}), self.work())
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_duplicates_wait_for_in_flight_attempt(self):
+        """Duplicates arriving mid-flight block until the first attempt finishes and share its result"""
+        started, finish = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            finish.wait(5)
+            self.calls += 1
+            return "booked"
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(self.store.run("k1", "f", slow)))
+        first.start()
+        started.wait(5)
+        duplicates = [threading.Thread(target=lambda: results.append(self.store.run("k1", "f", slow)))
+                      for _ in range(5)]
+        for thread in duplicates:
+            thread.start()
+        finish.set()
+        for thread in [first] + duplicates:
+            thread.join(5)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(results), [("booked", False)] + [("booked", True)] * 5)
+        self.assertEqual(self.store.stats()["waited"] + self.store.stats()["replays"], 5)
+
+    def test_wait_timeout_reports_in_progress(self):
+        """A duplicate that gives up waiting is told the first attempt is still running"""
+        started, finish = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            finish.wait(5)
+            return "booked"
+
+        first = threading.Thread(target=self.store.run, args=("k1", "f", slow))
+        first.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(IdempotencyInProgressError):
+                self.store.run("k1", "f", slow, timeout=0.01)
+        finally:
+            finish.set()
+            first.join(5)
+        self.assertEqual(self.store.run("k1", "f", slow), ("booked", True))
+
+    def test_failure_releases_key(self):
+        """Work that raises is not remembered, so the client can retry"""
+        def fail():
+            raise RuntimeError("store unavailable")
+
+        with self.assertRaises(RuntimeError):
+            self.store.run("k1", "f", fail)
+        self.assertEqual(self.store.run("k1", "f", self.work()), ("booked-1", False))
+
+    def test_ttl_and_bound(self):
+        """Results expire after the TTL, and the oldest completed keys are evicted beyond max_entries"""
+        self.store.run("k1", "f", self.work())
+        self.clock.now += 61
+        self.assertEqual(self.store.run("k1", "f", self.work()), ("booked-2", False))
+        for key in ("k2", "k3", "k4"):
+            self.store.run(key, "f", self.work())
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.stats()["evictions"], 1)
+        # k1 was the least recently used, so it runs again
+        self.assertEqual(self.store.run("k1", "f", self.work())[1], False)
+
+    def test_key_validation(self):
+        """Keys are stripped; empty, oversized and non-printable keys are rejected"""
+        self.assertIsNone(validate_idempotency_key(None))
+        self.assertEqual(validate_idempotency_key(" abc-123 "), "abc-123")
+        for key in ("", "   ", "x" * 256, "bad\nkey"):
+            with self.assertRaises(ValueError):
+                validate_idempotency_key(key)
+
+class TestIntegrationAgentIdempotency(unittest.TestCase):
+    def test_process_booking_replays(self):
+        """process_booking returns the first booking for a repeated idempotency key"""
+        agent = IntegrationAgent(api_key="test_api_key")
+        details = {"check_in": "2025-05-01", "check_out": "2025-05-03", "adults": 2}
+        first = agent.process_booking("ld001", details, idempotency_key="retry-1")
+        self.assertIs(agent.process_booking("ld001", details, idempotency_key="retry-1"), first)
+        with self.assertRaises(IdempotencyConflictError):
+            agent.process_booking("ld002", details, idempotency_key="retry-1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from app.job_queue import JobQueue
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "jobs.sqlite3")
+        self.clock = FakeClock()
+        self.queue = JobQueue(self.path, max_attempts=3, backoff_base=10, backoff_max=25, clock=self.clock)
+        self.seen = []
+
+    def tearDown(self):
+        self.queue.stop()
+        self.directory.cleanup()
+
+    def test_jobs_run_once_and_are_removed(self):
+        """A successful job runs with its payload and leaves the queue"""
+        self.queue.register("email", self.seen.append)
+        self.queue.enqueue("email", {"reference": "A1"})
+        self.queue.enqueue("email", {"reference": "A2"}, delay=5)
+        self.assertEqual(self.queue.run_until_empty(), 1)
+        self.clock.now += 5
+        self.assertEqual(self.queue.run_until_empty(), 1)
+        self.assertEqual(self.seen, [{"reference": "A1"}, {"reference": "A2"}])
+        self.assertEqual(self.queue.stats()["queued"], 0)
+        self.assertEqual(self.queue.stats()["completed"], 2)
+
+    def test_retries_back_off_then_dead_letter(self):
+        """Failures are retried after growing delays, then kept as dead letters"""
+        def flaky(payload):
+            self.seen.append(self.clock.now)
+            raise ConnectionError("partner down")
+
+        self.queue.register("webhook", flaky)
+        job_id = self.queue.enqueue("webhook", {"reference": "A1"})
+        self.queue.run_until_empty()
+        # Not due again until the backoff (10s, jittered down to at least 5s) passes
+        self.clock.now += 4.9
+        self.assertEqual(self.queue.run_until_empty(), 0)
+        self.clock.now += 5.1
+        self.assertEqual(self.queue.run_until_empty(), 1)
+        # Second retry waits at most the 25s cap
+        self.clock.now += 25
+        self.assertEqual(self.queue.run_until_empty(), 1)
+        self.clock.now += 1000
+        self.assertEqual(self.queue.run_until_empty(), 0)
+        self.assertEqual(len(self.seen), 3)
+
+        dead = self.queue.dead_letters()
+        self.assertEqual([(job["id"], job["attempts"]) for job in dead], [(job_id, 3)])
+        self.assertEqual(dead[0]["last_error"], "ConnectionError: partner down")
+        self.assertEqual(self.queue.stats()["dead"], 1)
+
+        self.queue.register("webhook", self.seen.append)
+        self.assertTrue(self.queue.retry_dead(job_id))
+        self.assertEqual(self.queue.run_until_empty(), 1)
+        self.assertEqual(self.queue.dead_letters(), [])
+
+    def test_unknown_kind_is_dead_lettered(self):
+        """Jobs nobody handles are not retried"""
+        self.queue.enqueue("fax", {})
+        self.queue.run_until_empty()
+        self.assertEqual(self.queue.dead_letters()[0]["attempts"], 1)
+
+    def test_expired_lease_is_reclaimed(self):
+        """A job whose worker died mid-run is picked up again after the lease"""
+        self.queue.register("email", self.seen.append)
+        self.queue.enqueue("email", {"reference": "A1"})
+        self.assertIsNotNone(self.queue._claim())
+        self.assertEqual(self.queue.run_until_empty(), 0)
+        self.clock.now += self.queue.lease_seconds
+        self.assertEqual(self.queue.run_until_empty(), 1)
+        self.assertEqual(self.seen, [{"reference": "A1"}])
+
+    def test_queues_sharing_a_file_split_the_work(self):
+        """Workers of several queue instances (as in several processes) run each job exactly once"""
+        other = JobQueue(self.path)
+        first = JobQueue(self.path, poll_interval=0.01)
+        done = []
+        lock = threading.Lock()
+
+        def record(payload):
+            with lock:
+                done.append(payload["n"])
+
+        for queue in (first, other):
+            queue.register("audit", record)
+        for n in range(200):
+            (first if n % 2 else other).enqueue("audit", {"n": n})
+        first.start(workers=3)
+        other.poll_interval = 0.01
+        other.start(workers=3)
+        deadline = time.monotonic() + 10
+        while len(done) < 200 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        first.stop()
+        other.stop()
+        self.assertEqual(sorted(done), list(range(200)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,289 @@
+import base64
+import importlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+
+main = None
+_directory = None
+
+def setUpModule():
+    """Import the Flask app the way the WSGI entrypoint does, with its state in a scratch directory"""
+    global main, _directory
+    _directory = tempfile.TemporaryDirectory()
+    os.environ.setdefault("BOOKING_API_KEY", "test")
+    os.environ["BOOKING_DB_PATH"] = os.path.join(_directory.name, "bookings.sqlite3")
+    os.environ["JOB_QUEUE_PATH"] = os.path.join(_directory.name, "jobs.sqlite3")
+    os.environ["GEOCODE_CACHE_PATH"] = os.path.join(_directory.name, "geocoding.sqlite3")
+    os.environ["JOB_WORKERS"] = "0"
+    main = importlib.import_module("main")
+
+def tearDownModule():
+    _directory.cleanup()
+
+def stay(days_ahead=30, nights=2):
+    check_in = date.today() + timedelta(days=days_ahead)
+    return check_in.isoformat(), (check_in + timedelta(days=nights)).isoformat()
+
+def booking(days_ahead=30, **fields):
+    check_in, check_out = stay(days_ahead)
+    return dict({
+        "hotel_id": "ld001",
+        "check_in": check_in,
+        "check_out": check_out,
+        "guests": 2,
+        "room_type": "Standard",
+        "name": "Ada Lovelace",
+        "email": "ada@example.com",
+        "phone": "+442071838750",
+        "destination": "London",
+        "adults": 2,
+        "children": 0,
+        "preferences": {"wifi": True}
+    }, **fields)
+
+class TestApp(unittest.TestCase):
+    def setUp(self):
+        self.client = main.app.test_client()
+        self.latency = main.booking_agent.simulated_latency
+        main.booking_agent.simulated_latency = 0.05
+
+    def tearDown(self):
+        main.booking_agent.simulated_latency = self.latency
+
+    def test_search_returns_hotels_and_caches_them(self):
+        """/api/search answers from the agent once, then from the result cache"""
+        check_in, check_out = stay(days_ahead=40)
+        body = {"destination": "London", "check_in": check_in, "check_out": check_out,
+                "guests": 2, "amenities": ["pool"]}
+        hits = main.search_cache.stats()["hits"]
+        first = self.client.post("/api/search", json=body)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual({hotel["id"] for hotel in first.get_json()["hotels"]}, {"hotel1", "hotel2"})
+        self.assertEqual(first.get_json()["hotels"][0]["total_price"], 2 * first.get_json()["hotels"][0]["price_per_night"])
+        second = self.client.post("/api/search", json=body)
+        self.assertEqual(second.get_json()["hotels"], first.get_json()["hotels"])
+        self.assertEqual(main.search_cache.stats()["hits"], hits + 1)
+        # A price cap filters on the agent side
+        capped = self.client.post("/api/search", json=dict(body, price_range=200))
+        self.assertEqual([hotel["id"] for hotel in capped.get_json()["hotels"]], ["hotel2"])
+        # A crafted cursor whose key cannot be compared with prices is a client error
+        crafted = base64.urlsafe_b64encode(json.dumps({"k": [["x"], "", ""], "s": "price_per_night", "d": False}).encode())
+        paged = self.client.post("/api/search", json=dict(body, limit=1, cursor=crafted.decode()))
+        self.assertEqual(paged.status_code, 400)
+        missing_dates = self.client.post("/api/search", json={"destination": "London"})
+        self.assertEqual(missing_dates.status_code, 400)
+
+    def test_concurrent_searches_overlap(self):
+        """Searches from many request threads wait on the shared loop together, not in series"""
+        main.booking_agent.simulated_latency = 0.3
+        bodies = []
+        for day in range(8):
+            check_in, check_out = stay(days_ahead=60 + day)
+            bodies.append({"destination": "Paris", "check_in": check_in, "check_out": check_out})
+
+        search_async = main.booking_agent.search_hotels_async
+        in_flight = []
+        overlap = []
+        threads = set()
+
+        async def recording_search(details):
+            threads.add(threading.current_thread().name)
+            in_flight.append(details)
+            overlap.append(len(in_flight))
+            try:
+                return await search_async(details)
+            finally:
+                in_flight.remove(details)
+
+        def search(body):
+            return main.app.test_client().post("/api/search", json=body)
+
+        main.booking_agent.search_hotels_async = recording_search
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(bodies)) as pool:
+                responses = list(pool.map(search, bodies))
+            elapsed = time.perf_counter() - started
+        finally:
+            del main.booking_agent.search_hotels_async
+        self.assertEqual([response.status_code for response in responses], [200] * len(bodies))
+        self.assertTrue(all(response.get_json()["hotels"] for response in responses))
+        self.assertEqual(threads, {main.search_loop.name})
+        self.assertGreater(max(overlap), 1)
+        # Eight 0.3s searches in series would take 2.4s
+        self.assertLess(elapsed, 1.2)
+
+    def test_area_searches_use_the_spatial_index(self):
+        """Radius and bbox searches on /api/search return catalog hotels inside the area"""
+        check_in, check_out = stay(days_ahead=45)
+        body = {"destination": "London", "check_in": check_in, "check_out": check_out}
+        near = self.client.post("/api/search", json=dict(body, radius_km=5)).get_json()
+        self.assertEqual([hotel["id"] for hotel in near["hotels"]], ["ld001"])
+        self.assertAlmostEqual(near["hotels"][0]["distance_km"], 2.6, delta=0.1)
+        # Amenity and price filters run on the catalog before the area filter
+        with_spa = self.client.post("/api/search", json=dict(body, radius_km=5, amenities=["spa"])).get_json()
+        self.assertEqual([hotel["id"] for hotel in with_spa["hotels"]], ["ld001"])
+        with_gym = self.client.post("/api/search", json=dict(body, radius_km=5, amenities=["gym"])).get_json()
+        self.assertEqual(with_gym["hotels"], [])
+        too_dear = self.client.post("/api/search", json=dict(body, radius_km=5, price_range=100)).get_json()
+        self.assertEqual(too_dear["hotels"], [])
+        too_far = self.client.post("/api/search", json=dict(body, radius_km=1)).get_json()
+        self.assertEqual(too_far["hotels"], [])
+        hyde_park = self.client.post("/api/search", json=dict(body, bbox=[51.50, -0.18, 51.52, -0.15])).get_json()
+        self.assertEqual([hotel["id"] for hotel in hyde_park["hotels"]], ["ld001"])
+        elsewhere = self.client.post("/api/search", json=dict(body, bbox=[51.50, -0.10, 51.52, -0.05])).get_json()
+        self.assertEqual(elsewhere["hotels"], [])
+
+    def test_radius_search_does_not_wait_on_the_geocoder(self):
+        """A destination the cache cannot answer in time gets a 400, and the lookup finishes in the background"""
+        check_in, check_out = stay(days_ahead=45)
+        body = {"destination": "Zyxwvut", "check_in": check_in, "check_out": check_out, "radius_km": 5}
+        geocoding, timeout = main.hotel_provider.geocoding, main.GEOCODE_TIMEOUT
+        release = threading.Event()
+
+        def slow_geocoder(destination):
+            release.wait(5)
+            return (10.0, 20.0)
+
+        geocoder, geocoding.geocoder, main.GEOCODE_TIMEOUT = geocoding.geocoder, slow_geocoder, 0.1
+        try:
+            started = time.monotonic()
+            response = self.client.post("/api/search", json=body)
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertEqual(response.status_code, 400)
+            release.set()
+            for _ in range(50):
+                if geocoding.cached("Zyxwvut") is not None:
+                    break
+                time.sleep(0.02)
+            self.assertEqual(geocoding.cached("Zyxwvut"), (10.0, 20.0))
+        finally:
+            release.set()
+            geocoding.geocoder, main.GEOCODE_TIMEOUT = geocoder, timeout
+
+    def test_booking_lookup_needs_the_guest_email(self):
+        """A reference alone does not reveal a booking, and contact details come back masked"""
+        created = self.client.post("/api/book", json=booking(days_ahead=50)).get_json()["booking"]
+        url = f"/api/bookings/{created['reference'].lower()}"
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, query_string={"email": "eve@example.com"}).status_code, 404)
+        found = self.client.get(url, query_string={"email": "ADA@example.com"})
+        self.assertEqual(found.status_code, 200)
+        stored = found.get_json()["booking"]
+        self.assertEqual(stored["reference"], created["reference"])
+        self.assertEqual((stored["name"], stored["email"], stored["phone"]), ("A***", "a***@example.com", "***50"))
+
+    def test_timed_out_save_keeps_rooms_until_it_fails(self):
+        """Rooms of a booking whose save timed out are released only if the writer then fails it"""
+        from app.booking_store import SaveTimeoutError
+        check_in, check_out = (date.fromisoformat(day) for day in stay(days_ahead=70))
+        body = booking(days_ahead=70, hotel_id="pr001", room_type="Suite")
+        inventory = main.hotel_provider.availability
+        free = inventory.available_rooms("pr001", "Suite", check_in, check_out)
+        outcomes = []
+
+        def slow_save(record, timeout=10.0):
+            outcomes.append(Future())
+            raise SaveTimeoutError("Bookings not stored within 10s", outcomes[-1])
+
+        main.booking_store.save = slow_save
+        try:
+            self.assertEqual(self.client.post("/api/book", json=body).status_code, 500)
+            self.assertEqual(self.client.post("/api/book", json=body).status_code, 500)
+        finally:
+            del main.booking_store.save
+        self.assertEqual(inventory.available_rooms("pr001", "Suite", check_in, check_out), free - 2)
+        # The writer committed the first booking and failed the second
+        outcomes[0].set_result(None)
+        outcomes[1].set_exception(RuntimeError("disk full"))
+        self.assertEqual(inventory.available_rooms("pr001", "Suite", check_in, check_out), free - 1)
+
+    def test_reference_clash_is_a_server_error(self):
+        """A reused booking reference fails as a generic 500 that frees the room and leaks no SQL"""
+        check_in, check_out = (date.fromisoformat(day) for day in stay(days_ahead=75))
+        inventory = main.hotel_provider.availability
+        free = inventory.available_rooms("ld001", "Standard", check_in, check_out)
+        taken = self.client.post("/api/book", json=booking(days_ahead=75)).get_json()["booking"]["reference"]
+        new_booking_reference = main.new_booking_reference
+        main.new_booking_reference = lambda: taken
+        try:
+            response = self.client.post("/api/book", json=booking(days_ahead=75))
+        finally:
+            main.new_booking_reference = new_booking_reference
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.get_json(), {"error": "Failed to process booking"})
+        self.assertEqual(inventory.available_rooms("ld001", "Standard", check_in, check_out), free - 1)
+
+    def test_home_page_offers_destination_suggestions(self):
+        """The served template renders and wires its destination field to /api/autocomplete"""
+        page = self.client.get("/")
+        self.assertEqual(page.status_code, 200)
+        html = page.data.decode()
+        self.assertIn('list="destinationSuggestions"', html)
+        self.assertIn("/api/autocomplete?q=", html)
+        suggestions = self.client.get("/api/autocomplete", query_string={"q": "lon"}).get_json()["suggestions"]
+        self.assertEqual(suggestions[0]["name"], "London")
+
+    def test_duplicate_booking_still_in_progress_gets_409(self):
+        """A retry that outwaits the first attempt for its Idempotency-Key is asked to come back later"""
+        started, finish = threading.Event(), threading.Event()
+        create_booking, wait = main.create_booking, main.IDEMPOTENCY_WAIT
+
+        def slow_booking(data):
+            started.set()
+            finish.wait(5)
+            return {"status": "success"}, 200
+
+        def book():
+            return main.app.test_client().post("/api/book", json=booking(), headers={"Idempotency-Key": "slow-1"})
+
+        main.create_booking, main.IDEMPOTENCY_WAIT = slow_booking, 0.05
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                first = pool.submit(book)
+                started.wait(5)
+                retry = book()
+                finish.set()
+                self.assertEqual(first.result().status_code, 200)
+        finally:
+            finish.set()
+            main.create_booking, main.IDEMPOTENCY_WAIT = create_booking, wait
+        self.assertEqual(retry.status_code, 409)
+        self.assertEqual(retry.headers["Retry-After"], "1")
+        replay = book()
+        self.assertEqual((replay.status_code, replay.headers["Idempotent-Replayed"]), (200, "true"))
+
+    def test_search_stream_uses_configured_providers(self):
+        """The aggregator is built from providers that exist and streams their hotels"""
+        self.assertEqual([provider.name for provider in main.aggregator.providers], ["Hotel catalog"])
+        check_in, check_out = stay()
+        response = self.client.post("/api/search/stream", json={
+            "destination": "London", "check_in": check_in, "check_out": check_out
+        })
+        self.assertEqual(response.status_code, 200)
+        events = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(events[0]["source"], "Hotel catalog")
+        self.assertEqual([hotel["id"] for hotel in events[0]["hotels"]], ["ld001"])
+        self.assertEqual(events[-1], {"type": "done", "total": 1, "failed_sources": []})
+
+        # A hotel the local inventory has sold out for the stay is left out of the stream
+        check_in, check_out = stay(days_ahead=95)
+        inventory = main.hotel_provider.availability
+        nights = (date.fromisoformat(check_in), date.fromisoformat(check_out))
+        for room in inventory.room_availability("ld001", *nights):
+            inventory.set_inventory("ld001", room["room_type"], 0, start=nights[0], end=nights[1])
+        response = self.client.post("/api/search/stream", json={
+            "destination": "London", "check_in": check_in, "check_out": check_out
+        })
+        events = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(events[0]["hotels"], [])
+        self.assertEqual(events[-1], {"type": "done", "total": 0, "failed_sources": []})
+
+if __name__ == '__main__':
+    unittest.main()
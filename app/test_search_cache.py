@@ -0,0 +1,87 @@
+import unittest
+from app.search_cache import SearchResultCache, make_search_key
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestSearchResultCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = SearchResultCache(max_entries=2, ttl=10, clock=self.clock)
+        self.params = {
+            "destination": "  New York ",
+            "check_in": "2025-05-01",
+            "check_out": "2025-05-05",
+            "guests": 2,
+            "amenities": ["wifi", "pool"]
+        }
+
+    def test_key_normalization(self):
+        """Equivalent searches share a cache key"""
+        other = dict(self.params, destination="new york", amenities=["pool", "wifi", "pool"])
+        self.assertEqual(make_search_key(self.params), make_search_key(other))
+        self.assertNotEqual(make_search_key(self.params), make_search_key(dict(self.params, guests=3)))
+
+    def test_hit_and_miss_counters(self):
+        """Lookups update hit/miss counters"""
+        key = make_search_key(self.params)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, [{"id": "ny001"}])
+        self.assertEqual(self.cache.get(key), [{"id": "ny001"}])
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_ttl_expiry(self):
+        """Entries expire after the TTL"""
+        key = make_search_key(self.params)
+        self.cache.set(key, ["result"])
+        self.clock.now = 9.9
+        self.assertIsNotNone(self.cache.get(key))
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted when full"""
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_invalidate_destination(self):
+        """Invalidation only drops entries for the changed destination"""
+        ny_key = make_search_key(self.params)
+        paris_key = make_search_key(dict(self.params, destination="Paris"))
+        self.cache.set(ny_key, ["ny"])
+        self.cache.set(paris_key, ["paris"])
+        self.assertEqual(self.cache.invalidate("NEW YORK"), 1)
+        self.assertIsNone(self.cache.get(ny_key))
+        self.assertEqual(self.cache.get(paris_key), ["paris"])
+        self.assertEqual(self.cache.invalidate(), 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidation_drops_in_flight_result(self):
+        """A result computed across an invalidation of its destination is not stored"""
+        key = make_search_key(self.params)
+        generation = self.cache.generation(key)
+        self.cache.invalidate("Paris")
+        self.assertTrue(self.cache.set(key, ["fresh"], generation))
+        generation = self.cache.generation(key)
+        self.cache.invalidate("new york")
+        self.assertFalse(self.cache.set(key, ["stale"], generation))
+        self.assertIsNone(self.cache.get(key))
+        generation = self.cache.generation(key)
+        self.cache.invalidate()
+        self.assertFalse(self.cache.set(key, ["stale"], generation))
+        self.assertEqual(self.cache.stats()["stale_writes"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
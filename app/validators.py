@@ -3,6 +3,11 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, EmailStr, constr, validator
 import phonenumbers
+from services.pagination import MAX_PAGE_SIZE
+from .booking_ids import normalize_reference
+
+# Largest radius accepted for "hotels within N km" searches
+MAX_SEARCH_RADIUS_KM = 100
 
 class BookingValidationError(Exception):
     """Custom exception for booking validation errors"""
@@ -110,6 +115,105 @@ def sanitize_search_params(params: Dict[str, Any]) -> Dict[str, Any]:
             if isinstance(amenity, str) and amenity in valid_amenities
         ]
     
+    # Validate pagination
+    if 'limit' in params:
+        try:
+            limit = int(params['limit'])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid limit format')
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f'Invalid limit: must be between 1 and {MAX_PAGE_SIZE}')
+        sanitized['limit'] = limit
+    
+    if params.get('cursor'):
+        if not isinstance(params['cursor'], str) or not re.match(r'^[A-Za-z0-9_-]{1,512}$', params['cursor']):
+            raise ValueError('Invalid cursor')
+        sanitized['cursor'] = params['cursor']
+    
+    # Validate area (radius or bounding box) filters
+    area = sanitize_search_area(params)
+    if area is not None:
+        sanitized['area'] = area
+    
+    return sanitized
+
+def _coordinate(value: Any, field: str, limit: float) -> float:
+    """Parse a latitude (limit 90) or longitude (limit 180)"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid {field} format')
+    if not -limit <= number <= limit:
+        raise ValueError(f'Invalid {field}: must be between -{limit} and {limit}')
+    return number
+
+def sanitize_search_area(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Validate a radius search (radius_km, optionally latitude/longitude) or a bbox search.
+
+    A radius without latitude/longitude is centred on the destination.
+    """
+    has_radius = params.get('radius_km') is not None
+    has_bbox = params.get('bbox') is not None
+    if has_radius and has_bbox:
+        raise ValueError('Use either radius_km or bbox, not both')
+    
+    if has_radius:
+        try:
+            radius = float(params['radius_km'])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid radius_km format')
+        if not 0 < radius <= MAX_SEARCH_RADIUS_KM:
+            raise ValueError(f'Invalid radius_km: must be between 0 and {MAX_SEARCH_RADIUS_KM}')
+        area = {'radius_km': radius}
+        if params.get('latitude') is not None or params.get('longitude') is not None:
+            area['latitude'] = _coordinate(params.get('latitude'), 'latitude', 90)
+            area['longitude'] = _coordinate(params.get('longitude'), 'longitude', 180)
+        return area
+    
+    if has_bbox:
+        bbox = params['bbox']
+        if not isinstance(bbox, list) or len(bbox) != 4:
+            raise ValueError('bbox must be [min_lat, min_lon, max_lat, max_lon]')
+        min_lat, max_lat = (_coordinate(bbox[i], 'bbox latitude', 90) for i in (0, 2))
+        min_lon, max_lon = (_coordinate(bbox[i], 'bbox longitude', 180) for i in (1, 3))
+        if min_lat > max_lat or min_lon > max_lon:
+            raise ValueError('Invalid bbox: minimums must not exceed maximums')
+        return {'bbox': [min_lat, min_lon, max_lat, max_lon]}
+    
+    return None
+
+def sanitize_search_filters(filters: Any) -> Dict[str, Any]:
+    """Validate aggregator search filters"""
+    if filters is None:
+        return {}
+    if not isinstance(filters, dict):
+        raise ValueError('Filters must be an object')
+    
+    sanitized = {}
+    for num_field in ['min_price', 'max_price', 'min_rating']:
+        if filters.get(num_field) is not None:
+            try:
+                value = float(filters[num_field])
+            except (TypeError, ValueError):
+                raise ValueError(f'Invalid {num_field} format')
+            if value < 0:
+                raise ValueError(f'Invalid {num_field}: must be positive')
+            sanitized[num_field] = value
+    
+    for flag in ['no_payment_only', 'free_cancellation_only']:
+        if flag in filters:
+            sanitized[flag] = bool(filters[flag])
+    
+    if 'sort_by' in filters:
+        if filters['sort_by'] not in {'price', 'rating', 'name'}:
+            raise ValueError('Invalid sort_by')
+        sanitized['sort_by'] = filters['sort_by']
+    
+    if 'sort_order' in filters:
+        if filters['sort_order'] not in {'asc', 'desc'}:
+            raise ValueError('Invalid sort_order')
+        sanitized['sort_order'] = filters['sort_order']
+    
     return sanitized
 
 def validate_api_key(api_key: Optional[str]) -> bool:
@@ -123,10 +227,29 @@ def validate_hotel_id(hotel_id: str) -> bool:
     """Validate hotel ID format"""
     return bool(re.match(r'^[A-Za-z0-9-_]{1,100}$', hotel_id))
 
+def validate_booking_reference(reference: str) -> str:
+    """Canonical booking reference; 8-character references from before sortable IDs are still accepted"""
+    legacy = reference.strip().upper()
+    if re.match(r'^[A-Z0-9]{8}$', legacy):
+        return legacy
+    return normalize_reference(reference)
+
 def sanitize_log_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Sanitize sensitive data for logging"""
     sensitive_fields = {'email', 'phone', 'name', 'credit_card'}
     return {
         k: '***' if k in sensitive_fields else v
         for k, v in data.items()
-    } 
\ No newline at end of file
+    } 
+
+def redact_contact_details(booking: Dict[str, Any]) -> Dict[str, Any]:
+    """Booking with the guest's name, email and phone masked, for lookups by reference"""
+    redacted = dict(booking)
+    if redacted.get('name'):
+        redacted['name'] = str(redacted['name'])[:1] + '***'
+    if redacted.get('email'):
+        local, _, domain = str(redacted['email']).partition('@')
+        redacted['email'] = f"{local[:1]}***@{domain}"
+    if redacted.get('phone'):
+        redacted['phone'] = '***' + str(redacted['phone'])[-2:]
+    return redacted
@@ -0,0 +1,49 @@
+"""
+Benchmark: AutocompleteIndex.suggest latency
+Run from the repository root: python -m benchmarks.bench_autocomplete [places...]
+
+Replays per-keystroke lookups (every prefix of random place names) against
+an index of synthetic places and reports latency percentiles. Each typed
+name is then searched for, bumping its popularity as /api/search does, so
+memoized prefixes are invalidated at the rate live traffic invalidates them.
+"""
+
+import random
+import string
+import sys
+import time
+from typing import List
+from services.autocomplete import AutocompleteIndex
+
+def make_names(count: int, rng: random.Random) -> List[str]:
+    """Place names of one to three random words"""
+    def word() -> str:
+        return rng.choice(string.ascii_uppercase) + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+    return [" ".join(word() for _ in range(rng.randint(1, 3))) for _ in range(count)]
+
+def main(sizes: List[int]) -> None:
+    rng = random.Random(42)
+    print(f"{'places':>8} {'build s':>8} {'lookups':>8} {'p50 us':>8} {'p99 us':>8} {'max us':>8}")
+    for size in sizes:
+        names = make_names(size, rng)
+        index = AutocompleteIndex()
+        start = time.perf_counter()
+        for name in names:
+            index.add(name, popularity=rng.random() * 1000)
+        # The first lookup merges the bulk-loaded keys into the sorted arrays
+        index.suggest("a")
+        build = time.perf_counter() - start
+
+        latencies = []
+        for name in rng.sample(names, 500):
+            for end in range(1, min(len(name), 8) + 1):
+                start = time.perf_counter()
+                index.suggest(name[:end], 5)
+                latencies.append((time.perf_counter() - start) * 1e6)
+            index.bump(name)
+        latencies.sort()
+        print(f"{size:>8} {build:>8.2f} {len(latencies):>8} {latencies[len(latencies) // 2]:>8.1f} "
+              f"{latencies[int(len(latencies) * 0.99)]:>8.1f} {latencies[-1]:>8.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 50_000])
@@ -0,0 +1,72 @@
+"""
+Benchmark: AvailabilityEngine at catalog scale
+Run from the repository root: python -m benchmarks.bench_availability [hotels...]
+
+Loads hotels x 4 room types x 365 nights spread over 20 cities, sells out
+random nights, then times single-stay checks and whole-city availability
+queries against a per-night loop over the same data.
+"""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+from services.availability import AvailabilityEngine
+
+ROOM_TYPES = ("Standard", "Deluxe", "Suite", "Presidential")
+CITIES = [f"city{i}" for i in range(20)]
+
+def load(engine: AvailabilityEngine, hotels: int, rng: random.Random) -> Dict[Tuple[str, str], List[int]]:
+    """Fill the engine and return the same inventory as plain per-night lists"""
+    plain = {}
+    for i in range(hotels):
+        city = CITIES[i % len(CITIES)]
+        for room_type in ROOM_TYPES:
+            engine.set_inventory(f"h{i}", room_type, 5, city=city)
+            nights = [5] * engine.horizon_days
+            for _ in range(20):
+                night = rng.randrange(engine.horizon_days)
+                engine.set_inventory(f"h{i}", room_type, 0,
+                                     start=engine.start + timedelta(days=night),
+                                     end=engine.start + timedelta(days=night + 1))
+                nights[night] = 0
+            plain[(f"h{i}", room_type)] = nights
+    return plain
+
+def main(sizes: List[int]) -> None:
+    rng = random.Random(11)
+    print(f"{'hotels':>7} {'rows':>6} {'MB':>6} {'stay us':>8} {'city ms':>8} {'loop ms':>8}")
+    for size in sizes:
+        engine = AvailabilityEngine(start=date(2025, 1, 1))
+        plain = load(engine, size, rng)
+        memory = sum(chunk.nbytes for city in engine._cities.values() for chunk in city.chunks) / 1e6
+        stays = []
+        for _ in range(1000):
+            first = rng.randrange(engine.horizon_days - 14)
+            stays.append((engine.start + timedelta(days=first),
+                          engine.start + timedelta(days=first + rng.randint(1, 14))))
+
+        start = time.perf_counter()
+        for index, (check_in, check_out) in enumerate(stays):
+            engine.is_available(f"h{index % size}", "Deluxe", check_in, check_out)
+        stay_us = (time.perf_counter() - start) / len(stays) * 1e6
+
+        start = time.perf_counter()
+        for check_in, check_out in stays[:50]:
+            engine.hotels_with_availability("city0", check_in, check_out)
+        city_ms = (time.perf_counter() - start) / 50 * 1000
+
+        # Same city query as a per-night loop over plain lists
+        city_rows = [key for key in plain if int(key[0][1:]) % len(CITIES) == 0]
+        start = time.perf_counter()
+        for check_in, check_out in stays[:50]:
+            first, last = (check_in - engine.start).days, (check_out - engine.start).days
+            {hotel for hotel, room_type in city_rows
+             if all(plain[(hotel, room_type)][night] >= 1 for night in range(first, last))}
+        loop_ms = (time.perf_counter() - start) / 50 * 1000
+
+        print(f"{size:>7} {len(plain):>6} {memory:>6.1f} {stay_us:>8.1f} {city_ms:>8.2f} {loop_ms:>8.2f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 5_000])
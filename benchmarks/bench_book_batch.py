@@ -0,0 +1,65 @@
+"""
+Benchmark: /api/book/batch against a loop over /api/book
+Run from the repository root: python -m benchmarks.bench_book_batch [rooms...]
+
+Books the same group of rooms through the Flask test client, once as one
+request per room (how the corporate channel books today) and once as a
+single batch, and reports rooms per second. The test client skips the
+network, so the real gap is larger by one round trip per room.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+def group(size: int, run: int) -> List[Dict[str, Any]]:
+    check_in = date.today() + timedelta(days=30 + run)
+    return [{
+        "hotel_id": f"bench{i % 25}",
+        "check_in": check_in.isoformat(),
+        "check_out": (check_in + timedelta(days=2)).isoformat(),
+        "guests": 2,
+        "room_type": "Standard",
+        "name": f"Guest {i}",
+        "email": f"guest{i}@example.com",
+        "phone": "+442071838750",
+        "destination": "London",
+        "adults": 2,
+        "children": 0,
+        "preferences": {"wifi": True}
+    } for i in range(size)]
+
+def main(sizes: List[int]) -> None:
+    directory = tempfile.mkdtemp()
+    # Keep the service's state out of the working directory, and run no job workers
+    os.environ["BOOKING_DB_PATH"] = os.path.join(directory, "bookings.sqlite3")
+    os.environ["JOB_QUEUE_PATH"] = os.path.join(directory, "jobs.sqlite3")
+    os.environ["GEOCODE_CACHE_PATH"] = os.path.join(directory, "geocoding.sqlite3")
+    os.environ["JOB_WORKERS"] = "0"
+    os.environ.setdefault("BOOKING_API_KEY", "benchmark")
+    import main as service
+
+    for i in range(25):
+        service.hotel_provider.availability.set_inventory(f"bench{i}", "Standard", 10000, city="bench")
+    client = service.app.test_client()
+
+    print(f"{'rooms':>6} {'loop/s':>8} {'batch/s':>8} {'speedup':>8}")
+    for run, size in enumerate(sizes):
+        bookings = group(size, 2 * run)
+        started = time.perf_counter()
+        for booking in bookings:
+            assert client.post("/api/book", json=booking).status_code == 200
+        loop = size / (time.perf_counter() - started)
+
+        bookings = group(size, 2 * run + 1)
+        started = time.perf_counter()
+        response = client.post("/api/book/batch", json={"bookings": bookings, "atomic": True})
+        batch = size / (time.perf_counter() - started)
+        assert response.status_code == 200 and response.get_json()["confirmed"] == size
+        print(f"{size:>6} {loop:>8.0f} {batch:>8.0f} {batch / loop:>7.1f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50, 200, 500])
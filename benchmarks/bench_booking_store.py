@@ -0,0 +1,58 @@
+"""
+Benchmark: sustained BookingStore throughput
+Run from the repository root: python -m benchmarks.bench_booking_store [seconds] [threads...]
+
+Request threads save bookings back to back for a fixed time, with group
+commit enabled and with one commit per booking (max_batch=1), and report
+bookings per second and bookings per commit.
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+from app.booking_store import BookingStore
+
+def run(seconds: float, threads: int, max_batch: int) -> tuple:
+    with tempfile.TemporaryDirectory() as directory:
+        store = BookingStore(os.path.join(directory, "bookings.sqlite3"), max_batch=max_batch)
+        counter = itertools.count()
+        stop = time.monotonic() + seconds
+
+        def worker() -> None:
+            while time.monotonic() < stop:
+                number = next(counter)
+                store.save({
+                    "reference": f"R{number:09d}",
+                    "hotel_id": f"h{number % 500}",
+                    "check_in": "2025-05-01",
+                    "check_out": "2025-05-04",
+                    "status": "confirmed",
+                    "created_at": "2025-04-01T10:00:00",
+                    "guests": {"adults": 2, "children": 0}
+                })
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stats = store.stats()
+        store.close()
+    return stats["bookings"] / elapsed, stats["bookings_per_commit"]
+
+def main(seconds: float, thread_counts: List[int]) -> None:
+    print(f"{'threads':>8} {'group/s':>9} {'per commit':>11} {'single/s':>9}")
+    for threads in thread_counts:
+        grouped, per_commit = run(seconds, threads, 256)
+        single, _ = run(seconds, threads, 1)
+        print(f"{threads:>8} {grouped:>9.0f} {per_commit:>11.1f} {single:>9.0f}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(float(args[0]) if args else 3.0, [int(arg) for arg in args[1:]] or [1, 8, 32, 64])
@@ -0,0 +1,73 @@
+"""
+Benchmark: columnar HotelCatalog vs. list-of-dicts filtering
+Run from the repository root: python -m benchmarks.bench_hotel_catalog [sizes...]
+"""
+
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+from app.amenity_index import AmenityBits
+from app.hotel_catalog import HotelCatalog
+
+AMENITIES = ["pool", "breakfast", "parking", "wifi", "fitness", "spa", "restaurant", "bar", "conference", "shuttle"]
+CRITERIA = {"min_price": 150, "max_price": 400, "min_rating": 4.0, "amenities": ["wifi", "breakfast"]}
+
+def make_hotels(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Synthetic hotels shaped like HotelDataProvider records"""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"h{i}",
+            "name": f"Hotel {i}",
+            "location": "City Center",
+            "price_per_night": round(rng.uniform(40, 900), 2),
+            "stars": rng.randint(1, 5),
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+            "reviews": rng.randint(0, 5000),
+            "amenities": rng.sample(AMENITIES, rng.randint(1, 6)),
+            "free_cancellation": rng.random() < 0.5,
+            "payment_required": rng.random() < 0.7
+        }
+        for i in range(count)
+    ]
+
+def dict_path(hotels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The current approach: comprehensions over dicts, then a full sort"""
+    matches = [
+        hotel for hotel in hotels
+        if CRITERIA["min_price"] <= hotel["price_per_night"] <= CRITERIA["max_price"]
+        and hotel["rating"] >= CRITERIA["min_rating"]
+        and all(amenity in hotel["amenities"] for amenity in CRITERIA["amenities"])
+    ]
+    matches.sort(key=lambda hotel: hotel["price_per_night"])
+    return matches
+
+def best_of(runs: int, fn: Callable[[], Any]) -> float:
+    """Fastest wall-clock time of several runs, in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main(sizes: List[int]) -> None:
+    print(f"{'hotels':>10} {'build ms':>10} {'dicts ms':>10} {'columnar ms':>12} {'speedup':>8} {'top50 ms':>9}")
+    for size in sizes:
+        hotels = make_hotels(size)
+        start = time.perf_counter()
+        catalog = HotelCatalog(hotels, AmenityBits(AMENITIES))
+        build_ms = (time.perf_counter() - start) * 1000
+
+        expected = [hotel["id"] for hotel in dict_path(hotels)]
+        actual = [hotel["id"] for hotel in catalog.search(sort_by="price", **CRITERIA)]
+        assert len(expected) == len(actual), "columnar and dict paths disagree"
+
+        dict_ms = best_of(3, lambda: dict_path(hotels))
+        columnar_ms = best_of(3, lambda: catalog.sort(catalog.filter(**CRITERIA), by="price"))
+        top_ms = best_of(3, lambda: catalog.sort(catalog.filter(**CRITERIA), by="price", limit=50))
+        print(f"{size:>10} {build_ms:>10.1f} {dict_ms:>10.1f} {columnar_ms:>12.1f} {dict_ms / columnar_ms:>7.1f}x {top_ms:>9.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
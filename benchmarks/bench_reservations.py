@@ -0,0 +1,69 @@
+"""
+Benchmark: concurrent reservations against a small inventory
+Run from the repository root: python -m benchmarks.bench_reservations [threads...]
+
+Fires 20,000 overlapping 1-3 night bookings from a thread pool at 200
+hotels with 5 rooms each, checks that no night was sold more than five
+times, and compares per-hotel lock stripes with one engine-wide lock.
+"""
+
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import List, Tuple
+from services.availability import AvailabilityEngine
+
+HOTELS = 200
+ROOMS = 5
+BOOKINGS = 20000
+START = date(2025, 1, 1)
+
+class GlobalLockEngine(AvailabilityEngine):
+    """Same engine with every hotel in one stripe"""
+
+    def _stripe_index(self, hotel_id: str) -> int:
+        return 0
+
+def make_engine(engine_class) -> AvailabilityEngine:
+    engine = engine_class(start=START, horizon_days=30)
+    for i in range(HOTELS):
+        engine.set_inventory(f"h{i}", "Standard", ROOMS, city="bench")
+    return engine
+
+def requests() -> List[Tuple[str, date, date]]:
+    return [(f"h{(i * 7) % HOTELS}", START + timedelta(days=i % 10), START + timedelta(days=i % 10 + 1 + i % 3))
+            for i in range(BOOKINGS)]
+
+def run(engine: AvailabilityEngine, threads: int) -> Tuple[float, int]:
+    """Bookings per second, and the bookings confirmed"""
+    def book(request):
+        return engine.reserve(request[0], "Standard", request[1], request[2])
+
+    batch = requests()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        outcomes = list(pool.map(book, batch, chunksize=64))
+    elapsed = time.perf_counter() - started
+
+    sold = Counter()
+    for (hotel_id, check_in, check_out), confirmed in zip(batch, outcomes):
+        if confirmed:
+            for night in range((check_out - check_in).days):
+                sold[(hotel_id, check_in + timedelta(days=night))] += 1
+    for (hotel_id, day), count in sold.items():
+        left = engine.available_rooms(hotel_id, "Standard", day, day + timedelta(days=1))
+        if count > ROOMS or left != ROOMS - count:
+            raise AssertionError(f"{hotel_id} sold {count} rooms on {day} with {left} left")
+    return BOOKINGS / elapsed, sum(outcomes)
+
+def main(thread_counts: List[int]) -> None:
+    print(f"{'threads':>7} {'striped/s':>10} {'global/s':>10} {'confirmed':>10}")
+    for threads in thread_counts:
+        striped, confirmed = run(make_engine(AvailabilityEngine), threads)
+        single, _ = run(make_engine(GlobalLockEngine), threads)
+        print(f"{threads:>7} {striped:>10.0f} {single:>10.0f} {confirmed:>10}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 8, 32, 64])
@@ -0,0 +1,65 @@
+"""
+Benchmark: HotelDataProvider.transform_google_data price join
+Run from the repository root: python -m benchmarks.bench_transform_google_data [sizes...]
+
+Compares the indexed (hash) join against the previous per-hotel scan of
+the price list, which is quadratic in the number of hotels.
+"""
+
+import logging
+import sys
+import time
+from typing import Any, Dict, List
+from app.hotel_providers import HotelDataProvider
+
+def make_payload(count: int) -> Dict[str, Dict[str, Any]]:
+    """Content and price payloads shaped like the Google Hotels responses"""
+    content = {"hotels": [
+        {
+            "id": f"g{i}",
+            "name": f"Hotel {i}",
+            "location": {"address": f"{i} Main Street"},
+            "rating": {"overall": 4.2},
+            "reviewCount": i,
+            "photos": [{"url": f"https://example.com/{i}.jpg"}],
+            "amenities": [{"name": "wifi"}],
+            "highlights": [],
+            "nearbyPlaces": []
+        }
+        for i in range(count)
+    ]}
+    # Prices arrive in reverse order so the scan cannot exit early
+    prices = {"prices": [{"hotelId": f"g{i}", "price": {"amount": 100 + i % 300}} for i in reversed(range(count))]}
+    return {"content": content, "prices": prices}
+
+def nested_scan(content_data: Dict[str, Any], prices_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The previous join: one linear scan of the prices per hotel"""
+    hotels = []
+    for hotel in content_data.get("hotels", []):
+        hotel_id = hotel.get("id")
+        price_info = next((p for p in prices_data.get("prices", []) if p.get("hotelId") == hotel_id), {})
+        hotels.append({"id": hotel_id, "price_per_night": price_info.get("price", {}).get("amount", 0)})
+    return hotels
+
+def timed(fn, *args) -> float:
+    """Best of three runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main(sizes: List[int]) -> None:
+    logging.disable(logging.WARNING)
+    provider = HotelDataProvider()
+    print(f"{'hotels':>8} {'indexed ms':>11} {'us/hotel':>9} {'nested ms':>10} {'us/hotel':>9}")
+    for size in sizes:
+        payload = make_payload(size)
+        indexed_ms = timed(provider.transform_google_data, payload["content"], payload["prices"])
+        nested_ms = timed(nested_scan, payload["content"], payload["prices"])
+        print(f"{size:>8} {indexed_ms:>11.2f} {indexed_ms * 1000 / size:>9.2f} "
+              f"{nested_ms:>10.2f} {nested_ms * 1000 / size:>9.2f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 2_000, 4_000, 8_000])
@@ -3,19 +3,32 @@ Main entry point for the Hotel Booking System
 Version: 2.1.2
 """
 
-from flask import Flask, request, render_template, jsonify
+from flask import Flask, request, render_template, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
+import hmac
+import json
 import logging
 from datetime import datetime, timedelta
-import random
-import string
-import httpx
+import atexit
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from app.hotel_booking_system_v2 import UserInterfaceAgent, BookingAPIAgent, IntegrationAgent
 from dotenv import load_dotenv
-from app.hotel_providers import HotelDataProvider
+from app.hotel_providers import HotelDataProvider, CatalogSearchProvider
+from app.geocoding import GeocodingCache
+from app.event_loop import BackgroundEventLoop
+from app.search_cache import SearchResultCache, make_search_key, normalize_destination
+from app.booking_store import BookingStore, DuplicateBookingError, SaveTimeoutError
+from app.booking_ids import new_booking_reference
+from app.booking_jobs import BookingNotifier
+from app.job_queue import JobQueue
+from app.idempotency import IdempotencyStore, IdempotencyConflictError, IdempotencyInProgressError, request_fingerprint, validate_idempotency_key
 from app.middleware import SecurityHeadersMiddleware
-from app.validators import BookingRequest, sanitize_search_params, validate_api_key, validate_hotel_id, sanitize_log_data
+from services.pagination import top_k_page, MAX_PAGE_SIZE
+from services.single_flight import freeze
+from services.hotel_aggregator import HotelAggregator
+from services.http_client import HTTPClientPool
+from app.validators import BookingRequest, sanitize_search_params, sanitize_search_filters, sanitize_search_area, validate_api_key, validate_hotel_id, validate_booking_reference, sanitize_log_data, redact_contact_details
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -31,7 +44,103 @@ load_dotenv()
 # Initialize agents
 ui_agent = UserInterfaceAgent()
 booking_agent = BookingAPIAgent()
-integration_agent = IntegrationAgent()
+# Durable booking records (SQLite WAL, group commit)
+booking_store = BookingStore.from_env()
+# Results of /api/book by Idempotency-Key, so client retries do not book twice. Kept in this
+# process's memory only: lost on restart and not shared between workers, so run one worker
+idempotency_keys = IdempotencyStore(
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000")),
+    ttl=float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+)
+IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT", "30"))
+# Seconds a client is asked to wait before retrying a key whose first attempt is still running
+IDEMPOTENCY_RETRY_AFTER = 1
+# Emails, partner webhooks and audit exports run off the request path; set JOB_WORKERS=0
+# when a separate `python -m app.booking_jobs` process works the queue
+job_queue = JobQueue.from_env()
+booking_notifier = BookingNotifier.from_env(job_queue)
+job_queue.start(int(os.getenv("JOB_WORKERS", "2")))
+# Largest group booking accepted by /api/book/batch
+MAX_BATCH_BOOKINGS = 500
+integration_agent = IntegrationAgent(store=booking_store, idempotency=idempotency_keys, notifier=booking_notifier)
+
+# One pooled HTTP client shared by every provider, bound to the search loop
+http_pool = HTTPClientPool.from_env()
+# Destination coordinates: SQLite-backed, falling back to rate-limited Nominatim lookups
+hotel_provider = HotelDataProvider(http_client=http_pool, geocoding=GeocodingCache.from_env())
+
+def restore_reservations():
+    """Take the rooms of stored upcoming bookings out of the in-memory inventory.
+
+    Room inventory, like the Idempotency-Key results above, lives in this
+    process only, so the app must run as a single worker process (gunicorn
+    --workers 1, as in start.sh and render.yaml; scale with --threads). A
+    second worker would hold its own copy of every room and could sell the
+    same room again.
+    """
+    today = datetime.utcnow().date()
+    restored = 0
+    for booking in booking_store.staying_after(today.isoformat()):
+        try:
+            check_in = max(datetime.strptime(booking["check_in"], "%Y-%m-%d").date(), today)
+            check_out = datetime.strptime(booking["check_out"], "%Y-%m-%d").date()
+            if hotel_provider.availability.reserve(booking["hotel_id"], booking.get("room_type"),
+                                                   check_in, check_out, booking.get("rooms", 1)):
+                restored += 1
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Skipping stored booking {booking.get('reference')}: {str(e)}")
+    logger.info(f"Restored {restored} reservations into inventory")
+
+restore_reservations()
+
+# Provider fan-out: whole-request deadline, and hedge delays (e.g. {"Booking.com": 0.8})
+# for providers whose p95 latency is known to be spiky
+aggregator = HotelAggregator(
+    providers=[CatalogSearchProvider(hotel_provider)],
+    timeout=float(os.getenv("PROVIDER_DEADLINE", "8")),
+    hedge_delays=json.loads(os.getenv("PROVIDER_HEDGE_DELAYS", "{}")),
+    http_client=http_pool,
+    breaker_options=json.loads(os.getenv("PROVIDER_BREAKER_OPTIONS", "{}")),
+    limiter_options=json.loads(os.getenv("PROVIDER_LIMITER_OPTIONS", "{}")),
+    availability=hotel_provider.availability
+)
+
+# Search result cache, invalidated whenever provider data for a destination changes
+search_cache = SearchResultCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "300"))
+)
+hotel_provider.subscribe(search_cache.invalidate)
+
+# Shared event loop that request threads hand their searches to
+search_loop = BackgroundEventLoop()
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "30"))
+# How long a radius search waits for a destination missing from the geocoding cache
+GEOCODE_TIMEOUT = float(os.getenv("GEOCODE_TIMEOUT", "2"))
+# Batch search limits: queries per request, and the time and hotels shared by the whole batch
+MAX_BATCH_QUERIES = 50
+SEARCH_BATCH_DEADLINE = float(os.getenv("SEARCH_BATCH_DEADLINE", "10"))
+SEARCH_BATCH_MAX_RESULTS = int(os.getenv("SEARCH_BATCH_MAX_RESULTS", "1000"))
+
+@atexit.register
+def stop_job_workers():
+    """Let running jobs finish; queued ones stay in the queue for the next start"""
+    job_queue.stop()
+
+@atexit.register
+def close_booking_store():
+    """Flush pending bookings and checkpoint the WAL before the process exits"""
+    booking_store.close()
+
+@atexit.register
+def close_http_pool():
+    """Close pooled connections on the loop that owns them before the process exits"""
+    if not http_pool.is_open:
+        return
+    try:
+        search_loop.run(http_pool.aclose(), timeout=5)
+    except Exception as e:
+        logger.error(f"Error closing HTTP client pool: {str(e)}")
 
 # Mount static files and templates
 app.static_folder = 'static'
@@ -70,7 +179,13 @@ def health_check():
             "status": "healthy",
             "version": "2.1.2",
             "timestamp": datetime.utcnow().isoformat(),
-            "environment": os.getenv("FLASK_ENV", "production")
+            "environment": os.getenv("FLASK_ENV", "production"),
+            "search_cache": search_cache.stats(),
+            "booking_store": booking_store.stats(),
+            "idempotency_keys": idempotency_keys.stats(),
+            "jobs": job_queue.stats(),
+            "destination_resolver": hotel_provider.destination_resolver.stats(),
+            "geocoding": hotel_provider.geocoding.stats()
         })
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -80,6 +195,21 @@ def health_check():
             "version": "2.1.2"
         }), 500
 
+@app.route("/api/providers/status", methods=['GET'])
+def provider_status():
+    """Circuit breaker state and adaptive concurrency limit of each hotel provider"""
+    async def snapshot():
+        # Breakers are only touched on the search loop, so read them there too
+        return aggregator.provider_status()
+    try:
+        return jsonify({
+            "providers": search_loop.run(snapshot(), timeout=5),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"Error reading provider status: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route("/api/search", methods=['POST'])
 def search_hotels():
     """Search for hotels with improved security and validation"""
@@ -87,60 +217,467 @@ def search_hotels():
         data = request.get_json()
         # Sanitize and validate search parameters
         sanitized_params = sanitize_search_params(data)
+        # Map misspellings to a known destination so they search (and cache) like the real name
+        if sanitized_params.get('destination'):
+            sanitized_params['destination'] = hotel_provider.resolve_destination(sanitized_params['destination'])
+        
+        booking_details = agent_search_details(sanitized_params)
+        
+        if 'area' in sanitized_params:
+            # Radius / bounding-box searches: agent results carry no coordinates, so these are
+            # answered from the catalog the spatial index is built from, cheapest first
+            destination = sanitized_params['destination']
+            preferences = booking_details['preferences']
+            area = sanitized_params['area']
+            center = None
+            if 'radius_km' in area and 'latitude' not in area:
+                center = locate_destination(destination)
+            hotels = hotel_provider.filter_by_area(
+                hotel_provider.search_catalog(
+                    destination,
+                    amenities=preferences['amenities'],
+                    max_price=preferences.get('price_range', {}).get('max')
+                ),
+                area, center
+            )
+        else:
+            cache_key = make_search_key(sanitized_params)
+            hotels = search_cache.get(cache_key)
+            if hotels is None:
+                # Taken before searching, so a result that races a data update is not cached
+                generation = search_cache.generation(cache_key)
+                # Run the search on the shared event loop so concurrent searches overlap
+                hotels = search_loop.run(booking_agent.search_hotels_async(booking_details), timeout=SEARCH_TIMEOUT)
+                # Empty results are not cached: the agent also returns [] on upstream errors
+                if hotels:
+                    search_cache.set(cache_key, hotels, generation)
+                    # Searched destinations rank higher in autocomplete
+                    hotel_provider.autocomplete.bump(sanitized_params.get('destination', ''))
         
-        # Get hotels from Google Places API
-        hotels = booking_agent.search_hotels(sanitized_params)
+        # Page through the cached result with top-k selection instead of returning it whole
+        total = len(hotels)
+        next_cursor = None
+        if 'limit' in sanitized_params:
+            hotels, next_cursor = top_k_page(
+                hotels, sanitized_params['limit'], "price_per_night",
+                cursor=sanitized_params.get('cursor')
+            )
         
         # Log sample hotel data (sanitized)
         if hotels:
             safe_hotel = sanitize_log_data(hotels[0])
             logger.info(f"Sample hotel: {safe_hotel['name']} in {safe_hotel['location']}")
         
-        return jsonify({"hotels": hotels})
+        return jsonify({
+            "hotels": hotels,
+            "total": total,
+            "next_cursor": next_cursor,
+            "destination": sanitized_params.get('destination')
+        })
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error searching hotels: {str(e)}")
         return jsonify({"error": "Failed to search hotels"}), 500
 
+def locate_destination(destination: str):
+    """Coordinates of a destination, or None if it cannot be found within GEOCODE_TIMEOUT.
+
+    Cache misses go to disk and the rate-limited geocoder on the search
+    loop's executor, never on the request thread. A lookup that runs out of
+    time keeps going there and fills the cache for the next search.
+    """
+    try:
+        return search_loop.run(hotel_provider.get_coordinates(destination), timeout=GEOCODE_TIMEOUT)
+    except FutureTimeoutError:
+        logger.warning(f"Geocoding {destination} took longer than {GEOCODE_TIMEOUT}s")
+        return None
+
+def agent_search_details(params: dict) -> dict:
+    """BookingAPIAgent booking details for sanitized /api/search parameters"""
+    if not params.get('destination') or 'check_in' not in params or 'check_out' not in params:
+        raise ValueError('destination, check_in and check_out are required')
+    preferences = {"amenities": params.get('amenities', [])}
+    if 'price_range' in params:
+        # A single price_range value is the most the guest will pay per night
+        preferences["price_range"] = {"min": 0, "max": params['price_range']}
+    return {
+        "destination": params['destination'],
+        "check_in": params['check_in'],
+        "check_out": params['check_out'],
+        "adults": params.get('guests', 1),
+        "children": 0,
+        "preferences": preferences
+    }
+
+def build_aggregator_query(data: dict, paged: bool = False) -> dict:
+    """Sanitize a search body into HotelAggregator search arguments (with limit and cursor when paged)"""
+    params = sanitize_search_params(data)
+    if not params.get('destination') or 'check_in' not in params or 'check_out' not in params:
+        raise ValueError('destination, check_in and check_out are required')
+    query = {
+        "location": hotel_provider.resolve_destination(params['destination']),
+        "check_in": datetime.strptime(params['check_in'], "%Y-%m-%d"),
+        "check_out": datetime.strptime(params['check_out'], "%Y-%m-%d"),
+        "guests": params.get('guests', 1),
+        "filters": sanitize_search_filters(data.get('filters'))
+    }
+    if paged:
+        query["limit"] = params.get('limit')
+        query["cursor"] = params.get('cursor')
+    return query
+
+@app.route("/api/search/batch", methods=['POST'])
+def batch_search_hotels():
+    """Run many searches in one request, sharing provider calls and cache lookups.
+
+    Body: {"queries": {"<id>": <search>, ...}} (or a list, keyed by
+    position), plus optional "timeout" and "max_results" lowering the
+    batch-wide budgets. Each search takes the /api/search/stream fields and
+    "limit"/"cursor"; the hotel budget is split evenly, capping each limit.
+    Results come back under the same ids.
+    """
+    try:
+        data = request.get_json() or {}
+        queries = data.get("queries")
+        if isinstance(queries, list):
+            queries = {str(index): query for index, query in enumerate(queries)}
+        if not isinstance(queries, dict) or not 1 <= len(queries) <= MAX_BATCH_QUERIES:
+            raise ValueError(f"queries must hold 1-{MAX_BATCH_QUERIES} searches")
+        try:
+            deadline = float(data.get("timeout", SEARCH_BATCH_DEADLINE))
+            max_results = int(data.get("max_results", SEARCH_BATCH_MAX_RESULTS))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid timeout or max_results format")
+        if deadline <= 0 or max_results < 1:
+            raise ValueError("timeout and max_results must be positive")
+        deadline = min(deadline, SEARCH_BATCH_DEADLINE)
+        max_results = min(max_results, SEARCH_BATCH_MAX_RESULTS)
+        per_query = max(1, max_results // len(queries))
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+
+    # Identical searches in the batch are looked up and run once
+    results = {}
+    distinct = {}
+    for query_id, body in queries.items():
+        try:
+            if not isinstance(body, dict):
+                raise ValueError("Each search must be an object")
+            query = build_aggregator_query(body, paged=True)
+        except ValueError as e:
+            results[str(query_id)] = {"error": str(e)}
+            continue
+        query["limit"] = min(query["limit"] or MAX_PAGE_SIZE, per_query)
+        distinct.setdefault(batch_search_key(query), (query, []))[1].append(str(query_id))
+
+    pending = {}
+    generations = {}
+    for key, (query, _) in distinct.items():
+        cached = search_cache.get(key)
+        if cached is None:
+            pending[key] = query
+            generations[key] = search_cache.generation(key)
+        else:
+            distinct[key] = (dict(cached, cached=True), distinct[key][1])
+    try:
+        if pending:
+            outcomes = search_loop.run(aggregator.search_many(pending, timeout=deadline), timeout=deadline + 1)
+            for key, outcome in outcomes.items():
+                # Only complete answers are reused; partial ones lack a provider
+                if "error" not in outcome and not outcome["partial"]:
+                    search_cache.set(key, outcome, generations[key])
+                distinct[key] = (dict(outcome, cached=False), distinct[key][1])
+    except Exception as e:
+        logger.error(f"Error in batch search: {str(e)}")
+        return jsonify({"error": "Failed to search hotels"}), 500
+
+    for outcome, query_ids in distinct.values():
+        for query_id in query_ids:
+            results[query_id] = outcome
+    logger.info(f"Batch search: {len(queries)} queries, {len(distinct)} distinct, {len(distinct) - len(pending)} cached")
+    return jsonify({
+        "results": results,
+        "distinct_queries": len(distinct),
+        "cache_hits": len(distinct) - len(pending),
+        "budget": {"timeout": deadline, "max_results": max_results, "per_query": per_query}
+    })
+
+def batch_search_key(query: dict) -> tuple:
+    """Search cache key for an aggregator query; it leads with the destination so invalidation finds it"""
+    return (
+        normalize_destination(query["location"]),
+        "aggregator",
+        query["check_in"],
+        query["check_out"],
+        query["guests"],
+        freeze(query["filters"]),
+        query["limit"],
+        query["cursor"]
+    )
+
+@app.route("/api/search/stream", methods=['POST'])
+def stream_search_hotels():
+    """Stream hotels as NDJSON, one line per provider as soon as it answers"""
+    try:
+        query = build_aggregator_query(request.get_json() or {})
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+    
+    def generate():
+        total = 0
+        failed_sources = []
+        try:
+            for event in search_loop.iterate(aggregator.stream_hotels(**query), timeout=SEARCH_TIMEOUT):
+                total += len(event["hotels"])
+                if event["error"]:
+                    failed_sources.append(event["source"])
+                yield json.dumps({"type": "hotels", **event}) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming hotels: {str(e)}")
+            yield json.dumps({"type": "error", "error": "Failed to search hotels"}) + "\n"
+        yield json.dumps({"type": "done", "total": total, "failed_sources": failed_sources}) + "\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route("/api/book", methods=['POST'])
 def book_hotel():
-    """Book a hotel with enhanced security and validation"""
+    """Book a hotel with enhanced security and validation.
+
+    With an Idempotency-Key header, retries of the same request get the
+    original response (marked Idempotent-Replayed) instead of a new booking.
+    """
+    return idempotent_booking_response("book", create_booking)
+
+@app.route("/api/book/batch", methods=['POST'])
+def book_hotels_batch():
+    """Book up to MAX_BATCH_BOOKINGS rooms in one request, with an outcome per item.
+
+    Body: {"bookings": [<booking>, ...], "atomic": false}. Atomic batches
+    confirm every item or none; otherwise each item succeeds or fails on its
+    own. Confirmed items are stored in one transaction. Idempotency-Key is
+    honoured as for /api/book.
+    """
+    return idempotent_booking_response("book-batch", create_booking_batch)
+
+def idempotent_booking_response(namespace, work):
+    """Run work(data) for the request body, once per Idempotency-Key when one is sent"""
     try:
         data = request.get_json()
+        key = validate_idempotency_key(request.headers.get("Idempotency-Key"))
+        if key is None:
+            body, status = work(data)
+            return jsonify(body), status
+
+        (body, status), replayed = idempotency_keys.run(
+            f"{namespace}:{key}", request_fingerprint(data), lambda: work(data), timeout=IDEMPOTENCY_WAIT
+        )
+        response = jsonify(body)
+        response.headers["Idempotent-Replayed"] = "true" if replayed else "false"
+        return response, status
+    except IdempotencyConflictError as e:
+        return jsonify({"error": str(e)}), 422
+    except IdempotencyInProgressError as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(IDEMPOTENCY_RETRY_AFTER)
+        return response, 409
+    except DuplicateBookingError as e:
+        # A reference clash is the server's fault, not the request's; retrying mints a new reference
+        logger.error(f"Error processing booking: {str(e)}")
+        return jsonify({"error": "Failed to process booking"}), 500
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error processing booking: {str(e)}")
+        return jsonify({"error": "Failed to process booking"}), 500
+
+def create_booking(data):
+    """Reserve, store and confirm one booking; returns the response body and status.
+
+    Client errors are returned so idempotent replays repeat them; unexpected
+    failures raise, leaving the request safe to retry.
+    """
+    try:
         # Validate hotel ID
         if not validate_hotel_id(data["hotel_id"]):
-            return jsonify({"error": "Invalid hotel ID"}), 400
+            return {"error": "Invalid hotel ID"}, 400
         
-        # Generate secure booking reference
-        booking_ref = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+        # Time-ordered reference, unique across workers without coordination
+        booking_ref = new_booking_reference()
         
         # Log sanitized booking data
         safe_data = sanitize_log_data(data)
         logger.info(f"Processing booking: {safe_data}")
         
-        return jsonify({
+        booking = {
+            "reference": booking_ref,
+            "hotel_id": data["hotel_id"],
+            "check_in": data["check_in"],
+            "check_out": data["check_out"],
+            "guests": data["guests"],
+            "room_type": data["room_type"],
+            "name": data["name"],
+            "email": data["email"],
+            "phone": data["phone"],
+            "destination": data["destination"],
+            "adults": data["adults"],
+            "children": data["children"],
+            "preferences": data["preferences"],
+            "status": "confirmed",
+            "created_at": datetime.utcnow().isoformat()
+        }
+
+        # Atomically take the rooms before confirming; hotels without local inventory are the provider's to check
+        check_in = datetime.strptime(data["check_in"], "%Y-%m-%d")
+        check_out = datetime.strptime(data["check_out"], "%Y-%m-%d")
+        inventory = hotel_provider.availability
+        reserved = inventory.tracks(data["hotel_id"])
+        if reserved and not inventory.reserve(data["hotel_id"], data["room_type"], check_in, check_out):
+            return {"error": "No rooms of this type are available for the selected dates"}, 409
+
+        # Confirm only once the booking is durable; concurrent bookings share one commit
+        try:
+            booking_store.save(booking)
+        except Exception as e:
+            if reserved:
+                release_when_not_stored(e, lambda: inventory.release(data["hotel_id"], data["room_type"],
+                                                                     check_in, check_out))
+            raise
+        queue_booking_jobs([booking])
+        
+        return {
             "status": "success",
-            "booking": {
-                "reference": booking_ref,
-                "hotel_id": data["hotel_id"],
-                "check_in": data["check_in"],
-                "check_out": data["check_out"],
-                "guests": data["guests"],
-                "room_type": data["room_type"],
-                "name": data["name"],
-                "email": data["email"],
-                "phone": data["phone"],
-                "destination": data["destination"],
-                "adults": data["adults"],
-                "children": data["children"],
-                "preferences": data["preferences"]
-            }
-        })
+            "booking": booking
+        }, 200
+    except DuplicateBookingError:
+        raise
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
+        return {"error": str(e)}, 400
+
+def create_booking_batch(data):
+    """Validate, reserve and store a batch of bookings; returns the response body and status"""
+    items = data.get("bookings") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not 1 <= len(items) <= MAX_BATCH_BOOKINGS:
+        return {"error": f"bookings must be a list of 1-{MAX_BATCH_BOOKINGS} items"}, 400
+    atomic = bool(data.get("atomic", False))
+    results = [None] * len(items)
+
+    # Validate every item in one pass before touching inventory
+    accepted = []
+    created_at = datetime.utcnow().isoformat()
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("Booking must be an object")
+            valid = BookingRequest.parse_obj(item)
+            check_in = datetime.strptime(valid.check_in, "%Y-%m-%d")
+            check_out = datetime.strptime(valid.check_out, "%Y-%m-%d")
+            if check_out <= check_in:
+                raise ValueError("Check-out must be after check-in")
+            if not validate_hotel_id(valid.hotel_id):
+                raise ValueError("Invalid hotel ID")
+        except ValueError as e:
+            results[index] = {"index": index, "status": "invalid", "error": str(e)}
+            continue
+        booking = dict(valid.dict(), reference=new_booking_reference(), status="confirmed", created_at=created_at)
+        accepted.append((index, booking, (valid.hotel_id, valid.room_type, check_in, check_out, 1)))
+    logger.info(f"Processing booking batch of {len(items)} ({len(accepted)} valid, atomic={atomic})")
+    if atomic and len(accepted) < len(items):
+        return batch_outcome(results, "skipped"), 400
+
+    # Take the rooms of every item with local inventory in one pass
+    inventory = hotel_provider.availability
+    tracked = [entry for entry in accepted if inventory.tracks(entry[1]["hotel_id"])]
+    reserved = inventory.reserve_many([stay for _, _, stay in tracked], atomic=atomic)
+    unavailable = {index for (index, _, _), ok in zip(tracked, reserved) if not ok}
+    for index in unavailable:
+        results[index] = {"index": index, "status": "unavailable",
+                          "error": "No rooms of this type are available for the selected dates"}
+    if atomic and unavailable:
+        return batch_outcome(results, "skipped"), 409
+
+    # Store every confirmed booking in one transaction
+    confirmed = [(index, booking) for index, booking, _ in accepted if index not in unavailable]
+    try:
+        if confirmed:
+            booking_store.save_many([booking for _, booking in confirmed])
+    except Exception as e:
+        stays = [stay for (_, _, stay), ok in zip(tracked, reserved) if ok]
+        release_when_not_stored(e, lambda: [inventory.release(*stay) for stay in stays])
+        raise
+    for index, booking in confirmed:
+        results[index] = {"index": index, "status": "confirmed", "booking": booking}
+    queue_booking_jobs([booking for _, booking in confirmed])
+    return batch_outcome(results), 200
+
+def release_when_not_stored(error, release):
+    """Give reserved rooms back once a failed save is known not to have stored the bookings.
+
+    A save that timed out may still be committed by the writer, so its rooms
+    are only released if the writer later reports that it failed.
+    """
+    if not isinstance(error, SaveTimeoutError):
+        release()
+        return
+
+    def settled(outcome):
+        if outcome.exception() is not None:
+            release()
+        else:
+            logger.warning("Booking stored after its request timed out; keeping its rooms")
+
+    error.outcome.add_done_callback(settled)
+
+def queue_booking_jobs(bookings):
+    """Queue confirmation side effects; the bookings stand even if queueing fails"""
+    for booking in bookings:
+        try:
+            booking_notifier.enqueue(booking)
+        except Exception as e:
+            logger.error(f"Failed to queue jobs for booking {booking['reference']}: {str(e)}")
+
+def batch_outcome(results, pending_status=None):
+    """Response body for a batch, giving items without an outcome pending_status"""
+    results = [result or {"index": index, "status": pending_status} for index, result in enumerate(results)]
+    confirmed = sum(1 for result in results if result["status"] == "confirmed")
+    return {
+        "status": "success" if confirmed == len(results) else "partial" if confirmed else "failed",
+        "confirmed": confirmed,
+        "results": results
+    }
+
+@app.route("/api/bookings/<reference>", methods=['GET'])
+def get_booking(reference):
+    """Look up a stored booking by its reference and the guest's email (?email=).
+
+    The reference alone is not enough: without the matching email the
+    booking is reported as not found. Contact details come back masked.
+    """
+    email = request.args.get("email", "").strip()
+    if not email:
+        return jsonify({"error": "email is required"}), 400
+    try:
+        booking = booking_store.get(validate_booking_reference(reference))
+    except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        logger.error(f"Error processing booking: {str(e)}")
-        return jsonify({"error": "Failed to process booking"}), 500
+        logger.error(f"Error fetching booking: {str(e)}")
+        return jsonify({"error": "Failed to fetch booking"}), 500
+    if booking is None or not hmac.compare_digest(str(booking.get("email", "")).lower().encode(), email.lower().encode()):
+        return jsonify({"error": "Booking not found"}), 404
+    return jsonify({
+        "status": "success",
+        "booking": redact_contact_details(booking)
+    })
 
 @app.route("/api/amenities", methods=['GET'])
 def get_amenities():
@@ -150,6 +687,38 @@ def get_amenities():
         "amenities": ui_agent.amenities
     })
 
+@app.route("/api/autocomplete", methods=['GET'])
+def autocomplete_destinations():
+    """Destination and neighbourhood suggestions for a typed prefix (called per keystroke)"""
+    query = request.args.get("q", "")[:64]
+    try:
+        limit = int(request.args.get("limit", 5))
+    except ValueError:
+        return jsonify({"error": "Invalid limit format"}), 400
+    response = jsonify({"suggestions": hotel_provider.autocomplete.suggest(query, limit)})
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return response
+
+@app.route("/api/attractions/nearby", methods=['GET'])
+def get_nearby_attractions():
+    """Attractions near a point, answered from the local spatial index"""
+    try:
+        area = sanitize_search_area({
+            "latitude": request.args.get("latitude"),
+            "longitude": request.args.get("longitude"),
+            "radius_km": request.args.get("radius_km", "2")
+        })
+        if "latitude" not in area:
+            raise ValueError("latitude and longitude are required")
+        return jsonify({
+            "status": "success",
+            "attractions": hotel_provider.nearby_attractions(
+                area["latitude"], area["longitude"], area["radius_km"], limit=10
+            )
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route("/api/room-types", methods=['GET'])
 def get_room_types():
     """Get list of available room types"""
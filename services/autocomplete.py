@@ -0,0 +1,149 @@
+"""
+Destination Autocomplete
+Sorted-array prefix index over destination and neighbourhood names, ranked by popularity,
+for per-keystroke suggestion lookups.
+"""
+
+import bisect
+import heapq
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Prefixes up to this length match most of the index; their top suggestions are memoized
+_MEMO_PREFIX_LENGTH = 2
+
+def normalize_term(text: Any) -> str:
+    """Lowercase, accent-free, single-spaced form used for matching"""
+    ascii_text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+    return " ".join(ascii_text.lower().replace("-", " ").split())
+
+class AutocompleteIndex:
+    """Prefix suggestions over named places, most popular first.
+
+    Every word suffix of a name is a key ("new york" is found by "new" and
+    by "york"). Keys are kept in one sorted list, so a prefix is the
+    contiguous range found by two bisections. Within that range the
+    ``max_limit`` most popular places are picked with a bounded heap. Results for prefixes of one
+    or two characters, which cover most of the index, are memoized. Adding
+    or bumping a place re-ranks it within the memoized prefixes of its own
+    words instead of recomputing them.
+    """
+
+    def __init__(self, max_limit: int = 10):
+        self.max_limit = max_limit
+        self._keys: List[str] = []
+        self._entry_ids: List[int] = []
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._ids_by_name: Dict[Tuple[str, Optional[str]], int] = {}
+        self._popularity: Dict[int, float] = {}
+        self._memo: Dict[str, List[int]] = {}
+        # Keys added since the last lookup, merged in one sort so bulk loads stay O(n log n)
+        self._pending: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, kind: str = "destination", popularity: float = 0.0,
+            destination: Optional[str] = None) -> None:
+        """Add a place, or raise the popularity of one already indexed"""
+        identity = (normalize_term(name), normalize_term(destination) if destination else None)
+        if not identity[0]:
+            return
+        with self._lock:
+            entry_id = self._ids_by_name.get(identity)
+            if entry_id is not None:
+                if popularity > self._popularity[entry_id]:
+                    self._popularity[entry_id] = popularity
+                    self._promote(entry_id, identity[0])
+                return
+            entry_id = len(self._entries)
+            self._ids_by_name[identity] = entry_id
+            self._entries[entry_id] = {"name": name, "type": kind, "destination": destination}
+            self._popularity[entry_id] = popularity
+            words = identity[0].split(" ")
+            for start in range(len(words)):
+                self._pending.append((" ".join(words[start:]), entry_id))
+            self._promote(entry_id, identity[0])
+
+    def bump(self, name: str, amount: float = 1.0, destination: Optional[str] = None) -> bool:
+        """Increase a place's popularity, e.g. when it is searched for"""
+        identity = (normalize_term(name), normalize_term(destination) if destination else None)
+        with self._lock:
+            entry_id = self._ids_by_name.get(identity)
+            if entry_id is None:
+                return False
+            self._popularity[entry_id] += amount
+            if amount >= 0:
+                self._promote(entry_id, identity[0])
+            else:
+                self._forget(identity[0])
+            return True
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Up to ``limit`` places with a word starting with prefix, most popular first"""
+        term = normalize_term(prefix)
+        if not term:
+            return []
+        limit = max(1, min(limit, self.max_limit))
+        with self._lock:
+            if self._pending:
+                self._merge_pending()
+            entry_ids = self._memo.get(term)
+            if entry_ids is None:
+                entry_ids = self._top(term)
+                if len(term) <= _MEMO_PREFIX_LENGTH:
+                    self._memo[term] = entry_ids
+            return [dict(self._entries[entry_id]) for entry_id in entry_ids[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _memo_prefixes(self, term: str) -> Set[str]:
+        """Memoizable prefixes an entry named ``term`` matches"""
+        return {word[:length] for word in term.split(" ") for length in range(1, _MEMO_PREFIX_LENGTH + 1)}
+
+    def _promote(self, entry_id: int, term: str) -> None:
+        """Re-rank an entry that was added or became more popular in the memoized results (caller holds the lock).
+
+        A memoized list holds the best ``max_limit`` matches, or every match
+        when it is shorter, so moving the entry to its new rank, if that is
+        within the list, keeps it exact.
+        """
+        rank = self._rank(entry_id)
+        for prefix in self._memo_prefixes(term):
+            entry_ids = self._memo.get(prefix)
+            if entry_ids is None:
+                continue
+            if entry_id in entry_ids:
+                entry_ids.remove(entry_id)
+            elif len(entry_ids) >= self.max_limit and rank >= self._rank(entry_ids[-1]):
+                continue
+            ranks = [self._rank(other) for other in entry_ids]
+            entry_ids.insert(bisect.bisect_left(ranks, rank), entry_id)
+            del entry_ids[self.max_limit:]
+
+    def _forget(self, term: str) -> None:
+        """Drop memoized results an entry named ``term`` can appear in (caller holds the lock)"""
+        for prefix in self._memo_prefixes(term):
+            self._memo.pop(prefix, None)
+
+    def _rank(self, entry_id: int) -> Tuple[float, int, str]:
+        """Sort key: most popular first, ties to the shorter, then alphabetically first, name"""
+        name = self._entries[entry_id]["name"]
+        return (-self._popularity[entry_id], len(name), name)
+
+    def _merge_pending(self) -> None:
+        """Fold newly added keys into the sorted arrays (caller holds the lock)"""
+        pairs = list(zip(self._keys, self._entry_ids)) + self._pending
+        # Already-sorted runs make this close to linear for small batches
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._entry_ids = [entry_id for _, entry_id in pairs]
+        self._pending = []
+
+    def _top(self, term: str) -> List[int]:
+        """Best max_limit entries for a prefix (caller holds the lock)"""
+        low = bisect.bisect_left(self._keys, term)
+        # U+FFFF sorts after every character a normalized key can contain
+        high = bisect.bisect_left(self._keys, term + "\uffff", low)
+        candidates = set(self._entry_ids[low:high])
+        return heapq.nsmallest(self.max_limit, candidates, key=self._rank)
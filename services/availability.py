@@ -0,0 +1,332 @@
+"""
+Room-Night Availability Engine
+Per-hotel, per-room-type inventory held as rows of per-night counters, so a stay is a
+slice of one row and a city is a block of rows; both are answered with range minimums.
+"""
+
+import logging
+import threading
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Day = Union[date, datetime]
+
+# Rows are allocated in chunks of this many; a chunk never moves once allocated
+CHUNK_ROWS = 256
+
+# Reservations lock one of this many stripes, chosen by hotel, instead of the whole engine
+LOCK_STRIPES = 64
+
+class _CityInventory:
+    """Inventory rows for one city, stored in fixed-size chunks so growth never copies rows"""
+
+    def __init__(self, horizon: int):
+        self.horizon = horizon
+        self.chunks: List[np.ndarray] = []
+        # Rooms each row holds per night before any are reserved, in chunks matching ``chunks``
+        self.capacity: List[np.ndarray] = []
+        self.hotel_ids: List[str] = []
+        self.room_types: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.hotel_ids)
+
+    def add_row(self, hotel_id: str, room_type: str) -> Tuple[np.ndarray, np.ndarray, int]:
+        row = len(self.hotel_ids)
+        if row % CHUNK_ROWS == 0:
+            self.chunks.append(np.zeros((CHUNK_ROWS, self.horizon), dtype=np.int16))
+            self.capacity.append(np.zeros((CHUNK_ROWS, self.horizon), dtype=np.int16))
+        self.hotel_ids.append(hotel_id)
+        self.room_types.append(room_type)
+        return self.chunks[-1], self.capacity[-1], row % CHUNK_ROWS
+
+    def filled_chunks(self) -> Iterable[Tuple[int, np.ndarray]]:
+        """(first row, used part of chunk) for every chunk"""
+        for index, chunk in enumerate(self.chunks):
+            first = index * CHUNK_ROWS
+            yield first, chunk[:min(CHUNK_ROWS, len(self) - first)]
+
+class AvailabilityEngine:
+    """Rooms left per night for each (hotel, room type) over a rolling horizon.
+
+    Night ``d`` is column ``d - start``; a stay [check_in, check_out) is the
+    column slice between them, so "free for every night" is one ``min``
+    over that slice and "which hotels in a city" is one ``min(axis=1)`` per
+    chunk of that city's rows. Counters are int16, so 5,000 hotels with
+    four room types over 365 nights take about 15 MB.
+
+    ``reserve`` checks and decrements a stay's nights as one step under a
+    per-hotel lock stripe, so concurrent bookings of the same hotel are
+    serialized while bookings of other hotels, and searches, carry on.
+
+    Without an explicit ``start`` the horizon begins today and rolls with
+    ``today``: on a later day the nights that have passed are dropped and
+    as many new ones open at the end, stocked with each row's last-night
+    capacity. Each stripe keeps its own start and rolls on its own, so a
+    booking waits for at most its own stripe's rows to move, and a city
+    search rolls the stripes that have not moved yet. An explicit ``start``
+    stays put unless a ``today`` clock is passed too.
+    """
+
+    def __init__(self,
+                 start: Optional[Day] = None,
+                 horizon_days: int = 365,
+                 today: Optional[Callable[[], Day]] = None):
+        self._today = today or (date.today if start is None else None)
+        self.start = _as_date(start or self._today())
+        self.horizon_days = horizon_days
+        self._cities: Dict[str, _CityInventory] = {}
+        self._rows: Dict[Tuple[str, str], Tuple[np.ndarray, int]] = {}
+        self._capacity: Dict[Tuple[str, str], np.ndarray] = {}
+        self._room_types: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        # Horizon start of each stripe's rows, and the (counts, capacity, row) rows it rolls
+        self._stripe_starts = [self.start] * LOCK_STRIPES
+        self._stripe_rows: List[List[Tuple[np.ndarray, np.ndarray, int]]] = [[] for _ in range(LOCK_STRIPES)]
+
+    def set_inventory(self,
+                      hotel_id: str,
+                      room_type: str,
+                      rooms: int,
+                      city: Optional[str] = None,
+                      start: Optional[Day] = None,
+                      end: Optional[Day] = None) -> None:
+        """Set the rooms of one type for nights [start, end), the whole horizon by default.
+
+        ``city`` is required the first time a (hotel, room type) is added.
+        """
+        if not 0 <= rooms <= np.iinfo(np.int16).max:
+            raise ValueError(f"Invalid room count: {rooms}")
+        index = self._stripe_index(hotel_id)
+        self._roll_stripe(index)
+        with self._lock, self._stripes[index]:
+            base = self._stripe_starts[index]
+            first, last = self._columns(start or base, end or base + timedelta(days=self.horizon_days), base)
+            key = (hotel_id, room_type)
+            if key not in self._rows:
+                if not city:
+                    raise ValueError(f"City required for new inventory row {hotel_id}/{room_type}")
+                inventory = self._cities.setdefault(_city_key(city), _CityInventory(self.horizon_days))
+                chunk, capacity, row = inventory.add_row(hotel_id, room_type)
+                self._rows[key] = (chunk, row)
+                self._capacity[key] = capacity
+                self._stripe_rows[index].append((chunk, capacity, row))
+                self._room_types.setdefault(hotel_id, []).append(room_type)
+            chunk, row = self._rows[key]
+            chunk[row, first:last] = rooms
+            self._capacity[key][row, first:last] = rooms
+
+    def tracks(self, hotel_id: str) -> bool:
+        """Whether the engine holds inventory for a hotel"""
+        return hotel_id in self._room_types
+
+    def available_rooms(self, hotel_id: str, room_type: str, check_in: Day, check_out: Day) -> int:
+        """Rooms of a type free on every night of the stay (0 if the type is unknown)"""
+        index = self._stripe_index(hotel_id)
+        self._roll_stripe(index)
+        with self._stripes[index]:
+            first, last = self._columns(check_in, check_out, self._stripe_starts[index])
+            location = self._rows.get((hotel_id, room_type))
+            if location is None:
+                return 0
+            chunk, row = location
+            return int(chunk[row, first:last].min())
+
+    def is_available(self, hotel_id: str, room_type: str, check_in: Day, check_out: Day, rooms: int = 1) -> bool:
+        """Whether ``rooms`` rooms of a type are free for every night of the stay"""
+        return self.available_rooms(hotel_id, room_type, check_in, check_out) >= rooms
+
+    def reserve(self, hotel_id: str, room_type: str, check_in: Day, check_out: Day, rooms: int = 1) -> bool:
+        """Take ``rooms`` rooms for every night of the stay if all are free; returns whether it did"""
+        if rooms < 1:
+            raise ValueError(f"Invalid room count: {rooms}")
+        index = self._stripe_index(hotel_id)
+        self._roll_stripe(index)
+        # Rows never move once added, so the lookup needs no engine-wide lock
+        location = self._rows.get((hotel_id, room_type))
+        with self._stripes[index]:
+            # Columns are worked out under the stripe, which its horizon cannot roll past
+            first, last = self._columns(check_in, check_out, self._stripe_starts[index])
+            if location is None:
+                return False
+            chunk, row = location
+            nights = chunk[row, first:last]
+            if nights.min() < rooms:
+                return False
+            nights -= rooms
+            return True
+
+    def reserve_many(self, stays: List[Tuple[str, str, Day, Day, int]], atomic: bool = False) -> List[bool]:
+        """Reserve (hotel_id, room_type, check_in, check_out, rooms) stays; returns which succeeded.
+
+        A stay with dates the engine cannot book fails on its own instead of
+        failing the batch. With ``atomic`` every stay is reserved or none
+        is: the stripes of all hotels involved are locked together (in a
+        fixed order, so batches cannot deadlock each other) and on any
+        shortfall the rooms already taken are given back. The result then
+        marks the stays that could not be met.
+        """
+        located = []
+        for hotel_id, room_type, check_in, check_out, rooms in stays:
+            location = self._rows.get((hotel_id, room_type)) if rooms >= 1 else None
+            located.append((self._stripe_index(hotel_id), location, check_in, check_out, rooms)
+                           if location is not None else None)
+        involved = sorted({stay[0] for stay in located if stay is not None})
+        for index in involved:
+            self._roll_stripe(index)
+
+        # Stripes are taken in index order, so batches cannot deadlock each other
+        ordered = involved if atomic else []
+        for index in ordered:
+            self._stripes[index].acquire()
+        try:
+            results, taken = [], []
+            for stay in located:
+                if stay is None:
+                    results.append(False)
+                    continue
+                index, (chunk, row), check_in, check_out, rooms = stay
+                with (nullcontext() if atomic else self._stripes[index]):
+                    try:
+                        first, last = self._columns(check_in, check_out, self._stripe_starts[index])
+                    except ValueError:
+                        results.append(False)
+                        continue
+                    nights = chunk[row, first:last]
+                    if nights.min() < rooms:
+                        results.append(False)
+                        continue
+                    nights -= rooms
+                taken.append((nights, rooms))
+                results.append(True)
+            if atomic and not all(results):
+                for nights, rooms in taken:
+                    nights += rooms
+            return results
+        finally:
+            for index in reversed(ordered):
+                self._stripes[index].release()
+
+    def release(self, hotel_id: str, room_type: str, check_in: Day, check_out: Day, rooms: int = 1) -> None:
+        """Give back rooms taken by ``reserve``, e.g. when the booking could not be confirmed.
+
+        No night goes above its capacity, so releasing a stay twice cannot create rooms.
+        """
+        index = self._stripe_index(hotel_id)
+        self._roll_stripe(index)
+        location = self._rows.get((hotel_id, room_type))
+        if location is None:
+            return
+        chunk, row = location
+        capacity = self._capacity[(hotel_id, room_type)]
+        with self._stripes[index]:
+            first, last = self._columns(check_in, check_out, self._stripe_starts[index])
+            nights = chunk[row, first:last]
+            np.minimum(nights + rooms, capacity[row, first:last], out=nights)
+
+    def room_availability(self, hotel_id: str, check_in: Day, check_out: Day, rooms: int = 1) -> List[Dict[str, object]]:
+        """Each room type of a hotel with at least ``rooms`` rooms free for the whole stay"""
+        index = self._stripe_index(hotel_id)
+        self._roll_stripe(index)
+        with self._stripes[index]:
+            first, last = self._columns(check_in, check_out, self._stripe_starts[index])
+            result = []
+            for room_type in self._room_types.get(hotel_id, []):
+                chunk, row = self._rows[(hotel_id, room_type)]
+                free = int(chunk[row, first:last].min())
+                if free >= rooms:
+                    result.append({"room_type": room_type, "available_rooms": free})
+            return result
+
+    def hotels_with_availability(self,
+                                 city: str,
+                                 check_in: Day,
+                                 check_out: Day,
+                                 rooms: int = 1,
+                                 room_type: Optional[str] = None) -> Set[str]:
+        """Hotels in a city with ``rooms`` rooms (of ``room_type``, if given) free for the whole stay"""
+        with self._lock:
+            # No stripe rolls while the engine lock is held, so once this returns every row starts at ``start``
+            self._roll()
+            first, last = self._columns(check_in, check_out, self.start)
+            inventory = self._cities.get(_city_key(city))
+            if inventory is None:
+                return set()
+            available: Set[str] = set()
+            for offset, block in inventory.filled_chunks():
+                # Range minimum over the stay for every row in the block at once
+                rows = np.flatnonzero(block[:, first:last].min(axis=1) >= rooms)
+                for row in rows:
+                    index = offset + int(row)
+                    if room_type is None or inventory.room_types[index] == room_type:
+                        available.add(inventory.hotel_ids[index])
+            return available
+
+    def _stripe_index(self, hotel_id: str) -> int:
+        return hash(hotel_id) % LOCK_STRIPES
+
+    def _roll(self) -> None:
+        """Move the horizon to start today, if the clock has passed ``start``, one stripe at a time"""
+        if self._today is None:
+            return
+        today = _as_date(self._today())
+        if today <= self.start:
+            return
+        for index in range(LOCK_STRIPES):
+            self._roll_stripe(index, today)
+        with self._lock:
+            if today > self.start:
+                days = (today - self.start).days
+                self.start = today
+                logger.info(f"Availability horizon moved {days} day(s) to start {today}")
+
+    def _roll_stripe(self, index: int, today: Optional[date] = None) -> None:
+        """Move one stripe's rows to start today, if the clock has passed that stripe's start"""
+        if self._today is None:
+            return
+        today = today or _as_date(self._today())
+        if today <= self._stripe_starts[index]:
+            return
+        # The engine lock keeps city searches from reading rows halfway through a roll
+        with self._lock, self._stripes[index]:
+            days = (today - self._stripe_starts[index]).days
+            if days <= 0:
+                return
+            for counts, capacity, row in self._stripe_rows[index]:
+                _shift_row(counts, capacity, row, days)
+            self._stripe_starts[index] = today
+
+    def _columns(self, check_in: Day, check_out: Day, start: date) -> Tuple[int, int]:
+        """Column slice for nights [check_in, check_out) of rows whose horizon begins at ``start``"""
+        first = (_as_date(check_in) - start).days
+        last = (_as_date(check_out) - start).days
+        if last <= first:
+            raise ValueError("Check-out must be after check-in")
+        if first < 0 or last > self.horizon_days:
+            raise ValueError(f"Dates must fall within {start} and {start + timedelta(days=self.horizon_days)}")
+        return first, last
+
+def _shift_row(counts: np.ndarray, capacity: np.ndarray, row: int, days: int) -> None:
+    """Drop a row's first ``days`` nights and open as many new ones at the end.
+
+    New nights start with the row's capacity on its last night.
+    """
+    horizon = counts.shape[1]
+    keep = max(horizon - days, 0)
+    standing = capacity[row, -1]
+    counts[row, :keep] = counts[row, horizon - keep:]
+    capacity[row, :keep] = capacity[row, horizon - keep:]
+    counts[row, keep:] = standing
+    capacity[row, keep:] = standing
+
+def _as_date(value: Day) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+def _city_key(city: str) -> str:
+    return " ".join(city.lower().split())
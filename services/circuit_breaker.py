@@ -0,0 +1,206 @@
+"""
+Provider Circuit Breakers and Adaptive Concurrency
+Per-provider guards so a degraded upstream fails fast instead of consuming the request's latency budget.
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+class ProviderUnavailableError(Exception):
+    """Raised instead of calling a provider that is currently being shed"""
+    reason = "unavailable"
+
+    def __init__(self, provider: str):
+        super().__init__(f"Provider {provider} is {self.reason.replace('_', ' ')}")
+        self.provider = provider
+
+class CircuitOpenError(ProviderUnavailableError):
+    """The provider's circuit breaker is open"""
+    reason = "circuit_open"
+
+class ConcurrencyLimitError(ProviderUnavailableError):
+    """The provider already has as many calls in flight as its adaptive limit allows"""
+    reason = "overloaded"
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker driven by error rate and slow-call rate.
+
+    Outcomes of the last ``window_size`` calls are kept. Once at least
+    ``min_calls`` are recorded and either the failure rate or the share of
+    calls slower than ``slow_call_seconds`` crosses its threshold, the
+    breaker opens and rejects calls for ``open_seconds``. It then lets up to
+    ``half_open_calls`` trial calls through: one failure reopens it, that
+    many successes close it again with a fresh window.
+
+    Every state change starts a new ``generation``. Callers that note the
+    generation when a call is allowed and pass it to ``record`` or
+    ``abandon`` have calls admitted under an earlier state ignored, so a
+    slow call let through while closed can neither count as a half-open
+    trial nor reopen a breaker that has closed again.
+
+    Instances are meant to be used from a single event loop.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self,
+                 window_size: int = 20,
+                 min_calls: int = 10,
+                 failure_rate_threshold: float = 0.5,
+                 slow_call_seconds: float = 3.0,
+                 slow_rate_threshold: float = 0.8,
+                 open_seconds: float = 30.0,
+                 half_open_calls: int = 3,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self.state = self.CLOSED
+        self.generation = 0
+        self._opened_at = 0.0
+        self._trials_started = 0
+        self._trial_successes = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now"""
+        if self.state == self.OPEN:
+            if self._clock() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self._enter(self.HALF_OPEN)
+            self._trials_started = 0
+            self._trial_successes = 0
+        if self.state == self.HALF_OPEN:
+            if self._trials_started >= self.half_open_calls:
+                self.rejected += 1
+                return False
+            self._trials_started += 1
+        return True
+
+    def abandon(self, generation: Optional[int] = None) -> None:
+        """Give back a call allow() let through (in ``generation``, if given) that was never made"""
+        if generation is not None and generation != self.generation:
+            return
+        if self.state == self.HALF_OPEN and self._trials_started > 0:
+            self._trials_started -= 1
+
+    def record(self, failed: bool, latency: float, generation: Optional[int] = None) -> None:
+        """Record the outcome of a call that allow() let through (in ``generation``, if given)"""
+        if generation is not None and generation != self.generation:
+            return
+        slow = latency >= self.slow_call_seconds
+        if self.state == self.HALF_OPEN:
+            if failed or slow:
+                self._open()
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self._enter(self.CLOSED)
+                self._outcomes.clear()
+            return
+        if self.state == self.OPEN:
+            return
+
+        self._outcomes.append((failed, slow))
+        if len(self._outcomes) < self.min_calls:
+            return
+        failure_rate, slow_rate = self._rates()
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_rate_threshold:
+            self._open()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and window statistics for monitoring"""
+        failure_rate, slow_rate = self._rates()
+        return {
+            "state": self.state,
+            "calls_in_window": len(self._outcomes),
+            "failure_rate": round(failure_rate, 3),
+            "slow_call_rate": round(slow_rate, 3),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in": round(max(self.open_seconds - (self._clock() - self._opened_at), 0), 1)
+            if self.state == self.OPEN else 0
+        }
+
+    def _rates(self) -> Tuple[float, float]:
+        if not self._outcomes:
+            return 0.0, 0.0
+        calls = len(self._outcomes)
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        return failures / calls, slow / calls
+
+    def _enter(self, state: str) -> None:
+        self.state = state
+        self.generation += 1
+
+    def _open(self) -> None:
+        self._enter(self.OPEN)
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.times_opened += 1
+
+class AdaptiveLimiter:
+    """AIMD limit on in-flight calls to one provider.
+
+    Each fast success raises the limit by roughly one per limit's worth of
+    calls; a failure or call slower than ``latency_target`` multiplies it by
+    ``backoff``. Calls beyond the limit are rejected rather than queued.
+
+    Every decrease starts a new ``window``. Callers that note the window
+    when a slot is taken and pass it to ``release`` back off at most once
+    per window: a burst of calls that all failed together, having started
+    before the limit came down, costs one step rather than one each.
+    """
+
+    def __init__(self,
+                 initial_limit: int = 20,
+                 min_limit: int = 1,
+                 max_limit: int = 200,
+                 latency_target: float = 1.0,
+                 backoff: float = 0.7):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self.rejected = 0
+        self.window = 0
+
+    def try_acquire(self) -> bool:
+        """Take an in-flight slot if one is free"""
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, failed: bool, latency: float, window: Optional[int] = None) -> None:
+        """Free a slot taken (in ``window``, if given) and adapt the limit to the call's outcome"""
+        self.in_flight -= 1
+        if failed or latency > self.latency_target:
+            if window is not None and window != self.window:
+                # The limit already came down after this call started
+                return
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self.window += 1
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,77 @@
+"""
+Deadlines and Hedged Requests
+Helpers that bound provider fan-outs by a time budget and hedge slow providers with a second attempt.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .circuit_breaker import ProviderUnavailableError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Call = Callable[[], Awaitable[Any]]
+
+TIMED_OUT = "timeout"
+FAILED = "error"
+
+def failure_reason(error: BaseException) -> str:
+    """Why a provider produced no result: its shedding reason, or a plain failure"""
+    if isinstance(error, ProviderUnavailableError):
+        return error.reason
+    return FAILED
+
+async def hedged(call: Call, hedge_after: Optional[float] = None) -> Any:
+    """Run call(); if it has not finished after hedge_after seconds, race a second attempt.
+
+    The first attempt to succeed wins and the other is cancelled. An attempt
+    that fails does not end the race while the other is still running.
+    """
+    if hedge_after is None:
+        return await call()
+
+    first = asyncio.ensure_future(call())
+    attempts = {first}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+        if not done:
+            attempts.add(asyncio.ensure_future(call()))
+        error: Optional[BaseException] = None
+        while attempts:
+            done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+                error = attempt.exception()
+        raise error
+    finally:
+        for attempt in attempts:
+            attempt.cancel()
+
+async def gather_within(calls: Dict[str, Call], timeout: Optional[float]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Run named calls concurrently under one deadline.
+
+    Returns the results of the calls that succeeded in time, and for every
+    other call whether it timed out or failed. Calls still running when the
+    deadline passes are cancelled.
+    """
+    tasks = {asyncio.ensure_future(call()): name for name, call in calls.items()}
+    if not tasks:
+        return {}, {}
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+    results: Dict[str, Any] = {}
+    missing: Dict[str, str] = {}
+    for task in done:
+        name = tasks[task]
+        if task.exception() is not None:
+            missing[name] = failure_reason(task.exception())
+            logger.error(f"Error from provider {name}: {str(task.exception())}")
+        else:
+            results[name] = task.result()
+    for task in pending:
+        missing[tasks[task]] = TIMED_OUT
+    return results, missing
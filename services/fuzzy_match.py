@@ -0,0 +1,130 @@
+"""
+Fuzzy Destination Matching
+Trigram index for candidate generation plus bounded edit-distance verification, so a
+misspelled destination resolves to a known one without comparing against every name.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .autocomplete import normalize_term
+
+def trigrams(term: str) -> List[str]:
+    """Padded character trigrams; the padding lets word starts and ends count"""
+    padded = f"  {term} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Edit distance (insert, delete, substitute, swap adjacent) if at most max_distance, else None.
+
+    Only a band of width 2 * max_distance + 1 around the diagonal is
+    computed, and the computation stops as soon as a row exceeds the bound.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if a == b:
+        return 0
+    too_far = max_distance + 1
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        current[0] = i
+        low, high = max(1, i - max_distance), min(len(b), i + max_distance)
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = min(value, too_far)
+        if min(current[max(0, low - 1):high + 1]) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+    return previous[len(b)] if previous[len(b)] <= max_distance else None
+
+class DestinationResolver:
+    """Resolves free-text destinations to known destination names.
+
+    Exact matches (after case, accent, hyphen and whitespace normalization)
+    win outright. Otherwise names sharing enough trigrams with the query are
+    verified with a bounded edit distance; the closest wins, ties going to
+    the name sharing more trigrams. Answers, including "no match", are kept
+    in a bounded LRU so repeated misspellings cost one dict lookup.
+    """
+
+    def __init__(self, names: Iterable[str] = (), max_distance: int = 2, cache_size: int = 4096):
+        self.max_distance = max_distance
+        self.cache_size = cache_size
+        self._names: List[str] = []
+        self._known: Dict[str, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._cache: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"exact": 0, "cached": 0, "fuzzy": 0, "unresolved": 0}
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> None:
+        """Make a destination resolvable"""
+        term = normalize_term(name)
+        with self._lock:
+            if not term or term in self._known:
+                return
+            self._known[term] = name
+            name_id = len(self._names)
+            self._names.append(term)
+            for gram in set(trigrams(term)):
+                self._postings.setdefault(gram, set()).add(name_id)
+            # A new name can change earlier answers
+            self._cache.clear()
+
+    def resolve(self, query: str) -> Optional[str]:
+        """The known destination a query refers to, or None"""
+        term = normalize_term(query)
+        if not term:
+            return None
+        with self._lock:
+            if term in self._known:
+                self._stats["exact"] += 1
+                return self._known[term]
+            if term in self._cache:
+                self._cache.move_to_end(term)
+                self._stats["cached"] += 1
+                return self._cache[term]
+
+            match = self._closest(term)
+            self._stats["fuzzy" if match is not None else "unresolved"] += 1
+            self._cache[term] = match
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return match
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, cached_aliases=len(self._cache))
+
+    def _closest(self, term: str) -> Optional[str]:
+        """Best verified candidate for a term (caller holds the lock)"""
+        # Short names tolerate fewer edits: one edit already changes a third of "rio"
+        max_distance = min(self.max_distance, 0 if len(term) < 4 else 1 if len(term) < 8 else 2)
+        if max_distance == 0:
+            return None
+        grams = trigrams(term)
+        shared: Counter = Counter()
+        for gram in set(grams):
+            shared.update(self._postings.get(gram, ()))
+        # An edit changes at most three trigrams, an adjacent swap four
+        required = max(1, len(set(grams)) - 4 * max_distance)
+
+        best: Optional[Tuple[int, int, str]] = None
+        for name_id, count in shared.items():
+            if count < required:
+                continue
+            candidate = self._names[name_id]
+            distance = bounded_edit_distance(term, candidate, max_distance)
+            if distance is None:
+                continue
+            rank = (distance, -count, candidate)
+            if best is None or rank < best:
+                best = rank
+        return self._known[best[2]] if best is not None else None
@@ -4,102 +4,259 @@ Combines and filters results from multiple hotel providers.
 """
 
 import asyncio
+import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from .hotel_providers import BookingComProvider, OpenTravelProvider
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Hashable
+from .single_flight import SingleFlight, freeze
+from .search_filters import compile_filters
+from .pagination import top_k_page, field_sort_key
+from .deadlines import hedged, gather_within, failure_reason, TIMED_OUT
+from .http_client import HTTPClientPool
+from .hotel_dedup import HotelDeduplicator
+from .availability import AvailabilityEngine
+from .circuit_breaker import CircuitBreaker, AdaptiveLimiter, CircuitOpenError, ConcurrencyLimitError
+
+# Configure logging
+logger = logging.getLogger(__name__)
 
 class HotelAggregator:
-    """Aggregates hotel data from multiple providers."""
+    """Aggregates hotel data from multiple providers.
     
-    def __init__(self):
-        self.providers = [
-            BookingComProvider(),
-            OpenTravelProvider()
-        ]
+    Providers are passed in; each needs a ``name`` and async
+    ``search_hotels`` and ``get_room_availability`` methods.
+    """
+    
+    def __init__(self,
+                 providers: List[Any],
+                 timeout: float = 10.0,
+                 provider_timeouts: Optional[Dict[str, float]] = None,
+                 hedge_delays: Optional[Dict[str, float]] = None,
+                 http_client: Optional[HTTPClientPool] = None,
+                 breaker_options: Optional[Dict[str, Any]] = None,
+                 limiter_options: Optional[Dict[str, Any]] = None,
+                 deduplicator: Optional[HotelDeduplicator] = None,
+                 availability: Optional[AvailabilityEngine] = None):
+        self.providers = list(providers)
+        # Every provider shares one pooled client unless it was given its own
+        self.http_client = http_client or HTTPClientPool()
+        for provider in self.providers:
+            if getattr(provider, "http_client", None) is None:
+                provider.http_client = self.http_client
+        # Whole-request deadline, optionally tightened per provider
+        self.timeout = timeout
+        self.provider_timeouts = provider_timeouts or {}
+        # Seconds after which a second attempt is raced against a slow provider
+        # (typically its p95 latency); providers not listed are never hedged
+        self.hedge_delays = hedge_delays or {}
+        # Identical concurrent searches share one provider fan-out
+        self._search_flight = SingleFlight()
+        # Merges the same property reported by several providers
+        self.deduplicator = deduplicator or HotelDeduplicator()
+        # Local room-night inventory; hotels it tracks are answered without a fan-out
+        self.availability = availability
+        # Per-provider breaker and adaptive in-flight limit, so a degraded
+        # provider is shed quickly instead of holding every request to the deadline
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.limiters: Dict[str, AdaptiveLimiter] = {}
+        for provider in self.providers:
+            name = self._provider_name(provider)
+            self.breakers[name] = CircuitBreaker(**(breaker_options or {}))
+            self.limiters[name] = AdaptiveLimiter(**(limiter_options or {}))
     
     async def search_hotels(self,
                           location: str,
                           check_in: datetime,
                           check_out: datetime,
                           guests: int,
-                          filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Search hotels across all providers."""
+                          filters: Optional[Dict[str, Any]] = None,
+                          limit: Optional[int] = None,
+                          cursor: Optional[str] = None,
+                          timeout: Optional[float] = None,
+                          share_fan_out: bool = False) -> Dict[str, Any]:
+        """Search hotels across all providers.
         
-        # Create tasks for each provider
-        tasks = [
-            provider.search_hotels(
-                location=location,
-                check_in=check_in,
-                check_out=check_out,
-                guests=guests,
-                filters=filters
-            )
-            for provider in self.providers
-        ]
+        When ``limit`` is given only one page is returned, picked by top-k
+        selection after ``cursor``, together with the cursor for the next page.
+        Providers that miss the deadline are left out and listed in
+        ``missing_sources``. A property returned by several providers appears
+        once, at its best price, with every provider listed in ``sources``.
+        With ``share_fan_out`` providers are asked without filters, so every
+        search for the same stay shares one fan-out whatever its filters.
+        """
         
-        # Execute all searches concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Concurrent identical searches join the fan-out already in flight;
+        # the shared result is never mutated, filtering below builds a new list.
+        # The deadline is part of the key, so no search waits on a longer fan-out
+        provider_filters = None if share_fan_out else filters
+        key = (location, check_in, check_out, guests, freeze(provider_filters or {}), timeout)
+        fan_out = await self._search_flight.do(
+            key,
+            lambda: self._fan_out_search(location, check_in, check_out, guests, provider_filters, timeout)
+        )
         
-        # Combine and process results
-        all_hotels = []
-        for provider_results in results:
-            if isinstance(provider_results, list):  # Successful result
-                all_hotels.extend(provider_results)
-            else:  # Exception occurred
-                print(f"Error from provider: {str(provider_results)}")
-        
-        # Apply global filters
-        if filters:
-            if filters.get("no_payment_only"):
-                all_hotels = [
-                    hotel for hotel in all_hotels
-                    if not hotel.get("payment_required", True)
-                ]
-            
-            if filters.get("free_cancellation_only"):
-                all_hotels = [
-                    hotel for hotel in all_hotels
-                    if hotel.get("free_cancellation", False)
-                ]
-            
-            if filters.get("min_price") is not None:
-                all_hotels = [
-                    hotel for hotel in all_hotels
-                    if hotel.get("price", 0) >= filters["min_price"]
-                ]
-            
-            if filters.get("max_price") is not None:
-                all_hotels = [
-                    hotel for hotel in all_hotels
-                    if hotel.get("price", 0) <= filters["max_price"]
-                ]
-            
-            if filters.get("min_rating") is not None:
-                all_hotels = [
-                    hotel for hotel in all_hotels
-                    if hotel.get("rating", 0) >= filters["min_rating"]
-                ]
+        # Apply global filters in a single pass, most selective first
+        all_hotels = compile_filters(filters).apply(fan_out["hotels"])
         
         # Sort results
         sort_by = filters.get("sort_by", "price") if filters else "price"
         reverse = filters.get("sort_order", "asc") == "desc" if filters else False
+        # Higher ratings first
+        descending = reverse != (sort_by == "rating")
         
-        all_hotels.sort(
-            key=lambda x: (
-                x.get(sort_by, 0) if sort_by != "rating" 
-                else x.get(sort_by, 0) * -1  # Higher ratings first
-            ),
-            reverse=reverse
-        )
+        total = len(all_hotels)
+        next_cursor = None
+        if limit is not None:
+            all_hotels, next_cursor = top_k_page(all_hotels, limit, sort_by, descending, cursor)
+        else:
+            all_hotels.sort(key=field_sort_key(sort_by), reverse=descending)
         
         return {
-            "total": len(all_hotels),
+            "total": total,
             "hotels": all_hotels,
+            "next_cursor": next_cursor,
             "filters_applied": filters or {},
-            "sources": [
-                "Booking.com",
-                "OpenStreetMap",
-                "Wikivoyage"
+            "sources": fan_out["sources"],
+            "missing_sources": fan_out["missing_sources"],
+            "partial": bool(fan_out["missing_sources"])
+        }
+    
+    async def search_many(self,
+                          queries: Dict[Hashable, Dict[str, Any]],
+                          timeout: Optional[float] = None) -> Dict[Hashable, Dict[str, Any]]:
+        """Run several ``search_hotels`` queries concurrently within one deadline.
+        
+        Queries for the same stay share one provider fan-out (see
+        ``share_fan_out``); every filter is applied locally, so results match
+        separate searches. Providers get 90% of the deadline, leaving the rest
+        to merge and page; a provider still running then is left out, so its
+        query comes back ``partial`` with whatever the others returned.
+        Results are keyed like ``queries``; a query that fails gets an
+        ``error`` instead.
+        """
+        budget = timeout if timeout is not None else self.timeout
+        # Each search bounds its own provider calls, so none is cut off (and its hotels lost) here
+        outcomes = await asyncio.gather(*[
+            self.search_hotels(**query, timeout=budget * 0.9, share_fan_out=True)
+            for query in queries.values()
+        ], return_exceptions=True)
+        
+        results = {}
+        for key, outcome in zip(queries, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error in batch search: {str(outcome)}")
+                results[key] = {"error": "Failed to search hotels", "reason": failure_reason(outcome)}
+            else:
+                results[key] = outcome
+        return results
+    
+    async def stream_hotels(self,
+                            location: str,
+                            check_in: datetime,
+                            check_out: datetime,
+                            guests: int,
+                            filters: Optional[Dict[str, Any]] = None,
+                            timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each provider's filtered hotels as soon as that provider answers.
+        
+        Time to first result tracks the fastest provider instead of the slowest.
+        Properties already sent by an earlier provider are not repeated: each
+        event's ``hotels`` are new properties, and ``merged`` holds
+        ``{"id", "hotel"}`` updates for properties sent earlier (under
+        ``id``) that this provider also lists.
+        Hotels the local inventory knows to be full for the stay are left
+        out, as in ``search_hotels``.
+        Providers still running at the deadline are reported as timed out.
+        Closing the generator early cancels the providers still running.
+        """
+        pipeline = compile_filters(filters)
+        session = self.deduplicator.session()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout if timeout is not None else self.timeout)
+        pending = {
+            asyncio.ensure_future(self._provider_call(
+                provider, "search_hotels",
+                location=location,
+                check_in=check_in,
+                check_out=check_out,
+                guests=guests,
+                filters=filters
+            )()): self._provider_name(provider)
+            for provider in self.providers
+        }
+        try:
+            while pending:
+                remaining = max(deadline - loop.time(), 0)
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Budget spent: report the stragglers and stop waiting for them
+                    for source in pending.values():
+                        yield {"source": source, "hotels": [], "merged": [], "error": True, "timed_out": True,
+                               "reason": TIMED_OUT}
+                    return
+                for task in done:
+                    source = pending.pop(task)
+                    if task.exception() is not None:
+                        logger.error(f"Error from provider {source}: {str(task.exception())}")
+                        yield {
+                            "source": source,
+                            "hotels": [],
+                            "merged": [],
+                            "error": True,
+                            "timed_out": False,
+                            "reason": failure_reason(task.exception())
+                        }
+                        continue
+                    result = task.result()
+                    hotels = pipeline.apply(result if isinstance(result, list) else [])
+                    new, grown = session.add(self._drop_sold_out(hotels, location, check_in, check_out))
+                    yield {
+                        "source": source,
+                        "hotels": [session.hotel(index) for index in new],
+                        "merged": [
+                            {"id": session.clusters[index][0].get("id"), "hotel": session.hotel(index)}
+                            for index in grown
+                        ],
+                        "error": False,
+                        "timed_out": False,
+                        "reason": None
+                    }
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _fan_out_search(self,
+                              location: str,
+                              check_in: datetime,
+                              check_out: datetime,
+                              guests: int,
+                              filters: Optional[Dict[str, Any]],
+                              timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Query every provider concurrently within the deadline and merge their hotel lists."""
+        
+        calls = {
+            self._provider_name(provider): self._provider_call(
+                provider, "search_hotels",
+                location=location,
+                check_in=check_in,
+                check_out=check_out,
+                guests=guests,
+                filters=filters
+            )
+            for provider in self.providers
+        }
+        results, missing = await gather_within(calls, timeout if timeout is not None else self.timeout)
+        
+        # Combine results in provider order, merging properties listed by several providers
+        all_hotels = []
+        for name in calls:
+            if isinstance(results.get(name), list):
+                all_hotels.extend(results[name])
+        
+        return {
+            "hotels": self._drop_sold_out(self.deduplicator.dedupe(all_hotels), location, check_in, check_out),
+            "sources": [name for name in calls if name in results],
+            "missing_sources": [
+                {"source": name, "reason": missing[name]} for name in calls if name in missing
             ]
         }
     
@@ -107,32 +264,126 @@ class HotelAggregator:
                               hotel_id: str,
                               check_in: datetime,
                               check_out: datetime,
-                              guests: int) -> Dict[str, Any]:
-        """Get detailed information about a specific hotel."""
-        tasks = [
-            provider.get_room_availability(
+                              guests: int,
+                              timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Get detailed information about a specific hotel.
+        
+        Hotels in the local inventory are answered from it directly; others
+        fan out to every provider's ``get_room_availability``.
+        """
+        if self.availability is not None and self.availability.tracks(hotel_id):
+            try:
+                rooms = self.availability.room_availability(hotel_id, check_in, check_out)
+            except ValueError:
+                # Outside the inventory horizon: ask the providers instead
+                rooms = None
+            if rooms is not None:
+                return {
+                    "hotel_id": hotel_id,
+                    "rooms": [dict(room, source="inventory") for room in rooms],
+                    "total_rooms": len(rooms),
+                    "missing_sources": [],
+                    "partial": False
+                }
+        
+        calls = {
+            self._provider_name(provider): self._provider_call(
+                provider, "get_room_availability",
                 hotel_id=hotel_id,
                 check_in=check_in,
                 check_out=check_out,
                 guests=guests
             )
             for provider in self.providers
-        ]
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        }
+        results, missing = await gather_within(calls, timeout if timeout is not None else self.timeout)
         
         # Combine room availability from all providers
         all_rooms = []
-        for provider_rooms in results:
-            if isinstance(provider_rooms, list):
-                all_rooms.extend(provider_rooms)
+        for name in calls:
+            if isinstance(results.get(name), list):
+                all_rooms.extend(results[name])
         
         return {
             "hotel_id": hotel_id,
             "rooms": all_rooms,
-            "total_rooms": len(all_rooms)
+            "total_rooms": len(all_rooms),
+            "missing_sources": [
+                {"source": name, "reason": missing[name]} for name in calls if name in missing
+            ],
+            "partial": bool(missing)
+        }
+    
+    def _drop_sold_out(self,
+                       hotels: List[Dict[str, Any]],
+                       location: str,
+                       check_in: datetime,
+                       check_out: datetime) -> List[Dict[str, Any]]:
+        """Remove hotels the local inventory knows to be full for the stay; untracked hotels stay"""
+        if self.availability is None:
+            return hotels
+        try:
+            available = self.availability.hotels_with_availability(location, check_in, check_out)
+        except ValueError:
+            return hotels
+        return [
+            hotel for hotel in hotels
+            if hotel.get("id") in available or not self.availability.tracks(hotel.get("id"))
+        ]
+    
+    def _provider_call(self, provider: Any, method: str, **kwargs: Any) -> Callable[[], Awaitable[Any]]:
+        """Bind a provider call with its own timeout, optional hedging and load shedding.
+        
+        The call fails fast with ``CircuitOpenError`` or ``ConcurrencyLimitError``
+        while the provider is being shed. Otherwise its outcome and latency feed
+        the provider's breaker and limiter; a call cancelled by the deadline
+        counts as a failure.
+        """
+        name = self._provider_name(provider)
+        breaker = self.breakers.setdefault(name, CircuitBreaker())
+        limiter = self.limiters.setdefault(name, AdaptiveLimiter())
+        
+        async def call() -> Any:
+            if not breaker.allow():
+                raise CircuitOpenError(name)
+            # Outcomes only count toward the breaker state the call was admitted in
+            generation = breaker.generation
+            if not limiter.try_acquire():
+                breaker.abandon(generation)
+                raise ConcurrencyLimitError(name)
+            # Calls that fail together cut the limit once, not once each
+            window = limiter.window
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            failed = True
+            try:
+                attempt = hedged(lambda: getattr(provider, method)(**kwargs), self.hedge_delays.get(name))
+                provider_timeout = self.provider_timeouts.get(name)
+                if provider_timeout is None:
+                    result = await attempt
+                else:
+                    result = await asyncio.wait_for(attempt, provider_timeout)
+                failed = False
+                return result
+            finally:
+                latency = loop.time() - started
+                limiter.release(failed, latency, window)
+                breaker.record(failed, latency, generation)
+        
+        return call
+    
+    def provider_status(self) -> Dict[str, Dict[str, Any]]:
+        """Breaker state and concurrency limit of every provider, for monitoring"""
+        return {
+            name: {"breaker": breaker.snapshot(), "concurrency": self.limiters[name].snapshot()}
+            for name, breaker in self.breakers.items()
         }
     
+    @staticmethod
+    def _provider_name(provider: Any) -> str:
+        """Display name for a provider"""
+        return getattr(provider, "name", type(provider).__name__)
+    
     def format_hotel_response(self, hotels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Format hotel data for API response."""
         return [
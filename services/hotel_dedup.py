@@ -0,0 +1,202 @@
+"""
+Cross-Provider Hotel Deduplication
+Merges the same property reported by several providers. Records are only compared
+within a blocking key (geohash cell and its neighbours, or the exact normalized name
+when a record has no coordinates), so the cost stays near-linear instead of all-pairs.
+"""
+
+import re
+import unicodedata
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+from .geo import encode_geohash, neighbors, haversine_km
+
+# Words that say nothing about which property a name refers to
+GENERIC_NAME_TOKENS = frozenset({"the", "a", "an", "and", "by", "at", "of", "hotel", "hotels"})
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+def name_tokens(name: Optional[str]) -> FrozenSet[str]:
+    """Accent-, case- and punctuation-insensitive tokens of a hotel name, without generic words"""
+    if not name:
+        return frozenset()
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return frozenset(
+        token for token in _NON_ALNUM.split(ascii_name.lower())
+        if token and token not in GENERIC_NAME_TOKENS
+    )
+
+def hotel_coordinates(hotel: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) of a hotel, whichever of the common provider shapes it uses"""
+    source = hotel.get("coordinates")
+    if not isinstance(source, dict):
+        source = hotel
+    for lat_key, lon_key in (("latitude", "longitude"), ("lat", "lng"), ("lat", "lon")):
+        latitude, longitude = source.get(lat_key), source.get(lon_key)
+        if latitude is not None and longitude is not None:
+            try:
+                return float(latitude), float(longitude)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+class HotelDeduplicator:
+    """Clusters records of the same property and merges each cluster into one hotel.
+
+    Two records match when their name token sets overlap by at least
+    ``min_name_similarity`` (Jaccard) and they lie within ``max_distance_km``
+    of each other. Records without coordinates only match records that
+    also lack them and have the same normalized name and address. Records
+    from the same ``source`` never merge: one provider listing two similar
+    properties side by side is describing two properties.
+    """
+
+    def __init__(self,
+                 precision: int = 6,
+                 max_distance_km: float = 0.2,
+                 min_name_similarity: float = 0.8,
+                 price_field: str = "price"):
+        # Precision 6 cells are about 1.2 x 0.6 km, larger than max_distance_km,
+        # so any match lies in the record's own or a neighbouring cell
+        self.precision = precision
+        self.max_distance_km = max_distance_km
+        self.min_name_similarity = min_name_similarity
+        self.price_field = price_field
+
+    def dedupe(self, hotels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Hotels with duplicates merged, in order of first appearance.
+
+        Records without a duplicate are returned as they are; merged records
+        are new dicts and the inputs are never mutated.
+        """
+        session = self.session()
+        session.add(hotels)
+        return [session.hotel(index) for index in range(len(session))]
+
+    def session(self) -> "DedupeSession":
+        """Incremental dedupe for records that arrive in batches, e.g. one per provider"""
+        return DedupeSession(self)
+
+    def merge(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """One hotel from several records: the cheapest offer's fields, every amenity and every source"""
+        best = min(records, key=lambda record: (self._price(record) is None, self._price(record) or 0))
+        merged = dict(best)
+
+        amenities: List[Any] = []
+        seen = set()
+        for record in records:
+            for amenity in record.get("amenities") or []:
+                if amenity not in seen:
+                    seen.add(amenity)
+                    amenities.append(amenity)
+        merged["amenities"] = amenities
+
+        merged["sources"] = list(dict.fromkeys(record.get("source", "Unknown") for record in records))
+        merged["offers"] = [
+            {"source": record.get("source", "Unknown"), "id": record.get("id"), self.price_field: self._price(record)}
+            for record in records
+        ]
+        return merged
+
+    def matches(self,
+                tokens: FrozenSet[str],
+                coordinates: Tuple[float, float],
+                other_tokens: FrozenSet[str],
+                other_coordinates: Tuple[float, float]) -> bool:
+        """Whether two named, located records describe the same property"""
+        if self._similarity(tokens, other_tokens) < self.min_name_similarity:
+            return False
+        return haversine_km(*coordinates, *other_coordinates) <= self.max_distance_km
+
+    @staticmethod
+    def _similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+        return len(a & b) / len(a | b)
+
+    def _price(self, record: Dict[str, Any]) -> Optional[float]:
+        """The record's price, or None when the provider had none (reported as 0 or missing)"""
+        price = record.get(self.price_field)
+        if isinstance(price, (int, float)) and price > 0:
+            return price
+        return None
+
+class DedupeSession:
+    """Clusters built up batch by batch, so a stream can merge each batch with what came before"""
+
+    def __init__(self, deduplicator: HotelDeduplicator):
+        self.deduplicator = deduplicator
+        self.clusters: List[List[Dict[str, Any]]] = []
+        self._sources: List[Set[str]] = []
+        # Cluster representative per blocking cell: (tokens, coordinates, cluster index)
+        self._cells: Dict[str, List[Tuple[FrozenSet[str], Tuple[float, float], int]]] = {}
+        self._by_name: Dict[Tuple[FrozenSet[str], str], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    def add(self, hotels: List[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+        """Cluster a batch of records; returns (new clusters, earlier clusters the batch added to)"""
+        first_new = len(self.clusters)
+        grown: Dict[int, None] = {}
+        for hotel in hotels:
+            index = self._add(hotel)
+            if index < first_new:
+                grown[index] = None
+        return list(range(first_new, len(self.clusters))), list(grown)
+
+    def hotel(self, index: int) -> Dict[str, Any]:
+        """The cluster's hotel: its only record, or its records merged"""
+        cluster = self.clusters[index]
+        return cluster[0] if len(cluster) == 1 else self.deduplicator.merge(cluster)
+
+    def _add(self, hotel: Dict[str, Any]) -> int:
+        tokens = name_tokens(hotel.get("name"))
+        coordinates = hotel_coordinates(hotel)
+        source = hotel.get("source")
+
+        def allowed(index: int) -> bool:
+            return source is None or source not in self._sources[index]
+
+        if not tokens:
+            return self._new_cluster(hotel)
+
+        if coordinates is None:
+            address = hotel.get("address") or hotel.get("location") or ""
+            key = (tokens, " ".join(sorted(name_tokens(str(address)))))
+            candidates = self._by_name.setdefault(key, [])
+            index = next((index for index in candidates if allowed(index)), None)
+            if index is None:
+                index = self._new_cluster(hotel)
+                candidates.append(index)
+                return index
+            return self._join(index, hotel)
+
+        cell = encode_geohash(coordinates[0], coordinates[1], self.deduplicator.precision)
+        index = self._find_match(cell, tokens, coordinates, allowed)
+        if index is None:
+            index = self._new_cluster(hotel)
+            self._cells.setdefault(cell, []).append((tokens, coordinates, index))
+            return index
+        return self._join(index, hotel)
+
+    def _new_cluster(self, hotel: Dict[str, Any]) -> int:
+        self.clusters.append([])
+        self._sources.append(set())
+        return self._join(len(self.clusters) - 1, hotel)
+
+    def _join(self, index: int, hotel: Dict[str, Any]) -> int:
+        self.clusters[index].append(hotel)
+        if hotel.get("source") is not None:
+            self._sources[index].add(hotel["source"])
+        return index
+
+    def _find_match(self,
+                    cell: str,
+                    tokens: FrozenSet[str],
+                    coordinates: Tuple[float, float],
+                    allowed: Callable[[int], bool]) -> Optional[int]:
+        """Cluster in this or a neighbouring cell that the record belongs to, if any"""
+        for candidate_cell in neighbors(cell):
+            for candidate_tokens, candidate_coordinates, index in self._cells.get(candidate_cell, ()):
+                if allowed(index) and self.deduplicator.matches(tokens, coordinates,
+                                                                candidate_tokens, candidate_coordinates):
+                    return index
+        return None
@@ -0,0 +1,122 @@
+"""
+Shared HTTP Client Pool
+One process-wide, lifecycle-managed httpx.AsyncClient that every hotel provider shares,
+so repeated calls reuse keep-alive (and HTTP/2) connections instead of paying a new handshake.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class HTTPClientPool:
+    """Lazily created, shared async HTTP client with per-host connection limits.
+
+    httpx pools connections for the whole client; ``per_host_limit`` adds a
+    semaphore per host so one slow upstream cannot take every connection.
+    The client is bound to the event loop that first uses it (the shared
+    background loop in the web app) and must be closed with ``aclose``.
+    """
+
+    def __init__(self,
+                 timeout: float = 10.0,
+                 connect_timeout: float = 3.0,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 per_host_limit: int = 20,
+                 http2: bool = True,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.per_host_limit = per_host_limit
+        self.http2 = http2 and _http2_available()
+        if http2 and not self.http2:
+            logger.warning("h2 is not installed; the shared HTTP client falls back to HTTP/1.1")
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def from_env(cls) -> "HTTPClientPool":
+        """Build a pool configured from HTTP_* environment variables"""
+        return cls(
+            timeout=float(os.getenv("HTTP_TIMEOUT", "10")),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "3")),
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            per_host_limit=int(os.getenv("HTTP_PER_HOST_LIMIT", "20")),
+            http2=os.getenv("HTTP2", "1") not in ("0", "false", "False")
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use inside the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self._transport
+            )
+            self._loop = loop
+            self._host_slots = {}
+            logger.info(f"Opened shared HTTP client (http2={self.http2})")
+        elif self._loop is not loop:
+            raise RuntimeError("HTTPClientPool is bound to a different event loop")
+        return self._client
+
+    @property
+    def is_open(self) -> bool:
+        """Whether a client (and possibly pooled connections) currently exists"""
+        return self._client is not None and not self._client.is_closed
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request through the shared client, respecting the per-host limit"""
+        client = self.client
+        host = urlsplit(url).netloc
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        async with slots:
+            return await client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the client and its pooled connections"""
+        if self.is_open:
+            await self._client.aclose()
+            logger.info("Closed shared HTTP client")
+        self._client = None
+        self._loop = None
+
+    async def __aenter__(self) -> "HTTPClientPool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
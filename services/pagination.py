@@ -0,0 +1,89 @@
+"""
+Search Result Pagination
+Keyset cursors over heap-based top-k selection, so a page costs O(n log k) instead of a full sort.
+"""
+
+import base64
+import binascii
+import heapq
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+SortKey = Callable[[Dict[str, Any]], Tuple]
+
+MAX_PAGE_SIZE = 100
+
+def field_sort_key(field: str) -> SortKey:
+    """Total order on one hotel field, ties broken by id then source so cursors are stable"""
+    def key(hotel: Dict[str, Any]) -> Tuple:
+        value = hotel.get(field)
+        return (value if value is not None else 0, str(hotel.get("id", "")), str(hotel.get("source", "")))
+    return key
+
+def encode_cursor(position: Tuple, sort_by: str, descending: bool) -> str:
+    """Opaque cursor pointing just after a sort key"""
+    payload = json.dumps({"k": list(position), "s": sort_by, "d": descending}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_by: str, descending: bool) -> Tuple:
+    """Sort key a cursor points after; rejects cursors issued for a different ordering.
+
+    The key must have the (value, id, source) shape of ``field_sort_key``,
+    with a number or string value.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        position = tuple(payload["k"])
+        issued_for = (payload["s"], payload["d"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    if not _is_sort_key(position):
+        raise ValueError("Invalid cursor")
+    if issued_for != (sort_by, descending):
+        raise ValueError("Cursor does not match the requested sort order")
+    return position
+
+def top_k_page(items: Iterable[Dict[str, Any]],
+               limit: int,
+               sort_by: str,
+               descending: bool = False,
+               cursor: Optional[str] = None,
+               key: Optional[SortKey] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of items in sort order plus the cursor for the next page.
+
+    Only items strictly after the cursor's key are considered, and the page
+    is picked with a bounded heap of ``limit + 1`` entries, so cost scales
+    with the page size rather than with the number of items.
+    """
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    key = key or field_sort_key(sort_by)
+    candidates = items
+    if cursor:
+        after = decode_cursor(cursor, sort_by, descending)
+        if descending:
+            candidates = (item for item in items if key(item) < after)
+        else:
+            candidates = (item for item in items if key(item) > after)
+
+    select = heapq.nlargest if descending else heapq.nsmallest
+    try:
+        page = select(limit + 1, candidates, key=key)
+    except TypeError:
+        if not cursor:
+            raise
+        # A crafted cursor whose value type differs from the sort field's (e.g. a number for "name")
+        raise ValueError("Invalid cursor")
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor(key(page[-1]), sort_by, descending)
+
+def _is_sort_key(position: Tuple) -> bool:
+    """Whether a decoded key has the (value, id, source) shape of field_sort_key"""
+    if len(position) != 3:
+        return False
+    value, hotel_id, source = position
+    return (isinstance(value, (int, float, str)) and not isinstance(value, bool)
+            and isinstance(hotel_id, str) and isinstance(source, str))
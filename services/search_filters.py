@@ -0,0 +1,93 @@
+"""
+Search Filter Pipeline
+Compiles request filters into one predicate chain evaluated in a single pass over the hotels.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Predicate = Callable[[Dict[str, Any]], bool]
+PredicateFactory = Callable[[Any], Optional[Predicate]]
+
+# filter name -> (estimated fraction of hotels kept, predicate factory)
+_FILTERS: Dict[str, Tuple[float, PredicateFactory]] = {}
+
+def register_filter(name: str, selectivity: float) -> Callable[[PredicateFactory], PredicateFactory]:
+    """Register a predicate factory for a filter key.
+
+    ``selectivity`` is the estimated fraction of hotels the filter keeps;
+    filters that reject the most run first so later predicates see fewer
+    hotels. The factory receives the filter value and returns a predicate,
+    or None when the value means the filter is inactive.
+    """
+    def decorator(factory: PredicateFactory) -> PredicateFactory:
+        _FILTERS[name] = (selectivity, factory)
+        return factory
+    return decorator
+
+@register_filter("no_payment_only", selectivity=0.3)
+def _no_payment_only(value: Any) -> Optional[Predicate]:
+    if not value:
+        return None
+    return lambda hotel: not hotel.get("payment_required", True)
+
+@register_filter("free_cancellation_only", selectivity=0.5)
+def _free_cancellation_only(value: Any) -> Optional[Predicate]:
+    if not value:
+        return None
+    return lambda hotel: hotel.get("free_cancellation", False)
+
+@register_filter("min_rating", selectivity=0.5)
+def _min_rating(value: Any) -> Optional[Predicate]:
+    if value is None:
+        return None
+    return lambda hotel: hotel.get("rating", 0) >= value
+
+@register_filter("max_price", selectivity=0.6)
+def _max_price(value: Any) -> Optional[Predicate]:
+    if value is None:
+        return None
+    return lambda hotel: hotel.get("price", 0) <= value
+
+@register_filter("min_price", selectivity=0.8)
+def _min_price(value: Any) -> Optional[Predicate]:
+    if value is None:
+        return None
+    return lambda hotel: hotel.get("price", 0) >= value
+
+class FilterPipeline:
+    """An ordered chain of predicates applied to hotels in one pass."""
+
+    def __init__(self, predicates: List[Tuple[str, Predicate]]):
+        self.predicates = predicates
+        self.names = [name for name, _ in predicates]
+
+    def matches(self, hotel: Dict[str, Any]) -> bool:
+        """True if the hotel passes every predicate (short-circuits on the first failure)"""
+        for _, predicate in self.predicates:
+            if not predicate(hotel):
+                return False
+        return True
+
+    def apply(self, hotels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return a new list of the hotels that pass every predicate"""
+        if not self.predicates:
+            return list(hotels)
+        if len(self.predicates) == 1:
+            predicate = self.predicates[0][1]
+            return [hotel for hotel in hotels if predicate(hotel)]
+        matches = self.matches
+        return [hotel for hotel in hotels if matches(hotel)]
+
+def compile_filters(filters: Optional[Dict[str, Any]]) -> FilterPipeline:
+    """Build a pipeline from request filters, most selective first; unknown keys are ignored"""
+    active = []
+    for name, value in (filters or {}).items():
+        registered = _FILTERS.get(name)
+        if registered is None:
+            continue
+        selectivity, factory = registered
+        predicate = factory(value)
+        if predicate is not None:
+            active.append((selectivity, name, predicate))
+    active.sort(key=lambda entry: (entry[0], entry[1]))
+    return FilterPipeline([(name, predicate) for _, name, predicate in active])
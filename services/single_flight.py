@@ -0,0 +1,61 @@
+"""
+Single-Flight Request Coalescing
+Concurrent calls that share a key wait on one in-flight execution instead of each doing the work.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Coalesces concurrent async calls with the same key.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is still running await that same task. Once it finishes the key
+    is released, so the next call starts a fresh execution. A waiter being
+    cancelled does not cancel the shared task for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() for key, or join the execution already in flight"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._inflight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda done, key=key: self._release(key, done))
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Number of distinct keys currently executing"""
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, int]:
+        """Return execution and coalescing counters"""
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced
+        }
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget a finished task and mark its exception as retrieved"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+def freeze(value: Any) -> Hashable:
+    """Turn nested dicts/lists of request parameters into a hashable key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        items = [freeze(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, set) else tuple(items)
+    return value
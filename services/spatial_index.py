@@ -0,0 +1,137 @@
+"""
+Spatial Index
+Geohash grid over point locations with incremental insert/remove and radius and
+bounding-box queries that only look at the cells covering the query area.
+"""
+
+import math
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+from .geo import encode_geohash, decode_bbox, haversine_km
+
+def _cell_degrees(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of a geohash cell (the same for every cell at a precision)"""
+    min_lat, min_lon, max_lat, max_lon = decode_bbox("s" * precision)
+    return max_lat - min_lat, max_lon - min_lon
+
+_CELL_DEGREES = {precision: _cell_degrees(precision) for precision in range(1, 10)}
+
+# One degree of latitude in kilometres
+_KM_PER_DEGREE = 111.2
+
+class GeohashIndex:
+    """Thread-safe point index bucketed by geohash cell.
+
+    Queries visit the cells covering the query's bounding box and then
+    check the exact distance or bounds, so their cost tracks the number of
+    nearby points rather than the size of the index. When a query would
+    cover more cells than there are points, it scans the points instead.
+    Areas crossing the antimeridian are not supported.
+    """
+
+    def __init__(self, precision: int = 6):
+        if precision not in _CELL_DEGREES:
+            raise ValueError(f"Unsupported geohash precision: {precision}")
+        self.precision = precision
+        self._cell_height, self._cell_width = _CELL_DEGREES[precision]
+        self._points: Dict[Hashable, Tuple[float, float, str, Any]] = {}
+        self._cells: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def insert(self, key: Hashable, latitude: float, longitude: float, value: Any = None) -> None:
+        """Add a point, replacing any point already stored under key"""
+        cell = encode_geohash(latitude, longitude, self.precision)
+        with self._lock:
+            self._discard(key)
+            self._points[key] = (latitude, longitude, cell, value)
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: Hashable) -> bool:
+        """Remove a point; returns whether it was present"""
+        with self._lock:
+            return self._discard(key)
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """Coordinates stored under key"""
+        point = self._points.get(key)
+        return (point[0], point[1]) if point is not None else None
+
+    def within_radius(self,
+                      latitude: float,
+                      longitude: float,
+                      radius_km: float,
+                      limit: Optional[int] = None) -> List[Tuple[float, Hashable, Any]]:
+        """(distance_km, key, value) of points within radius_km, nearest first"""
+        d_lat = radius_km / _KM_PER_DEGREE
+        # Longitude degrees shrink with latitude; clamp near the poles
+        d_lon = min(radius_km / (_KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)), 180.0)
+        with self._lock:
+            candidates = self._candidates(latitude - d_lat, longitude - d_lon, latitude + d_lat, longitude + d_lon)
+            matches = []
+            for key in candidates:
+                point_lat, point_lon, _, value = self._points[key]
+                distance = haversine_km(latitude, longitude, point_lat, point_lon)
+                if distance <= radius_km:
+                    matches.append((distance, key, value))
+        matches.sort(key=lambda match: match[0])
+        return matches[:limit] if limit is not None else matches
+
+    def within_bbox(self,
+                    min_lat: float,
+                    min_lon: float,
+                    max_lat: float,
+                    max_lon: float) -> List[Tuple[Hashable, Any]]:
+        """(key, value) of points inside a bounding box"""
+        with self._lock:
+            matches = []
+            for key in self._candidates(min_lat, min_lon, max_lat, max_lon):
+                point_lat, point_lon, _, value = self._points[key]
+                if min_lat <= point_lat <= max_lat and min_lon <= point_lon <= max_lon:
+                    matches.append((key, value))
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def _discard(self, key: Hashable) -> bool:
+        point = self._points.pop(key, None)
+        if point is None:
+            return False
+        cell_keys = self._cells[point[2]]
+        cell_keys.discard(key)
+        if not cell_keys:
+            del self._cells[point[2]]
+        return True
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Hashable]:
+        """Keys in every cell overlapping the box (caller holds the lock)"""
+        min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+        min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0)
+        rows = int((max_lat - min_lat) / self._cell_height) + 2
+        columns = int((max_lon - min_lon) / self._cell_width) + 2
+        if rows * columns > len(self._points):
+            return list(self._points)
+
+        # Samples one cell apart, plus the far edges, hit every overlapping cell
+        candidates: List[Hashable] = []
+        seen_cells = set()
+        for lat in _steps(min_lat, max_lat, self._cell_height):
+            for lon in _steps(min_lon, max_lon, self._cell_width):
+                cell = encode_geohash(lat, lon, self.precision)
+                if cell in seen_cells:
+                    continue
+                seen_cells.add(cell)
+                candidates.extend(self._cells.get(cell, ()))
+        return candidates
+
+def _steps(start: float, stop: float, step: float) -> List[float]:
+    values = []
+    value = start
+    while value < stop:
+        values.append(value)
+        value += step
+    values.append(stop)
+    return values
@@ -0,0 +1,79 @@
+import unittest
+from services.autocomplete import AutocompleteIndex
+
+class TestAutocompleteIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = AutocompleteIndex()
+        self.index.add("Paris", popularity=1500)
+        self.index.add("Panama City", popularity=40)
+        self.index.add("Palermo", popularity=300)
+        self.index.add("New York", popularity=3900)
+        self.index.add("Newark", popularity=20)
+        self.index.add("Manhattan", kind="neighbourhood", popularity=2100, destination="New York")
+        self.index.add("Musée d'Orsay Quarter", kind="neighbourhood", popularity=5, destination="Paris")
+
+    def names(self, prefix, limit=5):
+        return [suggestion["name"] for suggestion in self.index.suggest(prefix, limit)]
+
+    def test_ranked_by_popularity(self):
+        """Matches come back most popular first"""
+        self.assertEqual(self.names("pa"), ["Paris", "Palermo", "Panama City"])
+        self.assertEqual(self.names("new"), ["New York", "Newark"])
+
+    def test_matches_any_word_and_normalizes(self):
+        """Later words, case and accents all match"""
+        self.assertEqual(self.names("YORK"), ["New York"])
+        self.assertEqual(self.names("  new   y"), ["New York"])
+        self.assertEqual(self.names("muse"), ["Musée d'Orsay Quarter"])
+        self.assertEqual(self.names("city"), ["Panama City"])
+
+    def test_neighbourhood_carries_destination(self):
+        """Neighbourhood suggestions name their city"""
+        self.assertEqual(self.index.suggest("manh"), [
+            {"name": "Manhattan", "type": "neighbourhood", "destination": "New York"}
+        ])
+
+    def test_limit_and_empty_prefix(self):
+        """Limits are honoured and blank prefixes suggest nothing"""
+        self.assertEqual(self.names("p", limit=1), ["Paris"])
+        self.assertEqual(self.names("   "), [])
+        self.assertEqual(self.names("zz"), [])
+
+    def test_bump_reranks_memoized_prefix(self):
+        """Popularity changes are visible even for memoized short prefixes"""
+        self.assertEqual(self.names("pa")[0], "Paris")
+        self.assertTrue(self.index.bump("palermo", 5000))
+        self.assertEqual(self.names("pa")[0], "Palermo")
+        self.assertFalse(self.index.bump("Atlantis"))
+
+    def test_memoized_prefixes_stay_exact(self):
+        """Bumps and additions re-rank memoized prefixes in place, matching a fresh lookup"""
+        prefixes = ["p", "pa", "n", "ne", "y", "m", "c", "ci", "q"]
+        for prefix in prefixes:
+            self.names(prefix, limit=10)
+        self.index.bump("Panama City", 1400)
+        self.index.bump("Newark", 5000)
+        self.index.bump("Paris", -1490)
+        self.index.add("Yokohama", popularity=9000)
+        self.index.add("Quebec City", popularity=2)
+        memoized = {prefix: self.names(prefix, limit=10) for prefix in prefixes}
+        self.assertIn("pa", self.index._memo)
+        fresh = AutocompleteIndex()
+        for name, popularity in [("Paris", 10), ("Panama City", 1440), ("Palermo", 300), ("New York", 3900),
+                                 ("Newark", 5020), ("Manhattan", 2100), ("Musée d'Orsay Quarter", 5),
+                                 ("Yokohama", 9000), ("Quebec City", 2)]:
+            fresh.add(name, popularity=popularity)
+        self.assertEqual(memoized, {
+            prefix: [suggestion["name"] for suggestion in fresh.suggest(prefix, 10)] for prefix in prefixes
+        })
+        self.assertEqual(memoized["ci"], ["Panama City", "Quebec City"])
+
+    def test_readding_keeps_one_entry(self):
+        """Adding a known place again only raises its popularity"""
+        self.index.add("paris", popularity=10)
+        self.index.add("Newark", popularity=9999)
+        self.assertEqual(len(self.index), 7)
+        self.assertEqual(self.names("new"), ["Newark", "New York"])
+
+if __name__ == '__main__':
+    unittest.main()
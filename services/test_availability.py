@@ -0,0 +1,175 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from services.availability import AvailabilityEngine, CHUNK_ROWS, LOCK_STRIPES
+
+class TestAvailabilityEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = AvailabilityEngine(start=date(2025, 1, 1), horizon_days=365)
+        self.engine.set_inventory("ld001", "Standard", 5, city="London")
+        self.engine.set_inventory("ld001", "Suite", 1, city="London")
+        self.engine.set_inventory("ld002", "Standard", 3, city="London")
+        self.engine.set_inventory("pr001", "Standard", 2, city="Paris")
+
+    def test_stay_needs_every_night_free(self):
+        """A single sold-out night makes the whole stay unavailable"""
+        self.engine.set_inventory("ld001", "Suite", 0, start=date(2025, 5, 3), end=date(2025, 5, 4))
+        self.assertTrue(self.engine.is_available("ld001", "Suite", date(2025, 5, 1), date(2025, 5, 3)))
+        self.assertFalse(self.engine.is_available("ld001", "Suite", date(2025, 5, 1), date(2025, 5, 5)))
+        # Check-out day itself is not a night of the stay
+        self.assertTrue(self.engine.is_available("ld001", "Suite", date(2025, 5, 4), datetime(2025, 5, 6)))
+        self.assertEqual(self.engine.available_rooms("ld001", "Standard", date(2025, 5, 1), date(2025, 5, 5)), 5)
+        self.assertEqual(self.engine.available_rooms("ld001", "Presidential", date(2025, 5, 1), date(2025, 5, 5)), 0)
+
+    def test_room_availability(self):
+        """Room types are listed with the rooms free for the whole stay"""
+        self.engine.set_inventory("ld001", "Standard", 2, start=date(2025, 6, 2), end=date(2025, 6, 3))
+        self.assertEqual(self.engine.room_availability("ld001", date(2025, 6, 1), date(2025, 6, 4), rooms=2), [
+            {"room_type": "Standard", "available_rooms": 2}
+        ])
+
+    def test_hotels_with_availability(self):
+        """City queries return hotels with any (or the requested) room type free"""
+        stay = (date(2025, 7, 1), date(2025, 7, 8))
+        self.engine.set_inventory("ld002", "Standard", 0, start=date(2025, 7, 5), end=date(2025, 7, 6))
+        self.assertEqual(self.engine.hotels_with_availability("london", *stay), {"ld001"})
+        self.assertEqual(self.engine.hotels_with_availability(" London ", *stay, rooms=2, room_type="Suite"), set())
+        self.assertEqual(self.engine.hotels_with_availability("Paris", *stay), {"pr001"})
+        self.assertEqual(self.engine.hotels_with_availability("Tokyo", *stay), set())
+
+    def test_growth_keeps_existing_rows(self):
+        """Adding more rows than a chunk holds keeps earlier rows and their counts"""
+        for i in range(CHUNK_ROWS * 2 + 5):
+            self.engine.set_inventory(f"h{i}", "Standard", i % 3, city="Tokyo")
+        available = self.engine.hotels_with_availability("Tokyo", date(2025, 3, 1), date(2025, 3, 2), rooms=2)
+        self.assertEqual(available, {f"h{i}" for i in range(CHUNK_ROWS * 2 + 5) if i % 3 == 2})
+        self.assertEqual(self.engine.available_rooms("ld001", "Standard", date(2025, 3, 1), date(2025, 3, 2)), 5)
+
+    def test_reserve_and_release(self):
+        """A reservation takes every night of the stay or none of them"""
+        self.assertTrue(self.engine.reserve("ld001", "Suite", date(2025, 5, 1), date(2025, 5, 4)))
+        self.assertFalse(self.engine.reserve("ld001", "Suite", date(2025, 5, 3), date(2025, 5, 6)))
+        # The failed overlapping stay left its free nights untouched
+        self.assertTrue(self.engine.is_available("ld001", "Suite", date(2025, 5, 4), date(2025, 5, 6)))
+        self.assertFalse(self.engine.reserve("ld001", "Presidential", date(2025, 5, 1), date(2025, 5, 2)))
+        self.engine.release("ld001", "Suite", date(2025, 5, 1), date(2025, 5, 4))
+        self.assertTrue(self.engine.is_available("ld001", "Suite", date(2025, 5, 1), date(2025, 5, 6)))
+
+    def test_reserve_many(self):
+        """Batches reserve per stay, or all-or-nothing when atomic, counting repeated rooms together"""
+        stay = (date(2025, 9, 1), date(2025, 9, 3))
+        suite = ("ld001", "Suite", *stay, 1)
+        standard = ("ld002", "Standard", *stay, 2)
+        self.assertEqual(self.engine.reserve_many([standard, suite, suite], atomic=True), [True, True, False])
+        # Nothing was taken by the failed atomic batch
+        self.assertEqual(self.engine.available_rooms("ld002", "Standard", *stay), 3)
+        self.assertEqual(self.engine.available_rooms("ld001", "Suite", *stay), 1)
+
+        outside = ("ld001", "Standard", date(2025, 12, 30), date(2026, 1, 2), 1)
+        self.assertEqual(self.engine.reserve_many([standard, suite, suite, outside]), [True, True, False, False])
+        self.assertEqual(self.engine.available_rooms("ld002", "Standard", *stay), 1)
+        self.assertEqual(self.engine.reserve_many([("ld002", "Standard", *stay, 1), suite], atomic=False), [True, False])
+        self.assertEqual(self.engine.reserve_many([], atomic=True), [])
+
+    def test_concurrent_reservations_never_oversell(self):
+        """Thousands of parallel bookings of overlapping stays sell each night's rooms exactly once"""
+        rooms = 7
+        for i in range(4):
+            self.engine.set_inventory(f"hot{i}", "Standard", rooms, city="Rome")
+        start = date(2025, 8, 1)
+        # Stays of 1-3 nights starting on one of five days, spread over four hotels
+        requests = [(f"hot{i % 4}", start + timedelta(days=i % 5), start + timedelta(days=i % 5 + 1 + i % 3))
+                    for i in range(4000)]
+
+        def book(request):
+            hotel_id, check_in, check_out = request
+            return request if self.engine.reserve(hotel_id, "Standard", check_in, check_out) else None
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            confirmed = [request for request in pool.map(book, requests) if request is not None]
+
+        for i in range(4):
+            for night in range(8):
+                day = start + timedelta(days=night)
+                sold = sum(1 for hotel_id, check_in, check_out in confirmed
+                           if hotel_id == f"hot{i}" and check_in <= day < check_out)
+                self.assertLessEqual(sold, rooms)
+                self.assertEqual(self.engine.available_rooms(f"hot{i}", "Standard", day, day + timedelta(days=1)),
+                                 rooms - sold)
+        # Single-night stays on the first day fail only once it is full, and there are plenty of them
+        self.assertEqual(sum(1 for request in confirmed if request[1] == start), 4 * rooms)
+
+    def test_release_never_exceeds_capacity(self):
+        """Releasing a stay twice gives its rooms back once"""
+        stay = (date(2025, 5, 1), date(2025, 5, 4))
+        self.engine.set_inventory("ld001", "Suite", 0, start=date(2025, 5, 3), end=date(2025, 5, 4))
+        self.assertTrue(self.engine.reserve("ld001", "Suite", date(2025, 5, 1), date(2025, 5, 3)))
+        self.engine.release("ld001", "Suite", *stay)
+        self.engine.release("ld001", "Suite", *stay)
+        self.assertEqual(self.engine.available_rooms("ld001", "Suite", date(2025, 5, 1), date(2025, 5, 3)), 1)
+        self.assertEqual(self.engine.available_rooms("ld001", "Suite", date(2025, 5, 3), date(2025, 5, 4)), 0)
+
+    def test_horizon_rolls_with_the_clock(self):
+        """Past nights drop off and new nights open with the row's capacity, keeping bookings in between"""
+        today = [date(2025, 1, 1)]
+        engine = AvailabilityEngine(horizon_days=30, today=lambda: today[0])
+        engine.set_inventory("ld001", "Standard", 4, city="London")
+        self.assertTrue(engine.reserve("ld001", "Standard", date(2025, 1, 10), date(2025, 1, 12), rooms=3))
+        with self.assertRaises(ValueError):
+            engine.is_available("ld001", "Standard", date(2025, 1, 30), date(2025, 2, 3))
+
+        today[0] = date(2025, 1, 5)
+        self.assertTrue(engine.is_available("ld001", "Standard", date(2025, 1, 30), date(2025, 2, 3), rooms=4))
+        self.assertEqual(engine.hotels_with_availability("London", date(2025, 1, 30), date(2025, 2, 3), rooms=4), {"ld001"})
+        self.assertEqual(engine.start, date(2025, 1, 5))
+        self.assertEqual(engine.available_rooms("ld001", "Standard", date(2025, 1, 10), date(2025, 1, 12)), 1)
+        self.assertEqual(engine.available_rooms("ld001", "Standard", date(2025, 1, 12), date(2025, 2, 4)), 4)
+        with self.assertRaises(ValueError):
+            engine.is_available("ld001", "Standard", date(2025, 1, 4), date(2025, 1, 6))
+        # Rooms released after the roll still stop at capacity
+        engine.release("ld001", "Standard", date(2025, 1, 30), date(2025, 2, 3), rooms=2)
+        self.assertEqual(engine.available_rooms("ld001", "Standard", date(2025, 1, 30), date(2025, 2, 3)), 4)
+
+        # A jump past the whole horizon reopens every night
+        today[0] = date(2025, 6, 1)
+        self.assertEqual(engine.room_availability("ld001", date(2025, 6, 1), date(2025, 6, 30)), [
+            {"room_type": "Standard", "available_rooms": 4}
+        ])
+
+    def test_horizon_rolls_one_stripe_at_a_time(self):
+        """A booking after midnight moves only its own hotel's stripe, not rows behind other stripes"""
+        today = [date(2025, 1, 1)]
+        engine = AvailabilityEngine(horizon_days=30, today=lambda: today[0])
+        hotels = {}
+        for i in range(LOCK_STRIPES + 1):
+            hotels.setdefault(engine._stripe_index(f"h{i}"), f"h{i}")
+        (busy, other), (_, hotel_id) = list(hotels.items())[:2]
+        for hotel in (other, hotel_id):
+            engine.set_inventory(hotel, "Standard", 2, city="London")
+
+        today[0] = date(2025, 1, 3)
+        booked = []
+        with engine._stripes[busy]:
+            thread = threading.Thread(target=lambda: booked.append(
+                engine.reserve(hotel_id, "Standard", date(2025, 1, 31), date(2025, 2, 2))))
+            thread.start()
+            thread.join(timeout=5)
+            self.assertEqual(booked, [True])
+        self.assertEqual(engine.start, date(2025, 1, 1))
+        # A city search rolls the remaining stripes before reading whole chunks
+        self.assertEqual(engine.hotels_with_availability("London", date(2025, 1, 31), date(2025, 2, 2), rooms=2),
+                         {other})
+        self.assertEqual(engine.start, date(2025, 1, 3))
+
+    def test_invalid_ranges(self):
+        """Empty stays, dates outside the horizon and new rows without a city are rejected"""
+        with self.assertRaises(ValueError):
+            self.engine.is_available("ld001", "Standard", date(2025, 5, 5), date(2025, 5, 5))
+        with self.assertRaises(ValueError):
+            self.engine.is_available("ld001", "Standard", date(2025, 12, 30), date(2026, 1, 3))
+        with self.assertRaises(ValueError):
+            self.engine.set_inventory("new", "Standard", 3)
+
+if __name__ == '__main__':
+    unittest.main()
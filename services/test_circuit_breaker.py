@@ -0,0 +1,129 @@
+import unittest
+from services.circuit_breaker import CircuitBreaker, AdaptiveLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(window_size=10, min_calls=4, failure_rate_threshold=0.5,
+                                      slow_call_seconds=1.0, open_seconds=30, half_open_calls=2,
+                                      clock=self.clock)
+
+    def test_opens_on_error_rate(self):
+        """The breaker opens once enough calls fail and rejects until the cool-down ends"""
+        for failed in (False, True, False, True):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(failed, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.snapshot()["rejected"], 1)
+
+    def test_opens_on_slow_calls(self):
+        """Calls that succeed but are too slow also open the breaker"""
+        for _ in range(4):
+            self.breaker.allow()
+            self.breaker.record(False, 2.5)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_needs_minimum_calls(self):
+        """A few early failures are not enough to judge a provider"""
+        for _ in range(3):
+            self.breaker.allow()
+            self.breaker.record(True, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_trials(self):
+        """After the cool-down a limited number of trials decide whether to close again"""
+        for _ in range(4):
+            self.breaker.allow()
+            self.breaker.record(True, 0.1)
+        self.clock.now = 31
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.breaker.record(False, 0.1)
+        self.breaker.record(False, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        for _ in range(4):
+            self.breaker.allow()
+            self.breaker.record(True, 0.1)
+        self.clock.now = 70
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(True, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.times_opened, 3)
+
+    def test_calls_from_an_earlier_state_are_ignored(self):
+        """A slow call admitted while closed neither counts as a trial nor reopens a recovered breaker"""
+        self.assertTrue(self.breaker.allow())
+        straggler = self.breaker.generation
+        for _ in range(4):
+            self.breaker.allow()
+            self.breaker.record(True, 0.1, self.breaker.generation)
+        self.clock.now = 31
+        self.assertTrue(self.breaker.allow())
+        trial = self.breaker.generation
+        # The straggler finishing now does not use up or fail the half-open trials
+        self.breaker.record(True, 5.0, straggler)
+        self.breaker.abandon(straggler)
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record(False, 0.1, trial)
+        self.breaker.record(False, 0.1, trial)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        # Nor does a late trial result count against the fresh closed window
+        self.breaker.record(True, 0.1, trial)
+        self.assertEqual(self.breaker.snapshot()["calls_in_window"], 0)
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_rejects_beyond_limit(self):
+        """Calls beyond the in-flight limit are rejected, not queued"""
+        limiter = AdaptiveLimiter(initial_limit=2)
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        limiter.release(False, 0.1)
+        self.assertTrue(limiter.try_acquire())
+
+    def test_additive_increase_multiplicative_decrease(self):
+        """Fast successes grow the limit slowly; failures and slow calls cut it"""
+        limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, latency_target=1.0, backoff=0.5)
+        for _ in range(10):
+            limiter.try_acquire()
+            limiter.release(False, 0.1)
+        self.assertEqual(limiter.snapshot()["limit"], 10)
+        self.assertGreater(limiter.limit, 10.9)
+        limiter.try_acquire()
+        limiter.release(False, 2.0)
+        self.assertEqual(limiter.snapshot()["limit"], 5)
+        for _ in range(5):
+            limiter.try_acquire()
+            limiter.release(True, 0.1)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_burst_of_failures_backs_off_once(self):
+        """Concurrent calls failing together cost one backoff step; later calls can cut it again"""
+        limiter = AdaptiveLimiter(initial_limit=20, latency_target=1.0, backoff=0.5)
+        windows = []
+        for _ in range(8):
+            self.assertTrue(limiter.try_acquire())
+            windows.append(limiter.window)
+        for window in windows:
+            limiter.release(True, 5.0, window)
+        self.assertEqual(limiter.limit, 10)
+        self.assertEqual(limiter.in_flight, 0)
+        limiter.try_acquire()
+        limiter.release(True, 0.1, limiter.window)
+        self.assertEqual(limiter.limit, 5)
+
+if __name__ == '__main__':
+    unittest.main()
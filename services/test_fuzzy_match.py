@@ -0,0 +1,51 @@
+import unittest
+from services.fuzzy_match import DestinationResolver, bounded_edit_distance
+
+class TestBoundedEditDistance(unittest.TestCase):
+    def test_within_bound(self):
+        """Distances up to the bound are exact, including adjacent swaps"""
+        self.assertEqual(bounded_edit_distance("london", "london", 2), 0)
+        self.assertEqual(bounded_edit_distance("londn", "london", 2), 1)
+        self.assertEqual(bounded_edit_distance("lodnon", "london", 1), 1)
+        self.assertEqual(bounded_edit_distance("kitten", "sitting", 3), 3)
+
+    def test_beyond_bound(self):
+        """Pairs further apart than the bound give None"""
+        self.assertIsNone(bounded_edit_distance("kitten", "sitting", 2))
+        self.assertIsNone(bounded_edit_distance("paris", "tokyo", 2))
+        self.assertIsNone(bounded_edit_distance("rome", "roma nord", 2))
+
+class TestDestinationResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = DestinationResolver(["London", "New York", "Paris", "Tokyo", "New York City"])
+
+    def test_typos_and_formatting(self):
+        """Misspellings and formatting variants resolve to the known name"""
+        for query, expected in [("Londn", "London"), ("new-york", "New York"), ("NEWYORK", "New York"),
+                                ("lodnon", "London"), ("tokio", "Tokyo"), ("  paris ", "Paris"),
+                                ("nwe york cty", "New York City")]:
+            self.assertEqual(self.resolver.resolve(query), expected, query)
+
+    def test_unknown_and_short_queries(self):
+        """Unrelated names and very short queries do not resolve"""
+        self.assertIsNone(self.resolver.resolve("Berlin"))
+        self.assertIsNone(self.resolver.resolve("par"))
+        self.assertIsNone(self.resolver.resolve(""))
+
+    def test_aliases_are_cached(self):
+        """Repeated misspellings are answered from the alias cache"""
+        self.resolver.resolve("Londn")
+        self.resolver.resolve("londn")
+        self.resolver.resolve("Berlin")
+        self.resolver.resolve("berlin")
+        stats = self.resolver.stats()
+        self.assertEqual((stats["fuzzy"], stats["unresolved"], stats["cached"]), (1, 1, 2))
+
+    def test_new_names_invalidate_cache(self):
+        """A name added later resolves even after a cached miss"""
+        self.assertIsNone(self.resolver.resolve("Berln"))
+        self.resolver.add("Berlin")
+        self.assertEqual(self.resolver.resolve("Berln"), "Berlin")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import asyncio
+import unittest
+from datetime import datetime
+from services.availability import AvailabilityEngine
+from services.hotel_aggregator import HotelAggregator
+
+class FakeProvider:
+    """Provider stand-in that records calls and answers after a short delay"""
+    def __init__(self, name, hotels, delay=0.05):
+        self.name = name
+        self.hotels = hotels
+        self.delay = delay
+        self.delays = []
+        self.calls = 0
+        self.fail = False
+
+    async def search_hotels(self, location, check_in, check_out, guests, filters=None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError(f"{self.name} is down")
+        await asyncio.sleep(self.delays.pop(0) if self.delays else self.delay)
+        return [dict(hotel, source=self.name) for hotel in self.hotels]
+
+    async def get_room_availability(self, hotel_id, check_in, check_out, guests):
+        self.calls += 1
+        return []
+
+class TestHotelAggregator(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.booking = FakeProvider("Booking.com", [
+            {"id": "b1", "name": "Royal Park Hotel", "price": 500, "rating": 4.9},
+            {"id": "b2", "name": "Broadway Plaza Hotel", "price": 380, "rating": 4.6}
+        ])
+        self.osm = FakeProvider("OpenStreetMap", [
+            {"id": "o1", "name": "Eiffel View Hotel", "price": 400, "rating": 4.5}
+        ])
+        self.aggregator = HotelAggregator(providers=[self.booking, self.osm])
+        self.check_in = datetime(2025, 5, 1)
+        self.check_out = datetime(2025, 5, 5)
+
+    async def test_identical_searches_share_one_fan_out(self):
+        """Concurrent identical searches call each provider once"""
+        results = await asyncio.gather(*[
+            self.aggregator.search_hotels("London", self.check_in, self.check_out, 2, {"max_price": 450})
+            for _ in range(20)
+        ])
+        self.assertEqual(self.booking.calls, 1)
+        self.assertEqual(self.osm.calls, 1)
+        self.assertTrue(all(result["hotels"] == results[0]["hotels"] for result in results))
+        self.assertEqual([hotel["id"] for hotel in results[0]["hotels"]], ["b2", "o1"])
+
+    async def test_different_searches_are_not_coalesced(self):
+        """Searches with different parameters fan out separately"""
+        await asyncio.gather(
+            self.aggregator.search_hotels("London", self.check_in, self.check_out, 2),
+            self.aggregator.search_hotels("Paris", self.check_in, self.check_out, 2)
+        )
+        self.assertEqual(self.booking.calls, 2)
+
+    async def test_sequential_searches_fan_out_again(self):
+        """Coalescing only applies while a search is in flight"""
+        await self.aggregator.search_hotels("London", self.check_in, self.check_out, 2)
+        await self.aggregator.search_hotels("London", self.check_in, self.check_out, 2)
+        self.assertEqual(self.booking.calls, 2)
+
+    async def test_pages_walk_the_full_sort_order(self):
+        """Cursor pages concatenate to the fully sorted result"""
+        full = await self.aggregator.search_hotels("London", self.check_in, self.check_out, 2)
+        seen, cursor = [], None
+        while True:
+            page = await self.aggregator.search_hotels(
+                "London", self.check_in, self.check_out, 2, limit=2, cursor=cursor
+            )
+            self.assertEqual(page["total"], 3)
+            seen.extend(hotel["id"] for hotel in page["hotels"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [hotel["id"] for hotel in full["hotels"]])
+        self.assertEqual(seen, ["b2", "o1", "b1"])
+
+    async def test_rating_sort_pages_highest_first(self):
+        """Rating sorts keep higher ratings first when paginated"""
+        page = await self.aggregator.search_hotels(
+            "London", self.check_in, self.check_out, 2, {"sort_by": "rating"}, limit=1
+        )
+        self.assertEqual(page["hotels"][0]["id"], "b1")
+        with self.assertRaises(ValueError):
+            await self.aggregator.search_hotels(
+                "London", self.check_in, self.check_out, 2, limit=1, cursor=page["next_cursor"]
+            )
+
+    async def test_stream_yields_fastest_provider_first(self):
+        """Streaming yields each provider's filtered hotels as it completes"""
+        self.booking.delay = 0.2
+        events = [
+            event async for event in self.aggregator.stream_hotels(
+                "London", self.check_in, self.check_out, 2, {"max_price": 450}
+            )
+        ]
+        self.assertEqual([event["source"] for event in events], ["OpenStreetMap", "Booking.com"])
+        self.assertEqual([hotel["id"] for hotel in events[1]["hotels"]], ["b2"])
+
+    async def test_stream_merges_properties_across_providers(self):
+        """A property listed by a later provider comes as an update to the earlier card, not a repeat"""
+        self.booking.delay = 0.2
+        self.osm.hotels.append({"id": "o2", "name": "Royal Park", "price": 450, "rating": 4.7})
+        events = [
+            event async for event in self.aggregator.stream_hotels("London", self.check_in, self.check_out, 2)
+        ]
+        self.assertEqual([hotel["id"] for hotel in events[0]["hotels"]], ["o1", "o2"])
+        self.assertEqual([hotel["id"] for hotel in events[1]["hotels"]], ["b2"])
+        self.assertEqual([update["id"] for update in events[1]["merged"]], ["o2"])
+        self.assertEqual(events[1]["merged"][0]["hotel"]["sources"], ["OpenStreetMap", "Booking.com"])
+
+    async def test_deadline_returns_partial_results(self):
+        """A provider that misses the deadline is left out and flagged"""
+        self.osm.delay = 5
+        result = await self.aggregator.search_hotels("London", self.check_in, self.check_out, 2, timeout=0.2)
+        self.assertTrue(result["partial"])
+        self.assertEqual(result["sources"], ["Booking.com"])
+        self.assertEqual(result["missing_sources"], [{"source": "OpenStreetMap", "reason": "timeout"}])
+        self.assertEqual({hotel["source"] for hotel in result["hotels"]}, {"Booking.com"})
+
+    async def test_search_many_shares_fan_out_per_stay(self):
+        """Batch queries for one stay share a fan-out and still match separate searches"""
+        queries = {
+            "cheap": {"location": "London", "check_in": self.check_in, "check_out": self.check_out,
+                      "guests": 2, "filters": {"max_price": 450}},
+            "best": {"location": "London", "check_in": self.check_in, "check_out": self.check_out,
+                     "guests": 2, "filters": {"sort_by": "rating"}, "limit": 1},
+            "paris": {"location": "Paris", "check_in": self.check_in, "check_out": self.check_out, "guests": 2}
+        }
+        results = await self.aggregator.search_many(queries, timeout=1)
+        self.assertEqual(self.booking.calls, 2)
+        self.assertEqual([hotel["id"] for hotel in results["cheap"]["hotels"]], ["b2", "o1"])
+        self.assertEqual([hotel["id"] for hotel in results["best"]["hotels"]], ["b1"])
+        self.assertIsNotNone(results["best"]["next_cursor"])
+        separate = await self.aggregator.search_hotels(**queries["cheap"])
+        self.assertEqual(results["cheap"]["hotels"], separate["hotels"])
+
+    async def test_search_many_within_deadline(self):
+        """A slow provider leaves batch results partial instead of holding up the batch"""
+        self.osm.delay = 5
+        queries = {"london": {"location": "London", "check_in": self.check_in,
+                              "check_out": self.check_out, "guests": 2}}
+        results = await self.aggregator.search_many(queries, timeout=0.2)
+        self.assertTrue(results["london"]["partial"])
+        self.assertEqual(results["london"]["missing_sources"], [{"source": "OpenStreetMap", "reason": "timeout"}])
+        # The providers that answered are kept, not discarded with the straggler
+        self.assertEqual([hotel["id"] for hotel in results["london"]["hotels"]], ["b2", "b1"])
+
+    async def test_hedged_request_beats_slow_attempt(self):
+        """A hedge fired after the configured delay can win the race"""
+        self.osm.delays = [5, 0.01]
+        aggregator = HotelAggregator(providers=[self.osm], timeout=1, hedge_delays={"OpenStreetMap": 0.05})
+        result = await aggregator.search_hotels("Paris", self.check_in, self.check_out, 2)
+        self.assertFalse(result["partial"])
+        self.assertEqual(self.osm.calls, 2)
+        self.assertEqual([hotel["id"] for hotel in result["hotels"]], ["o1"])
+
+    async def test_open_breaker_sheds_failing_provider(self):
+        """After repeated failures a provider is skipped without being called"""
+        aggregator = HotelAggregator(
+            providers=[self.booking, self.osm],
+            breaker_options={"min_calls": 3, "open_seconds": 60}
+        )
+        self.osm.fail = True
+        for day in range(3):
+            result = await aggregator.search_hotels("London", datetime(2025, 5, 1 + day), self.check_out, 2)
+            self.assertEqual(result["missing_sources"], [{"source": "OpenStreetMap", "reason": "error"}])
+        result = await aggregator.search_hotels("London", self.check_in, self.check_out, 2)
+        self.assertEqual(self.osm.calls, 3)
+        self.assertEqual(result["missing_sources"], [{"source": "OpenStreetMap", "reason": "circuit_open"}])
+        self.assertEqual([hotel["id"] for hotel in result["hotels"]], ["b2", "b1"])
+        status = aggregator.provider_status()
+        self.assertEqual(status["OpenStreetMap"]["breaker"]["state"], "open")
+        self.assertEqual(status["Booking.com"]["breaker"]["state"], "closed")
+
+    async def test_duplicate_properties_are_merged(self):
+        """A hotel listed by two providers is returned once at its best price"""
+        self.booking.hotels.append(
+            {"id": "b3", "name": "Eiffel View", "price": 420, "rating": 4.4, "latitude": 48.8584, "longitude": 2.2945}
+        )
+        self.osm.hotels[0].update(latitude=48.8585, longitude=2.2947)
+        result = await self.aggregator.search_hotels("Paris", self.check_in, self.check_out, 2)
+        self.assertEqual(result["total"], 3)
+        merged = next(hotel for hotel in result["hotels"] if hotel["id"] == "o1")
+        self.assertEqual(merged["price"], 400)
+        self.assertEqual(merged["sources"], ["Booking.com", "OpenStreetMap"])
+
+    async def test_local_inventory(self):
+        """Tracked hotels are answered locally and sold-out ones are left out of search"""
+        availability = AvailabilityEngine(start=datetime(2025, 1, 1))
+        availability.set_inventory("b1", "Suite", 2, city="London")
+        availability.set_inventory("b2", "Standard", 0, city="London")
+        aggregator = HotelAggregator(providers=[self.booking, self.osm], availability=availability)
+        details = await aggregator.get_hotel_details("b1", self.check_in, self.check_out, 2)
+        self.assertEqual(details["rooms"], [{"room_type": "Suite", "available_rooms": 2, "source": "inventory"}])
+        self.assertEqual(self.booking.calls + self.osm.calls, 0)
+        result = await aggregator.search_hotels("London", self.check_in, self.check_out, 2)
+        self.assertEqual([hotel["id"] for hotel in result["hotels"]], ["o1", "b1"])
+
+if __name__ == '__main__':
+    unittest.main()
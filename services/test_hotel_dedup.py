@@ -0,0 +1,92 @@
+import unittest
+from services.geo import encode_geohash, decode_bbox, neighbors, haversine_km
+from services.hotel_dedup import HotelDeduplicator, name_tokens
+
+class TestGeo(unittest.TestCase):
+    def test_geohash_round_trip(self):
+        """A point lies inside the cell its geohash decodes to"""
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        min_lat, min_lon, max_lat, max_lon = decode_bbox(encode_geohash(51.5074, -0.1278, 6))
+        self.assertTrue(min_lat <= 51.5074 <= max_lat and min_lon <= -0.1278 <= max_lon)
+
+    def test_neighbors_surround_cell(self):
+        """A cell has eight distinct neighbours besides itself"""
+        cells = neighbors("gcpvj0")
+        self.assertEqual(len(cells), 9)
+        self.assertIn("gcpvj0", cells)
+
+    def test_haversine(self):
+        """London to Paris is roughly 344 km"""
+        self.assertAlmostEqual(haversine_km(51.5074, -0.1278, 48.8566, 2.3522), 343.5, delta=1)
+
+class TestHotelDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.dedup = HotelDeduplicator()
+
+    def test_merges_same_property_across_providers(self):
+        """Records with matching names close together merge into one at the best price"""
+        hotels = [
+            {"id": "b1", "name": "The Savoy", "price": 520, "latitude": 51.5104, "longitude": -0.1204,
+             "amenities": ["spa", "wifi"], "source": "Booking.com"},
+            {"id": "o7", "name": "Savoy Hotel", "price": 480, "lat": 51.5106, "lon": -0.1201,
+             "amenities": ["wifi", "pool"], "source": "OpenStreetMap"},
+            {"id": "b2", "name": "Strand Palace", "price": 210, "latitude": 51.5108, "longitude": -0.1207,
+             "source": "Booking.com"}
+        ]
+        result = self.dedup.dedupe(hotels)
+        self.assertEqual(len(result), 2)
+        savoy = result[0]
+        self.assertEqual((savoy["id"], savoy["price"], savoy["source"]), ("o7", 480, "OpenStreetMap"))
+        self.assertEqual(savoy["amenities"], ["spa", "wifi", "pool"])
+        self.assertEqual(savoy["sources"], ["Booking.com", "OpenStreetMap"])
+        self.assertEqual([offer["price"] for offer in savoy["offers"]], [520, 480])
+        self.assertIs(result[1], hotels[2])
+        self.assertNotIn("sources", hotels[1])
+
+    def test_same_name_far_apart_is_kept(self):
+        """Chains with the same name in different places are not merged"""
+        hotels = [
+            {"id": "1", "name": "Hilton Garden Inn", "latitude": 51.50, "longitude": -0.12},
+            {"id": "2", "name": "Hilton Garden Inn", "latitude": 51.53, "longitude": -0.12}
+        ]
+        self.assertEqual(len(self.dedup.dedupe(hotels)), 2)
+
+    def test_matches_across_cell_boundary(self):
+        """Neighbouring geohash cells are searched, so a boundary does not split a property"""
+        min_lat, min_lon, max_lat, max_lon = decode_bbox("gcpvj0")
+        hotels = [
+            {"id": "1", "name": "Park Plaza", "latitude": max_lat - 0.0002, "longitude": min_lon + 0.001},
+            {"id": "2", "name": "Park Plaza", "latitude": max_lat + 0.0002, "longitude": min_lon + 0.001}
+        ]
+        self.assertEqual(len(self.dedup.dedupe(hotels)), 1)
+
+    def test_without_coordinates_requires_same_address(self):
+        """Records without coordinates merge only on identical name and address"""
+        hotels = [
+            {"id": "1", "name": "Café Royal", "address": "68 Regent St", "price": 0},
+            {"id": "2", "name": "cafe royal", "address": "68 Regent St.", "price": 300},
+            {"id": "3", "name": "Cafe Royal", "address": "1 High St", "price": 90}
+        ]
+        result = self.dedup.dedupe(hotels)
+        self.assertEqual([hotel["id"] for hotel in result], ["2", "3"])
+
+    def test_same_source_is_never_merged(self):
+        """Two similar listings from one provider are two properties, even next to a third provider's"""
+        hotels = [
+            {"id": "b1", "name": "Park Plaza", "latitude": 51.5010, "longitude": -0.1160, "source": "Booking.com"},
+            {"id": "b2", "name": "Park Plaza", "latitude": 51.5012, "longitude": -0.1162, "source": "Booking.com"},
+            {"id": "o1", "name": "Park Plaza", "latitude": 51.5011, "longitude": -0.1161, "source": "OpenStreetMap"},
+            {"id": "b3", "name": "Cafe Royal", "address": "68 Regent St", "source": "Booking.com"},
+            {"id": "b4", "name": "Cafe Royal", "address": "68 Regent St", "source": "Booking.com"}
+        ]
+        result = self.dedup.dedupe(hotels)
+        self.assertEqual([hotel["id"] for hotel in result], ["b1", "b2", "b3", "b4"])
+        self.assertEqual(result[0]["sources"], ["Booking.com", "OpenStreetMap"])
+        self.assertNotIn("sources", result[1])
+
+    def test_name_tokens(self):
+        """Generic words, accents and punctuation do not affect a name"""
+        self.assertEqual(name_tokens("The Ritz-Carlton Hotel"), name_tokens("ritz carlton"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.http_client import HTTPClientPool
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """Local stand-in for a provider API that records connections and concurrency"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.client_ports.add(self.client_address[1])
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        body = b'{"hotels": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestHTTPClientPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubProviderHandler)
+        self.server.lock = threading.Lock()
+        self.server.client_ports = set()
+        self.server.active = 0
+        self.server.peak = 0
+        self.server.delay = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hotels"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_sequential_requests_reuse_one_connection(self):
+        """Keep-alive means repeated calls do not open new connections"""
+        async with HTTPClientPool(http2=False) as pool:
+            for _ in range(5):
+                response = await pool.get(self.url)
+                self.assertEqual(response.json(), {"hotels": []})
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    async def test_per_host_limit_caps_concurrency(self):
+        """No more than per_host_limit requests reach one host at once"""
+        self.server.delay = 0.05
+        async with HTTPClientPool(http2=False, per_host_limit=2) as pool:
+            responses = await asyncio.gather(*[pool.get(self.url) for _ in range(8)])
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(self.server.peak, 2)
+
+    async def test_client_is_recreated_after_close(self):
+        """Closing releases the client; the next request opens a fresh one"""
+        pool = HTTPClientPool(http2=False)
+        await pool.get(self.url)
+        self.assertTrue(pool.is_open)
+        await pool.aclose()
+        self.assertFalse(pool.is_open)
+        await pool.get(self.url)
+        await pool.aclose()
+
+if __name__ == '__main__':
+    unittest.main()
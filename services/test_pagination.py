@@ -0,0 +1,40 @@
+import base64
+import json
+import unittest
+from services.pagination import decode_cursor, encode_cursor, field_sort_key, top_k_page
+
+def crafted_cursor(position, sort_by="price", descending=False):
+    payload = json.dumps({"k": position, "s": sort_by, "d": descending})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+class TestPagination(unittest.TestCase):
+    def setUp(self):
+        self.hotels = [
+            {"id": f"h{i}", "name": name, "price": price, "source": "Booking.com"}
+            for i, (name, price) in enumerate([("Savoy", 480), ("Ritz", 520), ("Strand", 210), ("Hoxton", 210)])
+        ]
+
+    def test_pages_follow_the_sort_order(self):
+        """Pages chain through cursors, ties broken by id"""
+        page, cursor = top_k_page(self.hotels, 3, "price")
+        self.assertEqual([hotel["id"] for hotel in page], ["h2", "h3", "h0"])
+        page, cursor = top_k_page(self.hotels, 3, "price", cursor=cursor)
+        self.assertEqual(([hotel["id"] for hotel in page], cursor), (["h1"], None))
+        page, cursor = top_k_page(self.hotels, 2, "name", descending=True)
+        self.assertEqual(decode_cursor(cursor, "name", True), field_sort_key("name")(page[-1]))
+
+    def test_crafted_cursors_are_rejected(self):
+        """Cursors with a key of the wrong shape or type raise ValueError instead of TypeError"""
+        for position in ([["x"], "h1", ""], [480, 7, ""], [True, "h1", ""], [480, "h1"], [None, "h1", ""]):
+            with self.assertRaises(ValueError):
+                decode_cursor(crafted_cursor(position), "price", False)
+        # Well formed, but a string value cannot be compared with prices (nor a number with names)
+        with self.assertRaises(ValueError):
+            top_k_page(self.hotels, 2, "price", cursor=crafted_cursor(["480", "h1", ""]))
+        with self.assertRaises(ValueError):
+            top_k_page(self.hotels, 2, "name", cursor=crafted_cursor([480, "h1", ""], "name"))
+        with self.assertRaises(ValueError):
+            top_k_page(self.hotels, 2, "price", cursor=encode_cursor((480, "h0", ""), "price", True))
+
+if __name__ == '__main__':
+    unittest.main()
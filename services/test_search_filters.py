@@ -0,0 +1,47 @@
+import unittest
+from services import search_filters
+from services.search_filters import compile_filters, register_filter
+
+class TestSearchFilters(unittest.TestCase):
+    def setUp(self):
+        self.hotels = [
+            {"id": "a", "price": 120, "rating": 4.6, "free_cancellation": True, "payment_required": False},
+            {"id": "b", "price": 300, "rating": 4.9, "free_cancellation": True, "payment_required": True},
+            {"id": "c", "price": 80, "rating": 3.9, "free_cancellation": False, "payment_required": False},
+            {"id": "d", "price": 200, "rating": 4.2}
+        ]
+
+    def test_matches_sequential_filters(self):
+        """One pass gives the same hotels as applying each filter in turn"""
+        filters = {"min_price": 100, "max_price": 250, "min_rating": 4.0, "free_cancellation_only": True}
+        self.assertEqual([h["id"] for h in compile_filters(filters).apply(self.hotels)], ["a"])
+
+    def test_orders_by_selectivity(self):
+        """The most selective predicates run first and inactive filters are dropped"""
+        pipeline = compile_filters({
+            "min_price": 10, "no_payment_only": True, "max_price": None,
+            "free_cancellation_only": False, "sort_by": "price"
+        })
+        self.assertEqual(pipeline.names, ["no_payment_only", "min_price"])
+
+    def test_no_filters_returns_copy(self):
+        """Without filters the result is a new list with every hotel"""
+        result = compile_filters(None).apply(self.hotels)
+        self.assertEqual(result, self.hotels)
+        self.assertIsNot(result, self.hotels)
+
+    def test_custom_filter(self):
+        """New filter types plug in through register_filter"""
+        # Registration is global; remove the test filter so other tests never see it
+        self.addCleanup(search_filters._FILTERS.pop, "test_max_rating", None)
+
+        @register_filter("test_max_rating", selectivity=0.1)
+        def _max_rating(value):
+            return None if value is None else (lambda hotel: hotel.get("rating", 0) <= value)
+
+        pipeline = compile_filters({"test_max_rating": 4.5, "min_price": 100})
+        self.assertEqual(pipeline.names[0], "test_max_rating")
+        self.assertEqual([h["id"] for h in pipeline.apply(self.hotels)], ["d"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import random
+import unittest
+from services.geo import haversine_km
+from services.spatial_index import GeohashIndex
+
+class TestGeohashIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = GeohashIndex()
+        rng = random.Random(7)
+        # Points scattered around central London
+        self.points = {
+            f"p{i}": (51.45 + rng.random() * 0.1, -0.2 + rng.random() * 0.15)
+            for i in range(500)
+        }
+        for key, (lat, lon) in self.points.items():
+            self.index.insert(key, lat, lon, {"id": key})
+
+    def test_radius_matches_brute_force(self):
+        """Radius queries return exactly the points a full scan finds, nearest first"""
+        center = (51.5074, -0.1278)
+        for radius in (0.5, 2.0, 5.0):
+            expected = {
+                key for key, (lat, lon) in self.points.items()
+                if haversine_km(center[0], center[1], lat, lon) <= radius
+            }
+            matches = self.index.within_radius(center[0], center[1], radius)
+            self.assertEqual({key for _, key, _ in matches}, expected)
+            distances = [distance for distance, _, _ in matches]
+            self.assertEqual(distances, sorted(distances))
+
+    def test_bbox_matches_brute_force(self):
+        """Bounding-box queries return exactly the points inside the box"""
+        box = (51.48, -0.15, 51.52, -0.10)
+        expected = {
+            key for key, (lat, lon) in self.points.items()
+            if box[0] <= lat <= box[2] and box[1] <= lon <= box[3]
+        }
+        self.assertEqual({key for key, _ in self.index.within_bbox(*box)}, expected)
+
+    def test_incremental_insert_and_remove(self):
+        """Points can be moved and removed without rebuilding the index"""
+        self.index.insert("p0", 48.8584, 2.2945)
+        self.assertEqual(self.index.get("p0"), (48.8584, 2.2945))
+        self.assertEqual([key for _, key, _ in self.index.within_radius(48.8584, 2.2945, 1)], ["p0"])
+        self.assertTrue(self.index.remove("p0"))
+        self.assertFalse(self.index.remove("p0"))
+        self.assertEqual(self.index.within_radius(48.8584, 2.2945, 1), [])
+        self.assertEqual(len(self.index), 499)
+
+    def test_limit(self):
+        """A limit keeps only the nearest points"""
+        nearest = self.index.within_radius(51.5074, -0.1278, 3, limit=3)
+        self.assertEqual(len(nearest), 3)
+        self.assertEqual(nearest, self.index.within_radius(51.5074, -0.1278, 3)[:3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,8 @@ setup(
         "fastapi==0.68.0",
         "uvicorn==0.15.0",
         "python-dotenv==0.19.0",
-        "httpx==0.23.0",
+        "httpx[http2]==0.23.0",
+        "geopy==2.2.0",
         "pydantic==1.8.0",
         "Jinja2==3.0.1",
         "aiofiles==0.7.0",
@@ -20,7 +21,8 @@ setup(
         "slowapi==0.1.4",
         "email-validator==1.1.3",
         "python-jose[cryptography]==3.3.0",
-        "passlib[bcrypt]==1.7.4"
+        "passlib[bcrypt]==1.7.4",
+        "numpy==1.21.6"
     ],
     python_requires=">=3.9.7",
 ) 
\ No newline at end of file
@@ -81,26 +81,12 @@ if (bookingForm) {
 
         showLoading();
         try {
-            const response = await fetch("/api/search", {
-                method: "POST",
-                headers: {
-                    "Content-Type": "application/json",
-                },
-                body: JSON.stringify({
-                    destination,
-                    checkIn,
-                    checkOut,
-                    guests: parseInt(guests)
-                })
+            await streamSearchResults({
+                destination,
+                check_in: checkIn,
+                check_out: checkOut,
+                guests: parseInt(guests)
             });
-
-            if (!response.ok) {
-                throw new Error("Search failed");
-            }
-
-            const data = await response.json();
-            displaySearchResults(data);
-            document.getElementById("searchResults").scrollIntoView({ behavior: "smooth" });
         } catch (error) {
             console.error("Search error:", error);
             showAlert("Failed to search hotels. Please try again.", "error");
@@ -110,6 +96,112 @@ if (bookingForm) {
     });
 }
 
+// Destination autocomplete: debounced, cancels stale requests, remembers answered prefixes
+const destinationInput = document.getElementById("destination");
+const destinationSuggestions = document.getElementById("destinationSuggestions");
+if (destinationInput && destinationSuggestions) {
+    const suggestionCache = new Map();
+    let suggestTimer = null;
+    let suggestController = null;
+
+    const renderSuggestions = (suggestions) => {
+        const fragment = document.createDocumentFragment();
+        suggestions.forEach(suggestion => {
+            const option = document.createElement("option");
+            option.value = suggestion.name;
+            if (suggestion.destination) {
+                option.label = `${suggestion.name}, ${suggestion.destination}`;
+            }
+            fragment.appendChild(option);
+        });
+        destinationSuggestions.replaceChildren(fragment);
+    };
+
+    destinationInput.addEventListener("input", function() {
+        const query = this.value.trim().toLowerCase();
+        clearTimeout(suggestTimer);
+        if (!query) {
+            renderSuggestions([]);
+            return;
+        }
+        if (suggestionCache.has(query)) {
+            renderSuggestions(suggestionCache.get(query));
+            return;
+        }
+        suggestTimer = setTimeout(async () => {
+            if (suggestController) {
+                suggestController.abort();
+            }
+            suggestController = new AbortController();
+            try {
+                const response = await fetch(`/api/autocomplete?q=${encodeURIComponent(query)}`, {
+                    signal: suggestController.signal
+                });
+                if (!response.ok) {
+                    return;
+                }
+                const data = await response.json();
+                suggestionCache.set(query, data.suggestions);
+                renderSuggestions(data.suggestions);
+            } catch (error) {
+                if (error.name !== "AbortError") {
+                    console.error("Autocomplete error:", error);
+                }
+            }
+        }, 120);
+    });
+}
+
+// Stream search results, rendering each provider's hotels as soon as they arrive
+async function streamSearchResults(query) {
+    const response = await fetch("/api/search/stream", {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+        },
+        body: JSON.stringify(query)
+    });
+
+    if (!response.ok || !response.body) {
+        throw new Error("Search failed");
+    }
+
+    displaySearchResults([]);
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let firstBatch = true;
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // NDJSON: every complete line is one event
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+        for (const line of lines) {
+            if (!line.trim()) continue;
+            const event = JSON.parse(line);
+            if (event.type === "hotels") {
+                (event.merged || []).forEach(update => replaceHotelCard(update.id, update.hotel));
+            }
+            if (event.type === "hotels" && event.hotels.length) {
+                appendHotelCards(event.hotels);
+                if (firstBatch) {
+                    firstBatch = false;
+                    hideLoading();
+                    document.getElementById("searchResults").scrollIntoView({ behavior: "smooth" });
+                }
+            } else if (event.type === "error") {
+                throw new Error(event.error);
+            } else if (event.type === "done" && event.total === 0) {
+                showAlert("No hotels found for your search.", "info");
+            }
+        }
+    }
+}
+
 // Display search results
 function displaySearchResults(hotels) {
     const hotelList = document.getElementById("hotelList");
@@ -118,16 +210,36 @@ function displaySearchResults(hotels) {
     hotelList.innerHTML = "";
     document.getElementById("searchResults").style.display = "block";
 
+    appendHotelCards(hotels);
+}
+
+// Append hotel cards without clearing the ones already shown
+function appendHotelCards(hotels) {
+    const hotelList = document.getElementById("hotelList");
+    if (!hotelList) return;
+
+    const fragment = document.createDocumentFragment();
     hotels.forEach(hotel => {
-        const hotelCard = createHotelCard(hotel);
-        hotelList.appendChild(hotelCard);
+        fragment.appendChild(createHotelCard(hotel));
     });
+    hotelList.appendChild(fragment);
+}
+
+// Swap a card already shown for the same property merged with another provider's offer
+function replaceHotelCard(id, hotel) {
+    const card = document.querySelector(`#hotelList [data-hotel-id="${CSS.escape(String(id))}"]`);
+    if (card) {
+        const replacement = createHotelCard(hotel);
+        replacement.dataset.hotelId = id;
+        card.replaceWith(replacement);
+    }
 }
 
 // Create hotel card
 function createHotelCard(hotel) {
     const div = document.createElement("div");
     div.className = "col-md-6 col-lg-4 mb-4";
+    div.dataset.hotelId = hotel.id;
     div.innerHTML = `
         <div class="hotel-card">
             <img src="${hotel.image}" alt="${hotel.name}" class="lazy">